@@ -0,0 +1,239 @@
+"""
+Provides a server side cache for rendered responses.
+
+Cached responses are stored as plain (status, headers, content) tuples, so
+no renderer or request state is ever pickled.  Each cache key includes a
+generation number for the view's model, which is incremented to invalidate
+all of the cached responses for that model at once.
+"""
+import random
+import time
+from hashlib import md5
+from django.core.cache import get_cache
+from django.utils.encoding import smart_str
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils import is_lazy_iterable
+from rest_framework.utils.lru import LRUCache
+
+
+# Generation keys should outlive any cached response.  30 days is the
+# longest relative timeout memcached supports.
+GENERATION_TIMEOUT = 60 * 60 * 24 * 30
+
+
+class LocalMemoryCache(object):
+    """
+    An in-process cache, providing the parts of Django's cache API that
+    are used by the response cache, with least recently used eviction.
+
+    Each process has its own cache, so invalidation isn't seen by other
+    processes.  Use a shared Django cache backend, by setting the
+    `RESPONSE_CACHE` setting, when running multiple processes.
+    """
+    timer = time.time
+
+    def __init__(self, max_entries=1000):
+        self._cache = LRUCache(max_entries)
+
+    def get(self, key, default=None):
+        entry = self._cache.get(key)
+        if entry is None or (entry[0] is not None and entry[0] <= self.timer()):
+            return default
+        return entry[1]
+
+    def set(self, key, value, timeout=None):
+        expires = timeout is not None and self.timer() + timeout or None
+        self._cache.set(key, (expires, value))
+
+    def get_many(self, keys):
+        ret = {}
+        for key in keys:
+            value = self.get(key)
+            if value is not None:
+                ret[key] = value
+        return ret
+
+    def set_many(self, data, timeout=None):
+        for key, value in data.items():
+            self.set(key, value, timeout)
+
+    def incr(self, key, delta=1):
+        entry = self._cache.get(key)
+        if entry is None or (entry[0] is not None and entry[0] <= self.timer()):
+            raise ValueError("Key '%s' not found" % key)
+        self._cache.set(key, (entry[0], entry[1] + delta))
+        return entry[1] + delta
+
+    def clear(self):
+        self._cache.clear()
+
+
+_local_cache = LocalMemoryCache()
+
+
+def get_cache_backend():
+    """
+    Return the cache used for responses and serialized fragments, given by
+    the `RESPONSE_CACHE` setting, which names one of Django's `CACHES`.
+    Defaults to an in-process least recently used cache.
+    """
+    if api_settings.RESPONSE_CACHE:
+        return get_cache(api_settings.RESPONSE_CACHE)
+    return _local_cache
+
+
+def get_cache_group(view):
+    """
+    Return the name of the group of cached responses that the view belongs
+    to, which is its model if it has one, so that writes through any view
+    onto a model invalidate the responses of all of them.
+    """
+    model = getattr(view, 'model', None)
+    if model is None:
+        model = getattr(getattr(view, 'queryset', None), 'model', None)
+    if model is not None:
+        return '%s.%s' % (model._meta.app_label, model._meta.object_name)
+    return '%s.%s' % (view.__class__.__module__, view.__class__.__name__)
+
+
+def _get_generation_key(group):
+    return 'rest_framework:generation:%s' % md5(smart_str(group)).hexdigest()
+
+
+def get_generation(group, cache=None):
+    """
+    Return the current generation number of a cache group.
+    """
+    cache = cache or get_cache_backend()
+    key = _get_generation_key(group)
+    generation = cache.get(key)
+    if generation is None:
+        # Start from a random number, so that a group whose generation key
+        # was evicted doesn't return to an earlier generation.
+        generation = random.randint(0, 2 ** 30)
+        cache.set(key, generation, GENERATION_TIMEOUT)
+    return generation
+
+
+def invalidate_group(group, cache=None):
+    """
+    Invalidate all of the cached responses in a cache group.
+    """
+    cache = cache or get_cache_backend()
+    key = _get_generation_key(group)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, random.randint(0, 2 ** 30), GENERATION_TIMEOUT)
+
+
+class BaseResponseCache(object):
+    """
+    Caching of rendered responses.
+    """
+    def get_response(self, request, view):
+        """
+        Return a cached response for the request, or `None`.
+        """
+        raise NotImplementedError('.get_response() must be overridden')
+
+    def set_response(self, request, view, response):
+        """
+        Store the response for the request, once it is rendered.
+        """
+        raise NotImplementedError('.set_response() must be overridden')
+
+    def invalidate(self, view):
+        """
+        Invalidate any cached responses that may be affected by a write
+        made through the view.
+        """
+        raise NotImplementedError('.invalidate() must be overridden')
+
+
+class ResponseCache(BaseResponseCache):
+    """
+    Caches successful `GET` and `HEAD` responses for `timeout` seconds.
+
+    Responses are keyed on the view, its URL arguments, the query
+    parameters, the host, the accepted media type and, if `per_user` is
+    set, the authenticated user.  The timeout may be overridden on the view
+    with a `cache_timeout` attribute.
+
+    Cached responses skip object-level permission checks, so `per_user`
+    should only be unset for views whose permissions don't depend on the
+    user.
+    """
+    timeout = 60
+    per_user = True
+    cache_format = 'rest_framework:response:%s'
+    stateless = True
+
+    def get_cache(self):
+        return get_cache_backend()
+
+    def get_cache_key(self, request, view):
+        """
+        Return the cache key for the request, or `None` if its response
+        shouldn't be cached.
+        """
+        if request.method not in ('GET', 'HEAD'):
+            return None
+
+        cache_class = view.__class__
+        parts = [
+            get_generation(get_cache_group(view), self.get_cache()),
+            cache_class.__module__, cache_class.__name__,
+            view.args, sorted(view.kwargs.items()),
+            sorted(request.QUERY_PARAMS.lists()),
+            request.is_secure(), request.get_host(),
+            request.accepted_media_type,
+        ]
+        if self.per_user:
+            parts.append(getattr(request.user, 'pk', None))
+        return self.cache_format % md5(smart_str(repr(parts))).hexdigest()
+
+    def get_response(self, request, view):
+        key = self.get_cache_key(request, view)
+        request._response_cache_key = key
+        entry = key and self.get_cache().get(key)
+        if not entry:
+            return None
+
+        status_code, headers, content = entry
+        etag = dict(headers).get('ETag')
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if etag and if_none_match is not None and \
+                parse_etags(etag)[0] in parse_etags(if_none_match):
+            status_code, content = status.HTTP_304_NOT_MODIFIED, ''
+
+        response = Response(status=status_code)
+        response.content = content  # Marks the response as rendered
+        for name, value in headers:
+            response[name] = value
+        return response
+
+    def set_response(self, request, view, response):
+        key = getattr(request, '_response_cache_key', None)
+        if key is None:
+            return
+        if is_lazy_iterable(response.data) and \
+                getattr(response.accepted_renderer, 'streaming', False):
+            return
+
+        cache = self.get_cache()
+        timeout = getattr(view, 'cache_timeout', self.timeout)
+
+        def store(response):
+            if response.status_code != 200 or response.cookies:
+                return
+            entry = (response.status_code, response.items(), response.content)
+            cache.set(key, entry, timeout)
+
+        response.add_post_render_callback(store)
+
+    def invalidate(self, view):
+        invalidate_group(get_cache_group(view), self.get_cache())
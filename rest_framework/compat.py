@@ -12,6 +12,21 @@ except:
     django_filters = None
 
 
+# StreamingHttpResponse is only available from Django 1.5.  Earlier versions
+# stream any HttpResponse that has an iterator as its content.
+try:
+    from django.http import StreamingHttpResponse
+except ImportError:
+    StreamingHttpResponse = None
+
+
+# prefetch_related is only available from Django 1.4
+try:
+    from django.db.models.query import prefetch_related_objects
+except ImportError:
+    prefetch_related_objects = None
+
+
 # cStringIO only if it's available, otherwise StringIO
 try:
     import cStringIO as StringIO
@@ -355,8 +370,19 @@ except ImportError:
     yaml = None
 
 
-# xml.etree.parse only throws ParseError for python >= 2.7
+# msgpack only if it's available, otherwise a pure Python implementation
 try:
-    from xml.etree import ParseError as ETParseError
-except ImportError:  # python < 2.7
-    ETParseError = None
+    import msgpack
+except ImportError:
+    from rest_framework.utils import msgpack
+
+
+# cElementTree only if it's available, otherwise ElementTree
+try:
+    import xml.etree.cElementTree as ElementTree
+except ImportError:
+    import xml.etree.ElementTree as ElementTree
+
+
+# xml.etree.parse only throws ParseError for python >= 2.7
+ETParseError = getattr(ElementTree, 'ParseError', None)
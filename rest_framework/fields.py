@@ -1,31 +1,114 @@
 import copy
 import datetime
 import inspect
+import types
 import warnings
 
 from django.core import validators
 from django.core.exceptions import ObjectDoesNotExist, ValidationError
-from django.core.urlresolvers import resolve, get_script_prefix
+from django.core.urlresolvers import get_script_prefix
 from django.conf import settings
 from django import forms
+from django.db.models.fields import FieldDoesNotExist
+from django.db.models.fields.related import (
+    ForeignRelatedObjectsDescriptor, ManyRelatedObjectsDescriptor,
+    ReverseManyRelatedObjectsDescriptor, ReverseSingleRelatedObjectDescriptor,
+    SingleRelatedObjectDescriptor)
 from django.forms import widgets
 from django.forms.models import ModelChoiceIterator
 from django.utils.encoding import is_protected_type, smart_unicode
 from django.utils.translation import ugettext_lazy as _
-from rest_framework.reverse import reverse
+from rest_framework.reverse import reverse, reverse_cached, resolve_cached
 from rest_framework.compat import parse_date, parse_datetime
 from rest_framework.compat import timezone
 from urlparse import urlparse
 
 
+# Maps (function, is_method) -> bool, see `is_simple_callable`.
+# The cache is cleared if it grows beyond `_SIMPLE_CALLABLE_CACHE_MAX`.
+_simple_callable_cache = {}
+_SIMPLE_CALLABLE_CACHE_MAX = 1000
+
+
 def is_simple_callable(obj):
     """
     True if the object is a callable that takes no arguments.
+
+    The result only depends on the underlying function, so the function
+    signature is inspected once, rather than once for every object.
+    """
+    if isinstance(obj, types.MethodType):
+        key = (obj.im_func, True)
+    elif isinstance(obj, types.FunctionType):
+        key = (obj, False)
+    else:
+        return False
+
+    try:
+        return _simple_callable_cache[key]
+    except KeyError:
+        pass
+
+    func, is_method = key
+    max_args = is_method and 1 or 0
+    ret = len(inspect.getargspec(func)[0]) <= max_args
+    if len(_simple_callable_cache) >= _SIMPLE_CALLABLE_CACHE_MAX:
+        _simple_callable_cache.clear()
+    _simple_callable_cache[key] = ret
+    return ret
+
+
+def get_component(obj, attr_name):
+    """
+    Given an object, and an attribute name, return that attribute on the
+    object, calling it first if it's a callable that takes no arguments.
+    """
+    value = getattr(obj, attr_name)
+    if is_simple_callable(value):
+        return value()
+    return value
+
+
+def parse_source(source):
+    """
+    Given a field's `source` argument, return the tuple of attribute names
+    used to look up the value, eg. 'user.profile' -> ('user', 'profile')
+    """
+    if not source or source == '*':
+        return ()
+    return tuple(source.split('.'))
+
+
+def get_relation(model, attr):
+    """
+    Given a model class and an attribute name, return a four-tuple of
+    (related model, to_many, local, lookup), or `None` if the attribute
+    isn't a relationship.
+
+    `local` is True for forward foreign keys, where the related object's pk
+    is available on the instance without loading the related object.
+
+    `lookup` is the name used to filter the related model by instances of
+    `model`, if the relationship is to-many, or `None`.
     """
-    return (
-        (inspect.isfunction(obj) and not inspect.getargspec(obj)[0]) or
-        (inspect.ismethod(obj) and len(inspect.getargspec(obj)[0]) <= 1)
-    )
+    descriptor = getattr(model, attr, None)
+
+    if isinstance(descriptor, ReverseSingleRelatedObjectDescriptor):
+        return (descriptor.field.rel.to, False, True, None)
+    elif isinstance(descriptor, SingleRelatedObjectDescriptor):
+        return (descriptor.related.model, False, False, None)
+    elif isinstance(descriptor, ReverseManyRelatedObjectsDescriptor):
+        field = descriptor.field
+        return (field.rel.to, True, False, field.related_query_name())
+    elif isinstance(descriptor, (ForeignRelatedObjectsDescriptor,
+                                 ManyRelatedObjectsDescriptor)):
+        related = descriptor.related
+        return (related.model, True, False, related.field.name)
+    elif getattr(descriptor, 'field', None) is not None and \
+            getattr(descriptor.field, 'rel', None) is not None:
+        # Eg. generic relations
+        return (descriptor.field.rel.to, True, False, None)
+    return None
 
 
 class Field(object):
@@ -33,14 +116,31 @@ class Field(object):
     empty = ''
     type_name = None
     form_field_class = forms.CharField
+    callable_source = None
 
-    def __init__(self, source=None):
+    def __init__(self, source=None, callable_source=None):
         self.parent = None
 
         self.creation_counter = Field.creation_counter
         Field.creation_counter += 1
 
         self.source = source
+        self._source_attrs = parse_source(source)
+
+        # `True` or `False` if the attribute is known to be, or not to be,
+        # a method that should be called.  `None` to check for each value.
+        if callable_source is not None:
+            self.callable_source = callable_source
+
+    def prepare_objects(self, objects, field_name):
+        """
+        Called with the list of objects that are about to be serialized,
+        prior to calling field_to_native for each object in turn.
+
+        Fields may override this to perform any lookups for the whole list
+        at once, rather than once for each object.
+        """
+        pass
 
     def initialize(self, parent, field_name):
         """
@@ -52,6 +152,18 @@ class Field(object):
         self.parent = parent
         self.root = parent.root or parent
         self.context = self.root.context
+        self._source_attrs = parse_source(self.source)
+
+    def bind(self, parent, field_name):
+        """
+        Returns a copy of this field, initialized against the given parent.
+
+        Used for fields that are shared between serializer instances, so
+        that the state set up by `initialize()` is kept on the copy.
+        """
+        field = copy.copy(self)
+        field.initialize(parent=parent, field_name=field_name)
+        return field
 
     def field_from_native(self, data, field_name, into):
         """
@@ -71,23 +183,28 @@ class Field(object):
         if self.source == '*':
             return self.to_native(obj)
 
-        if self.source:
-            value = obj
-            for component in self.source.split('.'):
-                value = getattr(value, component)
-                if is_simple_callable(value):
-                    value = value()
-        else:
-            value = getattr(obj, field_name)
+        attrs = self._source_attrs or (field_name,)
+        value = obj
+        for component in attrs[:-1]:
+            value = get_component(value, component)
+        value = getattr(value, attrs[-1])
+
+        if self.callable_source:
+            value = value()
+        elif self.callable_source is None and is_simple_callable(value):
+            value = value()
         return self.to_native(value)
 
     def to_native(self, value):
         """
         Converts the field's value into it's simple representation.
+
+        Callable sources are normally called by `field_to_native`, but
+        functions and methods passed in directly are still called here.
         """
-        if is_simple_callable(value):
+        if isinstance(value, (types.MethodType, types.FunctionType)) and \
+                is_simple_callable(value):
             value = value()
-
         if is_protected_type(value):
             return value
         elif hasattr(value, '__iter__') and not isinstance(value, (dict, basestring)):
@@ -119,9 +236,10 @@ class WritableField(Field):
 
     def __init__(self, source=None, read_only=False, required=None,
                  validators=[], error_messages=None, widget=None,
-                 default=None, blank=None):
+                 default=None, blank=None, callable_source=None):
 
-        super(WritableField, self).__init__(source=source)
+        super(WritableField, self).__init__(source=source,
+                                            callable_source=callable_source)
 
         self.read_only = read_only
         if required is None:
@@ -292,6 +410,9 @@ class RelatedField(WritableField):
 
     def _set_queryset(self, queryset):
         self._queryset = queryset
+        # The widget may be shared with the field this one was copied from.
+        if not isinstance(self.widget, type):
+            self.widget = copy.copy(self.widget)
         self.widget.choices = self.choices
 
     queryset = property(_get_queryset, _set_queryset)
@@ -315,6 +436,8 @@ class RelatedField(WritableField):
         # Setting choices also sets the choices on the widget.
         # choices can be any iterable, but we call list() on it because
         # it will be consumed more than once.
+        if not isinstance(self.widget, type):
+            self.widget = copy.copy(self.widget)
         self._choices = self.widget.choices = list(value)
 
     choices = property(_get_choices, _set_choices)
@@ -339,6 +462,9 @@ class ManyRelatedMixin(object):
     """
     widget = widgets.SelectMultiple
 
+    # The maximum number of values to look up in one query.
+    batch_size = 500
+
     def field_to_native(self, obj, field_name):
         value = getattr(obj, self.source or field_name)
         return [self.to_native(item) for item in value.all()]
@@ -356,7 +482,78 @@ class ManyRelatedMixin(object):
         else:
             if value == ['']:
                 value = []
-        into[field_name] = [self.from_native(item) for item in value]
+        into[field_name] = self.from_native_many(value)
+
+    def from_native_many(self, values):
+        """
+        Convert a list of primitives into a list of model instances.
+
+        If the field provides `get_lookup`, the instances are fetched with
+        one `__in` query for each batch of values, rather than one query per
+        value.  Any values that aren't found that way are looked up with
+        `from_native`, so that errors are reported as for a single value.
+        Errors are collected for every invalid item, in order.
+        """
+        found = {}
+        if self.queryset is not None and hasattr(self, 'get_lookup'):
+            found = self.lookup_many(values)
+
+        ret = []
+        errors = []
+        for index, value in enumerate(values):
+            if index in found:
+                ret.append(found[index])
+                continue
+            try:
+                ret.append(self.from_native(value))
+            except ValidationError as err:
+                errors.extend(self.get_item_errors(index, err.messages))
+
+        if errors:
+            raise ValidationError(errors)
+        return ret
+
+    def lookup_many(self, values):
+        """
+        Fetch the instances for a list of values, returning a dict of
+        {index: instance} for each value that was found.
+        """
+        model = self.queryset.model
+        indexes = {}
+        for index, value in enumerate(values):
+            try:
+                lookup, key = self.get_lookup(value)
+                field = lookup == 'pk' and model._meta.pk or model._meta.get_field(lookup)
+                key = field.to_python(key)
+                indexes.setdefault((lookup, field), {}).setdefault(key, []).append(index)
+            except (ValidationError, FieldDoesNotExist, TypeError, ValueError):
+                continue  # Left to from_native
+
+        ret = {}
+        for (lookup, field), keys in indexes.items():
+            found = {}
+            keys_list = keys.keys()
+            for idx in range(0, len(keys_list), self.batch_size):
+                batch = keys_list[idx:idx + self.batch_size]
+                queryset = self.queryset.filter(**{lookup + '__in': batch})
+                for obj in queryset:
+                    key = field.to_python(getattr(obj, field.attname))
+                    if key in found:
+                        # Leave duplicates to from_native, which reports them
+                        found[key] = None
+                    else:
+                        found[key] = obj
+            for key, obj in found.items():
+                if obj is not None and key in keys:
+                    for index in keys[key]:
+                        ret[index] = obj
+        return ret
+
+    def get_item_errors(self, index, messages):
+        """
+        Return the error messages to report for the item at `index`.
+        """
+        return messages
 
 
 class ManyRelatedField(ManyRelatedMixin, RelatedField):
@@ -378,6 +575,10 @@ class PrimaryKeyRelatedField(RelatedField):
     default_read_only = False
     form_field_class = forms.ChoiceField
 
+    def __init__(self, *args, **kwargs):
+        super(PrimaryKeyRelatedField, self).__init__(*args, **kwargs)
+        self._attnames = {}
+
     # TODO: Remove these field hacks...
     def prepare_value(self, obj):
         return self.to_native(obj.pk)
@@ -400,22 +601,45 @@ class PrimaryKeyRelatedField(RelatedField):
         if self.queryset is None:
             raise Exception('Writable related fields must include a `queryset` argument')
 
+        lookup, value = self.get_lookup(data)
         try:
-            return self.queryset.get(pk=data)
+            return self.queryset.get(**{lookup: value})
         except ObjectDoesNotExist:
             msg = "Invalid pk '%s' - object does not exist." % smart_unicode(data)
             raise ValidationError(msg)
 
-    def field_to_native(self, obj, field_name):
+    def get_lookup(self, data):
+        """
+        Return a two-tuple of (lookup, value) that identifies the target.
+        """
+        return ('pk', data)
+
+    def get_attname(self, model, field_name):
+        """
+        Return the name of the foreign key column attribute for a forward
+        relationship, or `None` for a reverse relationship.
+        """
         try:
-            # Prefer obj.serializable_value for performance reasons
-            pk = obj.serializable_value(self.source or field_name)
-        except AttributeError:
-            # RelatedObject (reverse relationship)
-            obj = getattr(obj, self.source or field_name)
-            return self.to_native(obj.pk)
-        # Forward relationship
-        return self.to_native(pk)
+            return self._attnames[model]
+        except KeyError:
+            pass
+
+        try:
+            attname = model._meta.get_field(field_name).attname
+        except (AttributeError, FieldDoesNotExist):
+            attname = None
+        self._attnames[model] = attname
+        return attname
+
+    def field_to_native(self, obj, field_name):
+        source = self.source or field_name
+        attname = self.get_attname(obj.__class__, source)
+        if attname is not None:
+            # Forward relationship, use the foreign key column directly
+            return self.to_native(getattr(obj, attname))
+        # RelatedObject (reverse relationship)
+        obj = getattr(obj, source)
+        return self.to_native(obj.pk)
 
 
 class ManyPrimaryKeyRelatedField(ManyRelatedField):
@@ -438,10 +662,58 @@ class ManyPrimaryKeyRelatedField(ManyRelatedField):
             return desc
         return "%s - %s" % (desc, ident)
 
+    _related_pks = None
+
     def to_native(self, pk):
         return pk
 
+    def prepare_objects(self, objects, field_name):
+        """
+        Look up the related pks for all the objects at once, using a single
+        `values_list` query per batch of objects.
+        """
+        self._related_pks = None
+
+        if not objects:
+            return
+        model = objects[0].__class__
+        if any([obj.__class__ is not model for obj in objects]):
+            return
+
+        relation = get_relation(model, self.source or field_name)
+        if relation is None or relation[3] is None:
+            return
+        related_model, to_many, local, lookup = relation
+
+        # Reverse foreign keys may refer to a field other than the pk, in
+        # which case the related objects are filtered by that field.
+        self._owner_attr = 'pk'
+        descriptor = getattr(model, self.source or field_name)
+        if isinstance(descriptor, ForeignRelatedObjectsDescriptor):
+            self._owner_attr = descriptor.related.field.rel.get_related_field().attname
+
+        keys = [getattr(obj, self._owner_attr, None) for obj in objects]
+        if None in keys:
+            return
+
+        related_pks = dict([(key, []) for key in keys])
+        manager = related_model._default_manager
+        for idx in range(0, len(keys), self.batch_size):
+            batch = keys[idx:idx + self.batch_size]
+            queryset = manager.filter(**{lookup + '__in': batch})
+            for owner, pk in queryset.values_list(lookup, 'pk'):
+                related_pks[owner].append(pk)
+        self._related_pks = related_pks
+
     def field_to_native(self, obj, field_name):
+        if self._related_pks is not None:
+            try:
+                pks = self._related_pks[getattr(obj, self._owner_attr)]
+            except (KeyError, AttributeError):
+                pass
+            else:
+                return [self.to_native(pk) for pk in pks]
+
         try:
             # Prefer obj.serializable_value for performance reasons
             queryset = obj.serializable_value(self.source or field_name)
@@ -456,12 +728,19 @@ class ManyPrimaryKeyRelatedField(ManyRelatedField):
         if self.queryset is None:
             raise Exception('Writable related fields must include a `queryset` argument')
 
+        lookup, value = self.get_lookup(data)
         try:
-            return self.queryset.get(pk=data)
+            return self.queryset.get(**{lookup: value})
         except ObjectDoesNotExist:
             msg = "Invalid pk '%s' - object does not exist." % smart_unicode(data)
             raise ValidationError(msg)
 
+    def get_lookup(self, data):
+        """
+        Return a two-tuple of (lookup, value) that identifies the target.
+        """
+        return ('pk', data)
+
 ### Slug relationships
 
 
@@ -481,12 +760,19 @@ class SlugRelatedField(RelatedField):
         if self.queryset is None:
             raise Exception('Writable related fields must include a `queryset` argument')
 
+        lookup, value = self.get_lookup(data)
         try:
-            return self.queryset.get(**{self.slug_field: data})
+            return self.queryset.get(**{lookup: value})
         except ObjectDoesNotExist:
             raise ValidationError('Object with %s=%s does not exist.' %
                                   (self.slug_field, unicode(data)))
 
+    def get_lookup(self, data):
+        """
+        Return a two-tuple of (lookup, value) that identifies the target.
+        """
+        return (self.slug_field, data)
+
 
 class ManySlugRelatedField(ManyRelatedMixin, SlugRelatedField):
     form_field_class = forms.MultipleChoiceField
@@ -494,7 +780,42 @@ class ManySlugRelatedField(ManyRelatedMixin, SlugRelatedField):
 
 ### Hyperlinked relationships
 
-class HyperlinkedRelatedField(RelatedField):
+class HyperlinkedMixin(object):
+    """
+    Reverses the URL for an object, trying the pk and slug url kwargs in turn.
+    """
+    _url_variant = 0
+
+    def get_url(self, obj, view_name, request, format):
+        """
+        Return the URL for the object.  The URL kwargs that succeed are
+        remembered, and tried first for subsequent objects.
+        """
+        pk = obj.pk
+        slug = getattr(obj, self.slug_field, None)
+        variants = [{self.pk_url_kwarg: pk}]
+        if slug:
+            variants.append({self.slug_url_kwarg: slug})
+            variants.append({self.pk_url_kwarg: pk, self.slug_url_kwarg: slug})
+
+        order = range(len(variants))
+        if self._url_variant < len(variants):
+            order.remove(self._url_variant)
+            order.insert(0, self._url_variant)
+
+        for idx in order:
+            try:
+                url = reverse_cached(view_name, variants[idx],
+                                     request=request, format=format)
+            except Exception:
+                continue
+            self._url_variant = idx
+            return url
+
+        raise ValidationError('Could not resolve URL for field using view name "%s"' % view_name)
+
+
+class HyperlinkedRelatedField(HyperlinkedMixin, RelatedField):
     """
     Represents a to-one relationship, using hyperlinking.
     """
@@ -535,40 +856,15 @@ class HyperlinkedRelatedField(RelatedField):
             }
         request = self.context.get('request', None)
         format = self.format or self.context.get('format', None)
-        pk = getattr(obj, 'pk', None)
-        if pk is None:
+        if getattr(obj, 'pk', None) is None:
             return
-        kwargs = {self.pk_url_kwarg: pk}
-        try:
-            return reverse(view_name, kwargs=kwargs, request=request, format=format)
-        except:
-            pass
-
-        slug = getattr(obj, self.slug_field, None)
-
-        if not slug:
-            raise ValidationError('Could not resolve URL for field using view name "%s"' % view_name)
-
-        kwargs = {self.slug_url_kwarg: slug}
-        try:
-            return reverse(view_name, kwargs=kwargs, request=request, format=format)
-        except:
-            pass
-
-        kwargs = {self.pk_url_kwarg: obj.pk, self.slug_url_kwarg: slug}
-        try:
-            return reverse(view_name, kwargs=kwargs, request=request, format=format)
-        except:
-            pass
-
-        raise ValidationError('Could not resolve URL for field using view name "%s"', view_name)
-
-    def from_native(self, value):
-        # Convert URL -> model instance pk
-        # TODO: Use values_list
-        if self.queryset is None:
-            raise Exception('Writable related fields must include a `queryset` argument')
+        return self.get_url(obj, view_name, request, format)
 
+    def get_lookup(self, value):
+        """
+        Given a hyperlink, return a two-tuple of (lookup, value) that
+        identifies the target in the queryset, eg. ('pk', '1').
+        """
         if value.startswith('http:') or value.startswith('https:'):
             # If needed convert absolute URLs to relative path
             value = urlparse(value).path
@@ -577,29 +873,33 @@ class HyperlinkedRelatedField(RelatedField):
                 value = '/' + value[len(prefix):]
 
         try:
-            match = resolve(value)
+            url_name, kwargs = resolve_cached(value)
         except:
             raise ValidationError('Invalid hyperlink - No URL match')
 
-        if match.url_name != self.view_name:
+        if url_name != self.view_name:
             raise ValidationError('Invalid hyperlink - Incorrect URL match')
 
-        pk = match.kwargs.get(self.pk_url_kwarg, None)
-        slug = match.kwargs.get(self.slug_url_kwarg, None)
+        pk = kwargs.get(self.pk_url_kwarg, None)
+        slug = kwargs.get(self.slug_url_kwarg, None)
 
         # Try explicit primary key.
         if pk is not None:
-            queryset = self.queryset.filter(pk=pk)
+            return ('pk', pk)
         # Next, try looking up by slug.
         elif slug is not None:
-            slug_field = self.get_slug_field()
-            queryset = self.queryset.filter(**{slug_field: slug})
+            return (self.get_slug_field(), slug)
         # If none of those are defined, it's an error.
-        else:
-            raise ValidationError('Invalid hyperlink')
+        raise ValidationError('Invalid hyperlink')
 
+    def from_native(self, value):
+        # Convert URL -> model instance pk
+        if self.queryset is None:
+            raise Exception('Writable related fields must include a `queryset` argument')
+
+        lookup, value = self.get_lookup(value)
         try:
-            obj = queryset.get()
+            obj = self.queryset.get(**{lookup: value})
         except ObjectDoesNotExist:
             raise ValidationError('Invalid hyperlink - object does not exist.')
         return obj
@@ -611,8 +911,12 @@ class ManyHyperlinkedRelatedField(ManyRelatedMixin, HyperlinkedRelatedField):
     """
     form_field_class = forms.MultipleChoiceField
 
+    def get_item_errors(self, index, messages):
+        # Hyperlink errors don't include the hyperlink, so include the index
+        return ['Item %d: %s' % (index, msg) for msg in messages]
+
 
-class HyperlinkedIdentityField(Field):
+class HyperlinkedIdentityField(HyperlinkedMixin, Field):
     """
     Represents the instance, or a property on the instance, using hyperlinking.
     """
@@ -644,30 +948,7 @@ class HyperlinkedIdentityField(Field):
                 'view':view_name,
                 'namespace':view_namespace
             }
-        kwargs = {self.pk_url_kwarg: obj.pk}
-        try:
-            return reverse(view_name, kwargs=kwargs, request=request, format=format)
-        except:
-            pass
-
-        slug = getattr(obj, self.slug_field, None)
-
-        if not slug:
-            raise ValidationError('Could not resolve URL for field using view name "%s"' % view_name)
-
-        kwargs = {self.slug_url_kwarg: slug}
-        try:
-            return reverse(view_name, kwargs=kwargs, request=request, format=format)
-        except:
-            pass
-
-        kwargs = {self.pk_url_kwarg: obj.pk, self.slug_url_kwarg: slug}
-        try:
-            return reverse(view_name, kwargs=kwargs, request=request, format=format)
-        except:
-            pass
-
-        raise ValidationError('Could not resolve URL for field using view name "%s"', view_name)
+        return self.get_url(obj, view_name, request, format)
 
 class HyperlinkedViewField(HyperlinkedIdentityField):
     """
@@ -2,12 +2,21 @@
 Generic views that provide commonly needed behaviour.
 """
 
+import logging
+from hashlib import md5
+from django.db.models import Count, Max
+from django.utils.encoding import smart_str
 from rest_framework import views, mixins
 from rest_framework.settings import api_settings
+from rest_framework.utils.lru import LRUCache
+from rest_framework.utils.queryplan import get_query_plan
 from django.views.generic.detail import SingleObjectMixin
 from django.views.generic.list import MultipleObjectMixin
 
 
+logger = logging.getLogger('rest_framework.generics')
+
+
 ### Base classes for the generic views ###
 
 class GenericAPIView(views.APIView):
@@ -17,6 +26,17 @@ class GenericAPIView(views.APIView):
     serializer_class = None
     model_serializer_class = api_settings.DEFAULT_MODEL_SERIALIZER_CLASS
 
+    # Serializer classes built on the fly are cached, so that the fields
+    # they compile on first use may be reused across requests.  The cache
+    # is bounded, as views may build a new serializer class per request.
+    _serializer_class_cache = LRUCache(256)
+
+    # A model field that is updated whenever an object changes, such as a
+    # `DateTimeField` with `auto_now=True`.  If set, `ETag` and
+    # `Last-Modified` headers are derived from it, and conditional `GET`
+    # requests are answered without serializing the data.
+    last_modified_field = None
+
     def get_serializer_context(self):
         """
         Extra context provided to the serializer class.
@@ -36,13 +56,28 @@ class GenericAPIView(views.APIView):
         serializer_class = self.serializer_class
 
         if serializer_class is None:
-            class DefaultSerializer(self.model_serializer_class):
-                class Meta:
-                    model = self.model
-            serializer_class = DefaultSerializer
+            key = (self.model_serializer_class, self.model)
+            serializer_class = self._serializer_class_cache.get(key)
+            if serializer_class is None:
+                class DefaultSerializer(self.model_serializer_class):
+                    class Meta:
+                        model = self.model
+                serializer_class = DefaultSerializer
+                self._serializer_class_cache.set(key, serializer_class)
 
         return serializer_class
 
+    def get_etag(self, version):
+        """
+        Return an etag for the given version of the view's data.  The etag
+        also varies with the URL, the accepted media type and any `Range`
+        header, as these change the representation.
+        """
+        request = self.request
+        key = u'%s:%s:%s:%s' % (request.get_full_path(), request.accepted_media_type,
+                                request.META.get('HTTP_RANGE', ''), version)
+        return md5(smart_str(key)).hexdigest()
+
     def get_serializer(self, instance=None, data=None, files=None):
         # TODO: add support for files
         # TODO: add support for seperate serializer/deserializer
@@ -59,6 +94,8 @@ class MultipleObjectAPIView(MultipleObjectMixin, GenericAPIView):
     pagination_serializer_class = api_settings.DEFAULT_PAGINATION_SERIALIZER_CLASS
     paginate_by = api_settings.PAGINATE_BY
     filter_backend = api_settings.FILTER_BACKEND
+    query_planning = api_settings.QUERY_PLANNING
+    query_plan_debug = api_settings.QUERY_PLAN_DEBUG
 
     def filter_queryset(self, queryset):
         if not self.filter_backend:
@@ -66,17 +103,62 @@ class MultipleObjectAPIView(MultipleObjectMixin, GenericAPIView):
         backend = self.filter_backend()
         return backend.filter_queryset(self.request, queryset, self)
 
+    def plan_queryset(self, queryset):
+        """
+        Apply the `select_related` and `prefetch_related` lookups required
+        by the serializer, to avoid issuing queries for each object.
+
+        May be disabled by setting `.query_planning = False`.  Querysets
+        that defer fields, with `.only()` or `.defer()`, are left as they
+        are, since the lookups may conflict with the deferred fields.
+        """
+        if not self.query_planning or not hasattr(queryset, 'query'):
+            return queryset
+        deferred, defer = queryset.query.deferred_loading
+        if deferred or not defer:
+            return queryset
+
+        plan = get_query_plan(self.get_serializer(), queryset.model)
+        if self.query_plan_debug:
+            logger.debug('Query plan for %s: %s' %
+                         (self.__class__.__name__, plan))
+        return plan.apply(queryset)
+
     def get_filtered_queryset(self):
-        return self.filter_queryset(self.get_queryset())
+        queryset = self.filter_queryset(self.get_queryset())
+        return self.plan_queryset(queryset)
+
+    def get_validators(self, queryset):
+        """
+        Return a two-tuple of (etag, last modified datetime) for the
+        queryset, computed with a single aggregate query, or `(None, None)`
+        if `.last_modified_field` isn't set.
+
+        The object count is part of the etag, so that deletions change it.
+        """
+        if not self.last_modified_field or not hasattr(queryset, 'aggregate'):
+            return None, None
+        result = queryset.order_by().aggregate(
+            last_modified=Max(self.last_modified_field), count=Count('pk'))
+        last_modified = result['last_modified']
+        version = '%s:%s' % (last_modified, result['count'])
+        return self.get_etag(version), last_modified
 
     def get_pagination_serializer_class(self):
         """
         Return the class to use for the pagination serializer.
         """
+        object_serializer_class = self.get_serializer_class()
+        key = (self.pagination_serializer_class, object_serializer_class)
+        serializer_class = self._serializer_class_cache.get(key)
+        if serializer_class is not None:
+            return serializer_class
+
         class SerializerClass(self.pagination_serializer_class):
             class Meta:
                 object_serializer_class = self.get_serializer_class()
 
+        self._serializer_class_cache.set(key, SerializerClass)
         return SerializerClass
 
     def get_pagination_serializer(self, page=None):
@@ -101,6 +183,17 @@ class SingleObjectAPIView(SingleObjectMixin, GenericAPIView):
             self.permission_denied(self.request)
         return obj
 
+    def get_validators(self, obj):
+        """
+        Return a two-tuple of (etag, last modified datetime) for the
+        object, or `(None, None)` if `.last_modified_field` isn't set.
+        """
+        if not self.last_modified_field:
+            return None, None
+        last_modified = getattr(obj, self.last_modified_field)
+        version = '%s:%s' % (obj.pk, last_modified)
+        return self.get_etag(version), last_modified
+
 
 ### Concrete view classes that provide method handlers ###
 ### by composing the mixin classes with a base view.   ###
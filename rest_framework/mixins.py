@@ -20,6 +20,7 @@ class CreateModelMixin(object):
         if serializer.is_valid():
             self.pre_save(serializer.object)
             self.object = serializer.save()
+            self.invalidate_cached_responses()
             headers = self.get_success_headers(serializer.data)
             return Response(serializer.data, status=status.HTTP_201_CREATED, headers=headers)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -61,6 +62,12 @@ class ListModelMixin(object):
     
     def list(self, request, *args, **kwargs):
         self.object_list = self.get_filtered_queryset()
+
+        etag, last_modified = self.get_validators(self.object_list)
+        not_modified = self.check_not_modified(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
         status_code = None
         headers = {}
         partial_content = False
@@ -190,6 +197,12 @@ class RetrieveModelMixin(object):
     """
     def retrieve(self, request, *args, **kwargs):
         self.object = self.get_object()
+
+        etag, last_modified = self.get_validators(self.object)
+        not_modified = self.check_not_modified(request, etag, last_modified)
+        if not_modified is not None:
+            return not_modified
+
         serializer = self.get_serializer(self.object)
         return Response(serializer.data)
 
@@ -212,6 +225,7 @@ class UpdateModelMixin(object):
         if serializer.is_valid():
             self.pre_save(serializer.object)
             self.object = serializer.save()
+            self.invalidate_cached_responses()
             return Response(serializer.data, status=success_status)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -239,4 +253,5 @@ class DestroyModelMixin(object):
     def destroy(self, request, *args, **kwargs):
         self.object = self.get_object()
         self.object.delete()
+        self.invalidate_cached_responses()
         return Response(status=status.HTTP_204_NO_CONTENT)
@@ -1,7 +1,9 @@
 from django.http import Http404
 from rest_framework import exceptions
 from rest_framework.settings import api_settings
+from rest_framework.utils.lru import LRUCache
 from rest_framework.utils.mediatypes import order_by_precedence, media_type_matches
+from rest_framework.utils.mediatypes import parse_media_type
 
 
 class BaseContentNegotiation(object):
@@ -14,6 +16,14 @@ class BaseContentNegotiation(object):
 
 class DefaultContentNegotiation(BaseContentNegotiation):
     settings = api_settings
+    cache_size = 256
+    stateless = True
+
+    def __init__(self):
+        # Maps (accept list, format, renderers) to (renderer index, media
+        # type).  The negotiator is shared by all requests to a view, and
+        # clients send few distinct Accept headers, so this is usually a hit.
+        self.renderer_cache = LRUCache(self.cache_size)
 
     def select_parser(self, request, parsers):
         """
@@ -32,21 +42,44 @@ class DefaultContentNegotiation(BaseContentNegotiation):
         """
         # Allow URL style format override.  eg. "?format=json
         format_query_param = self.settings.URL_FORMAT_OVERRIDE
-        format = format_suffix or request.GET.get(format_query_param)
+        format = format_suffix
+        if not format and format_query_param in request.GET:
+            format = request.GET[format_query_param]
+
+        accepts = self.get_accept_list(request)
+
+        key = (tuple(accepts), format,
+               tuple([(renderer.__class__, renderer.media_type, renderer.format)
+                      for renderer in renderers]))
+        cached = self.renderer_cache.get(key)
+        if cached is not None:
+            index, media_type = cached
+            return renderers[index], media_type
 
+        available = renderers
         if format:
-            renderers = self.filter_renderers(renderers, format)
+            available = self.filter_renderers(renderers, format)
 
-        accepts = self.get_accept_list(request)
+        renderer, media_type = self.match_renderer(accepts, available)
+        self.renderer_cache.set(key, (renderers.index(renderer), media_type))
+        return renderer, media_type
+
+    def match_renderer(self, accepts, renderers):
+        """
+        Given a list of accepted media type strings and a list of renderers,
+        return a two-tuple of (renderer, media type), or raise
+        `NotAcceptable`.
+        """
+        renderer_types = [parse_media_type(renderer.media_type) for renderer in renderers]
 
         # Check the acceptable media types against each renderer,
         # attempting more specific media types first
         # NB. The inner loop here isn't as bad as it first looks :)
         #     Worst case is we're looping over len(accept_list) * len(self.renderers)
         for media_type_set in order_by_precedence(accepts):
-            for renderer in renderers:
+            for renderer, renderer_type in zip(renderers, renderer_types):
                 for media_type in media_type_set:
-                    if media_type_matches(renderer.media_type, media_type):
+                    if renderer_type.match(parse_media_type(media_type)):
                         # Return the most specific media type as accepted.
                         if len(renderer.media_type) > len(media_type):
                             # Eg client requests '*/*'
@@ -78,5 +111,7 @@ class DefaultContentNegotiation(BaseContentNegotiation):
         Allows URL style accept override.  eg. "?accept=application/json"
         """
         header = request.META.get('HTTP_ACCEPT', '*/*')
-        header = request.GET.get(self.settings.URL_ACCEPT_OVERRIDE, header)
+        # QueryDict.get() is slow for missing keys, as it formats a KeyError.
+        if self.settings.URL_ACCEPT_OVERRIDE in request.GET:
+            header = request.GET[self.settings.URL_ACCEPT_OVERRIDE]
         return [token.strip() for token in header.split(',')]
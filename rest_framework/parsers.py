@@ -8,13 +8,14 @@ on the request, such as form content or json encoded data.
 from django.http import QueryDict
 from django.http.multipartparser import MultiPartParser as DjangoMultiPartParser
 from django.http.multipartparser import MultiPartParserError
-from django.utils import simplejson as json
-from rest_framework.compat import yaml, ETParseError
+from rest_framework.compat import yaml, ElementTree, ETParseError
 from rest_framework.exceptions import ParseError
-from xml.etree import ElementTree as ET
+from rest_framework.utils import encoders
 from xml.parsers.expat import ExpatError
 import datetime
 import decimal
+import itertools
+import re
 
 
 class DataAndFiles(object):
@@ -30,6 +31,7 @@ class BaseParser(object):
     """
 
     media_type = None
+    streaming = False  # Set to True if `.parse_stream()` parses incrementally
 
     def parse(self, stream, media_type=None, parser_context=None):
         """
@@ -39,6 +41,14 @@ class BaseParser(object):
         """
         raise NotImplementedError(".parse() must be overridden.")
 
+    def parse_stream(self, stream, media_type=None, parser_context=None):
+        """
+        Same as `.parse()`, but may return a lazy iterable, such as a
+        generator, that only reads and parses the stream as it is consumed.
+        Only used if the parser sets `streaming`, and the view opts in.
+        """
+        return self.parse(stream, media_type, parser_context)
+
 
 class JSONParser(BaseParser):
     """
@@ -46,6 +56,10 @@ class JSONParser(BaseParser):
     """
 
     media_type = 'application/json'
+    backend = None  # The name of a json module, defaults to JSON_BACKEND
+    streaming = True
+    stream_chunk_size = 64 * 1024  # The number of bytes to read at a time
+    stateless = True
 
     def parse(self, stream, media_type=None, parser_context=None):
         """
@@ -55,9 +69,184 @@ class JSONParser(BaseParser):
         `files` will always be `None`.
         """
         try:
-            return json.load(stream)
+            return encoders.get_json_backend(self.backend).load(stream)
+        except ValueError, exc:
+            raise ParseError('JSON parse error - %s' % unicode(exc))
+
+    def parse_stream(self, stream, media_type=None, parser_context=None):
+        """
+        If the content is a json array, returns a generator of the elements
+        of the array, which reads and decodes the content as it is consumed,
+        so only one element needs to be held in memory at a time.
+
+        Other content is parsed in full, as with `.parse()`.
+        """
+        content = ''
+        while not content.strip():
+            chunk = stream.read(self.stream_chunk_size)
+            if not chunk:
+                break
+            content += chunk
+
+        backend = encoders.get_json_backend(self.backend)
+        if content.lstrip()[:1] != '[':
+            try:
+                return backend.loads(content + stream.read())
+            except ValueError, exc:
+                raise ParseError('JSON parse error - %s' % unicode(exc))
+
+        start = _whitespace_re.match(content).end() + 1
+        return _iter_json_array(stream, backend.get_decoder(), content, start,
+                                self.stream_chunk_size)
+
+
+_whitespace_re = re.compile(r'[ \t\n\r]*')
+
+
+# The characters that change the nesting of json content, outside of and
+# inside strings.
+_json_structure_re = re.compile(r'["\[\]{},]')
+_json_string_re = re.compile(r'["\\]')
+
+
+def _find_json_delimiter(content, pos, state):
+    """
+    Scan `content` from `pos` for the comma or closing bracket that ends the
+    current element of a json array.  Returns a two-tuple of the position of
+    the delimiter, or -1 if it isn't in `content`, and the scanner state,
+    which is passed back in to continue scanning the following content.
+
+    Each character is only scanned once, however many pieces an element is
+    split into, so large elements are scanned in linear time.
+    """
+    depth, in_string, escaped = state
+    length = len(content)
+    while pos < length:
+        if escaped:
+            pos += 1
+            escaped = False
+        elif in_string:
+            match = _json_string_re.search(content, pos)
+            if match is None:
+                break
+            pos = match.end()
+            if match.group() == '\\':
+                escaped = True
+            else:
+                in_string = False
+        else:
+            match = _json_structure_re.search(content, pos)
+            if match is None:
+                break
+            char, pos = match.group(), match.end()
+            if char == '"':
+                in_string = True
+            elif char in '[{':
+                depth += 1
+            elif char != ',' and depth:
+                depth -= 1
+            elif not depth:
+                return match.start(), (depth, in_string, escaped)
+    return -1, (depth, in_string, escaped)
+
+
+def _decode_json_element(decoder, content):
+    """
+    Decode a single json value, surrounded by optional whitespace.
+    """
+    pos = _whitespace_re.match(content).end()
+    item, end = decoder.raw_decode(content, pos)
+    end = _whitespace_re.match(content, end).end()
+    if end != len(content):
+        raise ValueError('Expecting , delimiter: char %d' % end)
+    return item
+
+
+def _iter_json_array(stream, decoder, content, pos, chunk_size):
+    """
+    Yields the elements of a json array, where `pos` is the position after
+    the opening bracket in `content`.  Further content is read from the
+    stream whenever an element, or the delimiter following it, is incomplete.
+
+    Elements that are split over chunks are scanned for their end, and only
+    decoded once they are complete, so that large elements aren't decoded
+    again for each chunk that is read.
+    """
+    first = True
+    while True:
+        # Decode the element directly, if it's complete.
+        pos = _whitespace_re.match(content, pos).end()
+        if first and content[pos:pos + 1] == ']':
+            pos += 1
+            break
+        try:
+            item, end = decoder.raw_decode(content, pos)
+            end = _whitespace_re.match(content, end).end()
+        except ValueError:
+            end = None
+        if end is not None and content[end:end + 1] in (',', ']'):
+            yield item
+            first = False
+            pos = end + 1
+            if content[end] == ']':
+                break
+            continue
+
+        # Otherwise find the end of the element, reading as many chunks as
+        # are needed, and then decode it.
+        pieces = []
+        state = (0, False, False)
+        scan = pos
+        while True:
+            end, state = _find_json_delimiter(content, scan, state)
+            if end >= 0:
+                break
+            pieces.append(content[pos:])
+            content = stream.read(chunk_size)
+            if not content:
+                raise ParseError('JSON parse error - Unexpected end of content')
+            pos = scan = 0
+        pieces.append(content[pos:end])
+        element = ''.join(pieces)
+        if first and content[end] == ']' and not element.strip():
+            pos = end + 1
+            break
+        if content[end] not in (',', ']'):
+            raise ParseError('JSON parse error - Unexpected %s: char %d' %
+                             (content[end], end))
+        try:
+            item = _decode_json_element(decoder, element)
         except ValueError, exc:
             raise ParseError('JSON parse error - %s' % unicode(exc))
+        yield item
+        first = False
+        pos = end + 1
+        if content[end] == ']':
+            break
+
+    if (content[pos:] + stream.read()).strip():
+        raise ParseError('JSON parse error - Extra data after the array')
+
+
+class MessagePackParser(BaseParser):
+    """
+    Parses MessagePack-serialized data.
+    """
+
+    media_type = 'application/msgpack'
+    stateless = True
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        """
+        Returns a 2-tuple of `(data, files)`.
+
+        `data` will be an object which is the parsed content of the response.
+        `files` will always be `None`.
+        """
+        try:
+            return encoders.msgpack_loads(stream.read())
+        except (ValueError, TypeError), exc:
+            raise ParseError('MessagePack parse error - %s' % unicode(exc))
 
 
 class YAMLParser(BaseParser):
@@ -66,6 +255,9 @@ class YAMLParser(BaseParser):
     """
 
     media_type = 'application/yaml'
+    decoder = encoders.SafeLoader
+    streaming = True
+    stateless = True
 
     def parse(self, stream, media_type=None, parser_context=None):
         """
@@ -75,8 +267,29 @@ class YAMLParser(BaseParser):
         `files` will always be `None`.
         """
         try:
-            return yaml.safe_load(stream)
-        except (ValueError, yaml.parser.ParserError), exc:
+            return yaml.load(stream, Loader=self.decoder)
+        except (ValueError, yaml.YAMLError), exc:
+            raise ParseError('YAML parse error - %s' % unicode(exc))
+
+    def parse_stream(self, stream, media_type=None, parser_context=None):
+        """
+        If the content is a stream of multiple YAML documents, returns a
+        generator of the documents, which parses the content as it is
+        consumed.  Otherwise the single document is returned.
+        """
+        documents = self._iter_documents(stream)
+        first = next(documents, None)
+        try:
+            second = documents.next()
+        except StopIteration:
+            return first
+        return itertools.chain([first, second], documents)
+
+    def _iter_documents(self, stream):
+        try:
+            for document in yaml.load_all(stream, Loader=self.decoder):
+                yield document
+        except (ValueError, yaml.YAMLError), exc:
             raise ParseError('YAML parse error - %s' % unicode(exc))
 
 
@@ -86,6 +299,7 @@ class FormParser(BaseParser):
     """
 
     media_type = 'application/x-www-form-urlencoded'
+    stateless = True
 
     def parse(self, stream, media_type=None, parser_context=None):
         """
@@ -104,6 +318,7 @@ class MultiPartParser(BaseParser):
     """
 
     media_type = 'multipart/form-data'
+    stateless = True
 
     def parse(self, stream, media_type=None, parser_context=None):
         """
@@ -125,65 +340,122 @@ class MultiPartParser(BaseParser):
             raise ParseError('Multipart form parse error - %s' % unicode(exc))
 
 
+# Regexes matching the values that `XMLParser` converts to each type.  These
+# match the formats that `datetime.strptime`, `int` and `Decimal` accept.
+_xml_datetime_re = re.compile(r'^\d{4}-\d{1,2}-\d{1,2}\s+\d{1,2}:\d{1,2}:\d{1,2}$')
+_xml_int_re = re.compile(r'^\s*[-+]?\d+\s*$', re.UNICODE)
+_xml_decimal_re = re.compile(r"""
+    ^\s*[-+]?(
+        ((\d+(\.\d*)?|\.\d+)(e[-+]?\d+)?) |
+        (inf(inity)?) |
+        (s?nan\d*)
+    )\s*$
+""", re.VERBOSE | re.IGNORECASE | re.UNICODE)
+
+
 class XMLParser(BaseParser):
     """
     XML parser.
     """
 
     media_type = 'application/xml'
+    streaming = True
+    stateless = True
 
     def parse(self, stream, media_type=None, parser_context=None):
-        try:
-            tree = ET.parse(stream)
-        except (ExpatError, ETParseError, ValueError), exc:
-            raise ParseError('XML parse error - %s' % unicode(exc))
-        data = self._xml_convert(tree.getroot())
+        children = self._iter_children(stream)
+        return self._collect(children.next(), children)
 
-        return data
+    def parse_stream(self, stream, media_type=None, parser_context=None):
+        """
+        If the root element is a list, returns a generator of the list items,
+        which parses the content as it is consumed.  Otherwise the content
+        is parsed in full, as with `.parse()`.
+        """
+        children = self._iter_children(stream)
+        tag, value = children.next()
+        if tag != 'list-item':
+            return self._collect((tag, value), children)
+        return itertools.chain([value], (value for tag, value in children))
 
-    def _xml_convert(self, element):
+    def _collect(self, first, children):
         """
-        convert the xml `element` into the corresponding python object
+        Build the data for the root element, given the first two-tuple from
+        `_iter_children()`, and the remaining children.
         """
+        tag, value = first
+        if tag is None:
+            return value
 
-        children = element.getchildren()
+        # if the fist child tag is list-item means all children are list-item
+        if tag == 'list-item':
+            return [value] + [value for tag, value in children]
+        data = {tag: value}
+        for tag, value in children:
+            data[tag] = value
+        return data
 
-        if len(children) == 0:
-            return self._type_convert(element.text)
-        else:
-            # if the fist child tag is list-item means all children are list-item
-            if children[0].tag == "list-item":
-                data = []
-                for child in children:
-                    data.append(self._xml_convert(child))
-            else:
-                data = {}
-                for child in children:
-                    data[child.tag] = self._xml_convert(child)
+    def _iter_children(self, stream):
+        """
+        Parse the content incrementally, yielding a two-tuple of
+        (tag, value) for each child of the root element as soon as it has
+        been converted.  If the root element has no children, a single
+        two-tuple of (None, value) is yielded for its text instead.
 
-            return data
+        Elements are discarded once they have been converted, so that memory
+        isn't held for the parts of the document that have been consumed.
+        """
+        stack = []  # A [data, element] pair for each open element
+        has_children = False
+        try:
+            for event, element in ElementTree.iterparse(stream, ('start', 'end')):
+                if event == 'start':
+                    stack.append([None, element])
+                    continue
+
+                data = stack.pop()[0]
+                if data is None:
+                    data = self._type_convert(element.text)
+                if not stack:
+                    if not has_children:
+                        yield None, data
+                    return
+
+                tag = element.tag
+                parent = stack[-1]
+                parent[1].remove(element)
+                if len(stack) == 1:
+                    has_children = True
+                    yield tag, data
+                elif parent[0] is None:
+                    # if the fist child tag is list-item means all children are list-item
+                    parent[0] = tag == 'list-item' and [data] or {tag: data}
+                elif isinstance(parent[0], list):
+                    parent[0].append(data)
+                else:
+                    parent[0][tag] = data
+        except (ExpatError, ETParseError, ValueError), exc:
+            raise ParseError('XML parse error - %s' % unicode(exc))
 
     def _type_convert(self, value):
         """
         Converts the value returned by the XMl parse into the equivalent
-        Python type
+        Python type.  The value is classified using regexes, and only
+        converted if it has the right format for the type.
         """
         if value is None:
             return value
 
-        try:
-            return datetime.datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
-        except ValueError:
-            pass
+        if _xml_datetime_re.match(value):
+            try:
+                return datetime.datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
+            except ValueError:
+                pass
 
-        try:
+        if _xml_int_re.match(value):
             return int(value)
-        except ValueError:
-            pass
 
-        try:
+        if _xml_decimal_re.match(value):
             return decimal.Decimal(value)
-        except decimal.InvalidOperation:
-            pass
 
         return value
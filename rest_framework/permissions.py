@@ -25,6 +25,8 @@ class AllowAny(BasePermission):
     permission_classes list, but it's useful because it makes the intention
     more explicit.
     """
+    stateless = True
+
     def has_permission(self, request, view, obj=None):
         return True
 
@@ -34,6 +36,8 @@ class IsAuthenticated(BasePermission):
     Allows access only to authenticated users.
     """
 
+    stateless = True
+
     def has_permission(self, request, view, obj=None):
         if request.user and request.user.is_authenticated():
             return True
@@ -45,6 +49,8 @@ class IsAdminUser(BasePermission):
     Allows access only to admin users.
     """
 
+    stateless = True
+
     def has_permission(self, request, view, obj=None):
         if request.user and request.user.is_staff:
             return True
@@ -56,6 +62,8 @@ class IsAuthenticatedOrReadOnly(BasePermission):
     The request is authenticated as a user, or is a read-only request.
     """
 
+    stateless = True
+
     def has_permission(self, request, view, obj=None):
         if (request.method in SAFE_METHODS or
             request.user and
@@ -76,6 +84,8 @@ class DjangoModelPermissions(BasePermission):
     provide a `.model` attribute, such as the generic class-based views.
     """
 
+    stateless = True
+
     # Map methods into required permission codes.
     # Override this if you need to also provide 'view' permissions,
     # or if you want to provide custom permission codes.
@@ -7,17 +7,21 @@ on the response, such as JSON encoded data or HTML output.
 REST framework also provides an HTML renderer the renders the browseable API.
 """
 import copy
+import csv
+import itertools
 import string
+from xml.sax.saxutils import escape
 from django import forms
 from django.http.multipartparser import parse_header
 from django.template import RequestContext, loader, Template
-from django.utils import simplejson as json
-from rest_framework.compat import yaml
+from django.utils.datastructures import SortedDict
+from django.utils.encoding import smart_str, smart_unicode
+from rest_framework.compat import StringIO, yaml
 from rest_framework.exceptions import ConfigurationError
+from rest_framework.pagination import BasePaginationSerializer
 from rest_framework.settings import api_settings
 from rest_framework.request import clone_request
-from rest_framework.utils import dict2xml
-from rest_framework.utils import encoders
+from rest_framework.utils import encoders, is_lazy_iterable
 from rest_framework.utils.breadcrumbs import get_breadcrumbs
 from rest_framework import VERSION
 from rest_framework import serializers, parsers
@@ -31,10 +35,18 @@ class BaseRenderer(object):
 
     media_type = None
     format = None
+    streaming = False  # Set to True if `.render_stream()` renders incrementally
 
     def render(self, data, accepted_media_type=None, renderer_context=None):
         raise NotImplemented('Renderer class requires .render() to be implemented')
 
+    def render_stream(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render lazily iterable `data`, such as a generator, returning an
+        iterator of chunks.  Only used if the renderer sets `streaming`.
+        """
+        yield self.render(data, accepted_media_type, renderer_context)
+
 
 class JSONRenderer(BaseRenderer):
     """
@@ -44,14 +56,13 @@ class JSONRenderer(BaseRenderer):
     media_type = 'application/json'
     format = 'json'
     encoder_class = encoders.JSONEncoder
+    backend = None  # The name of a json module, defaults to JSON_BACKEND
+    compact = None  # Omit whitespace from the output, defaults to COMPACT_JSON
+    streaming = True
+    stream_chunk_size = 100  # The number of items to encode for each chunk
+    stateless = True
 
-    def render(self, data, accepted_media_type=None, renderer_context=None):
-        """
-        Render `obj` into json.
-        """
-        if data is None:
-            return ''
-
+    def get_indent(self, accepted_media_type, renderer_context):
         # If 'indent' is provided in the context, then pretty print the result.
         # E.g. If we're being called by the BrowseableAPIRenderer.
         renderer_context = renderer_context or {}
@@ -67,7 +78,64 @@ class JSONRenderer(BaseRenderer):
             except (ValueError, TypeError):
                 indent = None
 
-        return json.dumps(data, cls=self.encoder_class, indent=indent)
+        return indent
+
+    def get_separators(self, indent):
+        """
+        Return the item and key separators to use, or `None` for the default
+        separators.  Compact output is only used when not pretty printing.
+        """
+        compact = self.compact
+        if compact is None:
+            compact = api_settings.COMPACT_JSON
+        if compact and indent is None:
+            return (',', ':')
+        return None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render `obj` into json.
+        """
+        if data is None:
+            return ''
+
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        separators = self.get_separators(indent)
+        backend = encoders.get_json_backend(self.backend)
+        return backend.dumps(data, self.encoder_class, indent, separators)
+
+    def render_stream(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Render an iterable into a json array, encoding `stream_chunk_size`
+        items at a time.  The output is the same as for `.render()`.
+        """
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        if indent is not None:
+            # Pretty printing is for humans, so don't bother streaming.
+            yield self.render(list(data), accepted_media_type, renderer_context)
+            return
+
+        separators = self.get_separators(indent)
+        item_separator = separators and separators[0] or ', '
+        backend = encoders.get_json_backend(self.backend)
+
+        # Each chunk of items is encoded as an array, and joined on to the
+        # previous chunk.  A short chunk must be the last one, so it can keep
+        # its closing bracket.
+        prefix = '['
+        iterator = iter(data)
+        while True:
+            items = list(itertools.islice(iterator, self.stream_chunk_size))
+            if len(items) < self.stream_chunk_size:
+                break
+            content = backend.dumps(items, self.encoder_class, None, separators)
+            yield prefix + content[1:-1]
+            prefix = item_separator
+        if not items:
+            yield prefix == '[' and '[]' or ']'
+            return
+        content = backend.dumps(items, self.encoder_class, None, separators)
+        yield prefix + content[1:]
 
 
 class JSONPRenderer(JSONRenderer):
@@ -80,6 +148,7 @@ class JSONPRenderer(JSONRenderer):
     format = 'jsonp'
     callback_parameter = 'callback'
     default_callback = 'callback'
+    stateless = True
 
     def get_callback(self, renderer_context):
         """
@@ -102,6 +171,17 @@ class JSONPRenderer(JSONRenderer):
                                                  renderer_context)
         return u"%s(%s);" % (callback, json)
 
+    def render_stream(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Renders an iterable into jsonp, streaming the json output.
+        """
+        renderer_context = renderer_context or {}
+        yield u"%s(" % self.get_callback(renderer_context)
+        for chunk in super(JSONPRenderer, self).render_stream(data,
+                accepted_media_type, renderer_context):
+            yield chunk
+        yield u");"
+
 
 class XMLRenderer(BaseRenderer):
     """
@@ -110,6 +190,9 @@ class XMLRenderer(BaseRenderer):
 
     media_type = 'application/xml'
     format = 'xml'
+    streaming = True
+    stream_chunk_size = 1000  # The number of elements to render for each chunk
+    stateless = True
 
     def render(self, data, accepted_media_type=None, renderer_context=None):
         """
@@ -117,7 +200,71 @@ class XMLRenderer(BaseRenderer):
         """
         if data is None:
             return ''
-        return dict2xml(data)
+        return ''.join(self.render_stream(data, accepted_media_type,
+                                          renderer_context))
+
+    def render_stream(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Renders *obj* into serialized XML, as an iterator of chunks.
+
+        The data is walked with an explicit stack rather than recursively,
+        so that a chunk can be yielded whenever `stream_chunk_size` elements
+        have been rendered, however deeply nested the element is.
+        """
+        parts = [u'<?xml version="1.0" encoding="utf-8"?>\n']
+        stack = [(iter([(u'root', data)]), None)]
+        count = 0
+
+        while stack:
+            children, parent = stack[-1]
+            child = next(children, None)
+            if child is None:
+                stack.pop()
+                if parent is not None:
+                    parts.append(u'</%s>' % parent)
+                continue
+
+            tag, value = child
+            parts.append(u'<%s>' % tag)
+            if isinstance(value, unicode):
+                parts.append(escape(value))
+                parts.append(u'</%s>' % tag)
+            elif isinstance(value, dict):
+                stack.append((value.iteritems(), tag))
+            elif isinstance(value, (list, tuple)) or is_lazy_iterable(value):
+                items = itertools.izip(itertools.repeat(u'list-item'), value)
+                stack.append((items, tag))
+            else:
+                if value is not None:
+                    parts.append(escape(smart_unicode(value)))
+                parts.append(u'</%s>' % tag)
+
+            count += 1
+            if count == self.stream_chunk_size:
+                yield u''.join(parts).encode('utf-8')
+                parts = []
+                count = 0
+
+        yield u''.join(parts).encode('utf-8')
+
+
+class MessagePackRenderer(BaseRenderer):
+    """
+    Renderer which serializes to MessagePack.
+    """
+
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    encoder_class = encoders.JSONEncoder
+    stateless = True
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Renders *obj* into serialized MessagePack.
+        """
+        if data is None:
+            return ''
+        return encoders.msgpack_dumps(data, self.encoder_class)
 
 
 class YAMLRenderer(BaseRenderer):
@@ -128,6 +275,13 @@ class YAMLRenderer(BaseRenderer):
     media_type = 'application/yaml'
     format = 'yaml'
     encoder = encoders.SafeDumper
+    multiple_documents = False  # Render lists as one document per item
+    stream_chunk_size = 100  # The number of documents to render for each chunk
+    stateless = True
+
+    @property
+    def streaming(self):
+        return self.multiple_documents
 
     def render(self, data, accepted_media_type=None, renderer_context=None):
         """
@@ -136,8 +290,141 @@ class YAMLRenderer(BaseRenderer):
         if data is None:
             return ''
 
+        if self.multiple_documents and not isinstance(data, dict):
+            return ''.join(self.render_stream(data, accepted_media_type,
+                                              renderer_context))
         return yaml.dump(data, stream=None, Dumper=self.encoder)
 
+    def render_stream(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Renders a list into a stream of YAML documents, one for each item,
+        yielding a chunk for every `stream_chunk_size` documents.
+        """
+        iterator = iter(data)
+        while True:
+            items = list(itertools.islice(iterator, self.stream_chunk_size))
+            if not items:
+                return
+            yield yaml.dump_all(items, stream=None, Dumper=self.encoder,
+                                explicit_start=True)
+
+
+class CSVRenderer(BaseRenderer):
+    """
+    Renderer which serializes a list of objects to CSV, with one row per
+    object.  Nested objects are flattened into columns with dotted headers.
+    """
+
+    media_type = 'text/csv'
+    format = 'csv'
+    streaming = True
+    stream_chunk_size = 100  # The number of rows to render for each chunk
+    stateless = True
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Renders *obj* into serialized CSV.
+        """
+        if data is None:
+            return ''
+        return ''.join(self.render_stream(data, accepted_media_type,
+                                          renderer_context))
+
+    def render_stream(self, data, accepted_media_type=None, renderer_context=None):
+        """
+        Renders *obj* into serialized CSV, as an iterator of chunks of
+        `stream_chunk_size` rows.  The columns are determined by the first
+        row, so lazily serialized rows are only held a chunk at a time.
+        """
+        rows = iter(self.get_rows(data))
+        buffer = StringIO.StringIO()
+        writer = csv.writer(buffer)
+
+        try:
+            first = rows.next()
+        except StopIteration:
+            return
+        columns = self.get_columns(first)
+        writer.writerow([header.encode('utf-8') for header, path in columns])
+
+        for count, row in enumerate(itertools.chain([first], rows), 1):
+            writer.writerow([self.get_cell(row, path) for header, path in columns])
+            if count % self.stream_chunk_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    def get_rows(self, data):
+        """
+        Returns an iterable of the rows to render.  Paginated data renders
+        the results for the page, and a single object renders one row.
+        """
+        if not isinstance(data, dict):
+            return data
+        for key, field in getattr(data, 'fields', {}).items():
+            parent = getattr(field, 'parent', None)
+            if isinstance(parent, BasePaginationSerializer) and \
+                    key == parent.results_field:
+                return data[key]
+        return [data]
+
+    def get_columns(self, row, prefix=u'', path=()):
+        """
+        Returns a list of (header, path) two-tuples for the row.
+
+        The columns follow the serializer's field order.  Nested objects are
+        flattened, using the nested serializer's fields if the object is
+        `None` in this row.
+        """
+        if not isinstance(row, dict):
+            return [(prefix.rstrip(u'.'), path)]
+
+        keys = row.keys()
+        if not isinstance(row, SortedDict):
+            keys.sort()
+        fields = getattr(row, 'fields', {})
+
+        columns = []
+        for key in keys:
+            value = row[key]
+            field = fields.get(key)
+            if value is None and isinstance(field, serializers.BaseSerializer):
+                plan, nested_fields = field.get_field_plan(bool(field.opts.depth))
+                value = SortedDict([(nested_key, None)
+                                    for nested_key, field_name, nested_field in plan])
+                value.fields = nested_fields
+            if isinstance(value, dict):
+                columns += self.get_columns(value, u'%s%s.' % (prefix, key),
+                                            path + (key,))
+            else:
+                columns.append((u'%s%s' % (prefix, key), path + (key,)))
+        return columns
+
+    def get_cell(self, row, path):
+        """
+        Returns the utf-8 encoded value in the row for the column's path.
+        Lists are rendered as json.
+        """
+        value = row
+        for key in path:
+            if not isinstance(value, dict):
+                value = None
+                break
+            value = value.get(key)
+
+        if value is None:
+            return ''
+        elif isinstance(value, float):
+            return repr(value)
+        elif not isinstance(value, basestring):
+            # Dates, times and decimals are formatted as they are for json
+            value = encoders.to_primitive(value)
+            if isinstance(value, (list, dict)):
+                return encoders.get_json_backend().dumps(value)
+        return smart_str(value)
+
 
 class TemplateHTMLRenderer(BaseRenderer):
     """
@@ -167,6 +454,7 @@ class TemplateHTMLRenderer(BaseRenderer):
         '%(status_code)s.html',
         'api_exception.html'
     ]
+    stateless = True
 
     def render(self, data, accepted_media_type=None, renderer_context=None):
         """
@@ -238,6 +526,7 @@ class StaticHTMLRenderer(TemplateHTMLRenderer):
     """
     media_type = 'text/html'
     format = 'html'
+    stateless = True
 
     def render(self, data, accepted_media_type=None, renderer_context=None):
         renderer_context = renderer_context or {}
@@ -260,6 +549,7 @@ class BrowsableAPIRenderer(BaseRenderer):
     format = 'api'
     template = 'rest_framework/api.html'
     _context_class = RequestContext
+    stateless = True
 
     def get_default_renderer(self, view):
         """
@@ -271,7 +271,13 @@ class Request(object):
         if not parser:
             raise exceptions.UnsupportedMediaType(media_type)
 
-        parsed = parser.parse(stream, media_type, self.parser_context)
+        # Streaming parsers may return lazy data, if the view allows it.
+        view = self.parser_context.get('view')
+        if getattr(parser, 'streaming', False) and \
+                getattr(view, 'lazy_request_data', False):
+            parsed = parser.parse_stream(stream, media_type, self.parser_context)
+        else:
+            parsed = parser.parse(stream, media_type, self.parser_context)
 
         # Parser classes may return the raw data, or a
         # DataAndFiles object.  Unpack the result as required.
@@ -1,6 +1,8 @@
 from django.core.handlers.wsgi import STATUS_CODE_TEXT
 from django.template.response import SimpleTemplateResponse
+from rest_framework.compat import StreamingHttpResponse
 from rest_framework.settings import api_settings
+from rest_framework.utils import is_lazy_iterable
 
 
 class Response(SimpleTemplateResponse):
@@ -79,8 +81,30 @@ class Response(SimpleTemplateResponse):
         context['response'] = self
 
         self['Content-Type'] = media_type
+
+        if is_lazy_iterable(self.data) and getattr(renderer, 'streaming', False):
+            stream = renderer.render_stream(self.data, media_type, context)
+            if StreamingHttpResponse is None:
+                return stream
+            # Later versions of HttpResponse consume iterator content, so
+            # the stream is returned in a StreamingHttpResponse instead.
+            self.add_post_render_callback(
+                lambda response: response.get_streaming_response(stream))
+            return ''
+
         return renderer.render(self.data, media_type, context)
 
+    def get_streaming_response(self, stream):
+        """
+        Returns a `StreamingHttpResponse` for the stream, with the same
+        status code, headers and cookies as this response.
+        """
+        response = StreamingHttpResponse(stream, status=self.status_code)
+        for key, value in self.items():
+            response[key] = value
+        response.cookies = self.cookies
+        return response
+
     @property
     def status_text(self):
         """
@@ -1,8 +1,13 @@
 """
 Provide reverse functions that return fully qualified URLs
 """
+import re
+from django.conf import settings
+from django.core.urlresolvers import get_resolver, get_script_prefix, get_urlconf, resolve
 from django.core.urlresolvers import reverse as django_reverse
+from django.utils.encoding import force_unicode
 from django.utils.functional import lazy
+from rest_framework.utils.lru import LRUCache
 
 
 def reverse(viewname, args=None, kwargs=None, request=None, format=None, **extra):
@@ -20,3 +25,155 @@ def reverse(viewname, args=None, kwargs=None, request=None, format=None, **extra
 
 
 reverse_lazy = lazy(reverse, str)
+
+
+# URL templates, keyed by the urlconf, view name, format and kwarg shape.
+# Each template is stored with the regex of the URL pattern it came from.
+_url_templates = {}
+
+# Values that are left untouched by URL quoting, and so can be formatted
+# straight into a URL template.
+_template_value_re = re.compile(r'^[-a-zA-Z0-9_]+$')
+
+
+def _get_value_kind(value):
+    """
+    Classify a kwarg value as 'digits' or 'slug', or `None` if it can't be
+    formatted into a URL template.
+    """
+    if isinstance(value, (int, long)):
+        return value >= 0 and 'digits' or None
+    if isinstance(value, basestring) and _template_value_re.match(value):
+        return value.isdigit() and 'digits' or 'slug'
+    return None
+
+
+def _make_url_template(url, kwargs):
+    """
+    Turn a reversed URL into a template, by replacing each kwarg value with
+    a named format placeholder.  Returns `None` if any of the values can't
+    be unambiguously located in the URL.
+    """
+    template = url.replace('%', '%%')
+    values = [force_unicode(value) for value in kwargs.values()]
+    for key, value in zip(kwargs.keys(), values):
+        if template.count(value) != 1:
+            return None
+        if [other for other in values if other != value and value in other]:
+            return None
+        template = template.replace(value, '%%(%s)s' % key)
+    return template
+
+
+def _get_url_regex(viewname, keys):
+    """
+    Return the compiled regex of the only URL pattern that `viewname` could
+    be reversed to with the given kwarg names, which `reverse` checks the
+    formatted URL against.  Returns `None` if there's more than one such
+    pattern, as which of them is used then depends on the values.
+    """
+    if not isinstance(viewname, basestring):
+        return None
+    resolver = get_resolver(get_urlconf())
+    parts = viewname.split(':')
+    ns_pattern = ''
+    try:
+        for ns in parts[:-1]:
+            app_list = resolver.app_dict.get(ns)
+            if app_list and ns not in app_list:
+                ns = app_list[0]
+            extra, resolver = resolver.namespace_dict[ns]
+            ns_pattern += extra
+    except KeyError:
+        return None
+
+    candidates = []
+    for possibility, pattern, defaults in resolver.reverse_dict.getlist(parts[-1]):
+        for result, params in possibility:
+            if set(params) == set(keys):
+                candidates.append((pattern, defaults))
+    if len(candidates) != 1 or candidates[0][1]:
+        return None
+    prefix = re.escape(get_script_prefix())
+    return re.compile(u'^%s%s%s' % (prefix, ns_pattern, candidates[0][0]), re.UNICODE)
+
+
+def get_url_prefix(request):
+    """
+    Return the scheme and host for the request, eg. 'http://example.com'.
+    This is computed once, and stored on the request.
+    """
+    try:
+        return request._url_prefix
+    except AttributeError:
+        pass
+    prefix = request.build_absolute_uri('/')[:-1]
+    request._url_prefix = prefix
+    return prefix
+
+
+def reverse_cached(viewname, kwargs, request=None, format=None):
+    """
+    Same as `reverse`, but the URL pattern is only resolved the first time
+    the view is reversed with kwargs of a given shape.  Subsequent calls
+    format the kwargs directly into a cached URL template, and check the
+    result against the pattern's regex, just as `reverse` does.
+    """
+    kinds = tuple(sorted([(key, _get_value_kind(value))
+                          for key, value in kwargs.items()]))
+    cacheable = None not in [kind for key, kind in kinds]
+    cache_key = (get_urlconf() or settings.ROOT_URLCONF, get_script_prefix(),
+                 viewname, format, kinds)
+
+    url = None
+    cached = cacheable and _url_templates.get(cache_key)
+    if cached:
+        template, regex = cached
+        url = template % dict([(key, force_unicode(value))
+                               for key, value in kwargs.items()])
+        if not regex.search(url):
+            # Let `reverse` find another pattern, or raise `NoReverseMatch`.
+            url = None
+    if url is None:
+        url = reverse(viewname, kwargs=dict(kwargs), format=format)
+        template = cacheable and not cached and _make_url_template(url, kwargs)
+        if template:
+            keys = kwargs.keys() + (format is not None and ['format'] or [])
+            regex = _get_url_regex(viewname, keys)
+            if regex is not None and regex.search(url):
+                _url_templates[cache_key] = (template, regex)
+
+    if not request:
+        return url
+    if url.startswith('/') and not url.startswith('//'):
+        return get_url_prefix(request) + url
+    return request.build_absolute_uri(url)
+
+
+# The results of resolving paths, keyed by the urlconf and path.
+_resolved_paths = LRUCache(1000)
+
+
+def resolve_cached(path):
+    """
+    Same as `django.core.urlresolvers.resolve`, but returns a two-tuple of
+    (url name, kwargs), and remembers the result for each path, so that
+    paths that have been seen before aren't resolved again.
+
+    Raises `Resolver404` if the path doesn't resolve.
+    """
+    key = (get_urlconf() or settings.ROOT_URLCONF, path)
+    resolved = _resolved_paths.get(key)
+    if resolved is None:
+        match = resolve(path)
+        resolved = (match.url_name, match.kwargs)
+        _resolved_paths.set(key, resolved)
+    return resolved[0], dict(resolved[1])
+
+
+def clear_url_templates():
+    """
+    Clear the cache of URL templates, eg. if the urlconf changes at runtime.
+    """
+    _url_templates.clear()
+    _resolved_paths.clear()
@@ -0,0 +1,423 @@
+#!/usr/bin/env python
+"""
+Micro-benchmarks for performance sensitive parts of rest_framework.
+
+    Usage: python runbenchmarks.py [benchmark_name]
+
+Each benchmark prints the time taken per loop, alongside a baseline
+that reproduces the previous behaviour, where there is one.
+"""
+import os
+import sys
+import timeit
+os.environ['DJANGO_SETTINGS_MODULE'] = 'rest_framework.runtests.settings'
+
+
+BENCHMARKS = []
+
+
+def benchmark(func):
+    """
+    Register a function as a benchmark.
+    """
+    BENCHMARKS.append(func)
+    return func
+
+
+def report(description, seconds, number):
+    print '  %-56s %10.2f usec/loop' % (description, seconds * 1e6 / number)
+
+
+def usage():
+    return """
+    Usage: python runbenchmarks.py [benchmark_name]
+
+    Available benchmarks:
+
+    %s
+    """ % '\n    '.join([func.__name__ for func in BENCHMARKS])
+
+
+@benchmark
+def serializer_instantiation(number=5000):
+    """
+    Cost of instantiating a serializer, as the number of fields grows.
+    """
+    import copy
+    from rest_framework import serializers
+    from rest_framework.tests.models import Anchor
+
+    for field_count in (5, 20, 80):
+        attrs = {}
+        for idx in range(field_count):
+            if idx % 2:
+                field = serializers.CharField(max_length=100)
+            else:
+                field = serializers.PrimaryKeyRelatedField(queryset=Anchor.objects.all())
+            attrs['field_%d' % idx] = field
+        serializer_class = type('Serializer%d' % field_count,
+                                (serializers.Serializer,), attrs)
+
+        seconds = timeit.Timer(lambda: serializer_class()).timeit(number)
+        report('instantiate, %d fields' % field_count, seconds, number)
+
+        seconds = timeit.Timer(lambda: copy.deepcopy(serializer_class.base_fields)).timeit(number)
+        report('baseline: deepcopy of base_fields, %d fields' % field_count, seconds, number)
+
+
+@benchmark
+def url_reversal(number=5000):
+    """
+    Cost of reversing the URL for an object, as done by hyperlinked fields.
+    """
+    from django.conf import settings
+    from django.test.client import RequestFactory
+    from rest_framework.reverse import reverse, reverse_cached
+
+    settings.ROOT_URLCONF = 'rest_framework.tests.reverse'
+    request = RequestFactory().get('/')
+
+    seconds = timeit.Timer(lambda: reverse_cached('item', {'pk': 1}, request=request)).timeit(number)
+    report('reverse_cached, pk kwarg', seconds, number)
+
+    seconds = timeit.Timer(lambda: reverse('item', kwargs={'pk': 1}, request=request)).timeit(number)
+    report('baseline: reverse, pk kwarg', seconds, number)
+
+
+def _get_payload(count):
+    """
+    A list of serialized objects, as returned by a list endpoint.
+    """
+    import datetime
+    import decimal
+    from django.utils.datastructures import SortedDict
+
+    ret = []
+    for idx in range(count):
+        item = SortedDict()
+        item['id'] = idx
+        item['name'] = u'item %d' % idx
+        item['created'] = datetime.datetime(2012, 1, 1, 12, 0, 0, idx)
+        item['price'] = decimal.Decimal('10.%02d' % (idx % 100))
+        item['tags'] = [1, 2, 3]
+        item['active'] = True
+        ret.append(item)
+    return ret
+
+
+@benchmark
+def json_encoding(number=5):
+    """
+    Throughput of the available json backends, for a 10k object payload.
+
+    The baseline is the encoder used before `JSON_BACKEND` was added, which
+    converts dates and decimals with the `default()` callback.  Backends
+    without `JSONEncoder`, such as `ujson`, convert the data with
+    `to_primitive()` first, which is included in their timings.
+    """
+    from django.utils import simplejson
+    from rest_framework.utils import encoders
+
+    data = _get_payload(10000)
+    seconds = timeit.Timer(lambda: simplejson.dumps(
+        data, cls=encoders.JSONEncoder)).timeit(number)
+    report('baseline: django.utils.simplejson, default() callback', seconds, number)
+
+    for name in ('json', 'simplejson', 'ujson', 'cjson'):
+        try:
+            backend = encoders.get_json_backend(name)
+        except ImportError:
+            print '  %-56s %16s' % (name, 'not installed')
+            continue
+        seconds = timeit.Timer(lambda: backend.dumps(data)).timeit(number)
+        if backend.supports_encoder_class:
+            report('dumps, %s, default() callback' % name, seconds, number)
+        else:
+            report('dumps, %s, to_primitive()' % name, seconds, number)
+
+
+@benchmark
+def json_compact(number=5):
+    """
+    Rendering a 10k object payload with and without compact separators.
+    """
+    from rest_framework.renderers import JSONRenderer
+
+    data = _get_payload(10000)
+    for compact in (False, True):
+        renderer = JSONRenderer()
+        renderer.compact = compact
+        seconds = timeit.Timer(lambda: renderer.render(data)).timeit(number)
+        report('render, compact=%s (%d bytes)' % (compact, len(renderer.render(data))),
+               seconds, number)
+        seconds = timeit.Timer(lambda: ''.join(renderer.render_stream(iter(data)))).timeit(number)
+        report('render_stream, compact=%s' % compact, seconds, number)
+
+
+@benchmark
+def json_parsing(number=5):
+    """
+    Parsing a 10k object payload in full, and as a stream of elements.
+    """
+    from StringIO import StringIO
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+
+    content = JSONRenderer().render(_get_payload(10000))
+    parser = JSONParser()
+    seconds = timeit.Timer(lambda: parser.parse(StringIO(content))).timeit(number)
+    report('parse', seconds, number)
+    seconds = timeit.Timer(lambda: list(parser.parse_stream(StringIO(content)))).timeit(number)
+    report('parse_stream', seconds, number)
+
+
+@benchmark
+def xml_rendering(number=5):
+    """
+    Rendering a 10k object payload as xml.
+    """
+    from rest_framework.renderers import XMLRenderer
+    from rest_framework.utils import dict2xml
+
+    data = _get_payload(10000)
+    renderer = XMLRenderer()
+    seconds = timeit.Timer(lambda: renderer.render(data)).timeit(number)
+    report('render', seconds, number)
+
+    seconds = timeit.Timer(lambda: dict2xml(data)).timeit(number)
+    report('baseline: dict2xml', seconds, number)
+
+
+@benchmark
+def xml_parsing(number=5):
+    """
+    Parsing a 10k object payload from xml.
+    """
+    from StringIO import StringIO
+    from rest_framework.parsers import XMLParser
+    from rest_framework.renderers import XMLRenderer
+
+    content = XMLRenderer().render(_get_payload(10000))
+    parser = XMLParser()
+    seconds = timeit.Timer(lambda: parser.parse(StringIO(content))).timeit(number)
+    report('parse', seconds, number)
+    seconds = timeit.Timer(lambda: list(parser.parse_stream(StringIO(content)))).timeit(number)
+    report('parse_stream', seconds, number)
+
+
+@benchmark
+def csv_rendering(number=5):
+    """
+    Rendering a 10k object payload as csv.
+    """
+    from rest_framework.renderers import CSVRenderer
+
+    data = _get_payload(10000)
+    renderer = CSVRenderer()
+    seconds = timeit.Timer(lambda: renderer.render(data)).timeit(number)
+    report('render', seconds, number)
+
+
+@benchmark
+def msgpack_encoding(number=5):
+    """
+    Payload size, and rendering and parsing time, for msgpack compared to
+    json.  Uses a 10k object payload, and 10k serialized test models.
+    """
+    import datetime
+    import decimal
+    from StringIO import StringIO
+    from rest_framework import serializers
+    from rest_framework.compat import msgpack
+    from rest_framework.parsers import JSONParser, MessagePackParser
+    from rest_framework.renderers import JSONRenderer, MessagePackRenderer
+    from rest_framework.tests.models import FilterableItem
+
+    class FilterableItemSerializer(serializers.ModelSerializer):
+        class Meta:
+            model = FilterableItem
+
+    items = [FilterableItem(id=idx, text='item %d' % idx,
+                            decimal=decimal.Decimal('%d.25' % (idx % 100)),
+                            date=datetime.date(2012, 1, 1))
+             for idx in range(10000)]
+    payloads = (
+        ('payload', _get_payload(10000)),
+        ('FilterableItem', FilterableItemSerializer(items).data),
+    )
+    print '  using %s' % msgpack.__name__
+
+    for name, data in payloads:
+        for renderer, parser in ((JSONRenderer(), JSONParser()),
+                                 (MessagePackRenderer(), MessagePackParser())):
+            content = renderer.render(data)
+            desc = '%s, %s (%d bytes)' % (renderer.format, name, len(content))
+            seconds = timeit.Timer(lambda: renderer.render(data)).timeit(number)
+            report('render %s' % desc, seconds, number)
+            seconds = timeit.Timer(lambda: parser.parse(StringIO(content))).timeit(number)
+            report('parse %s' % desc, seconds, number)
+
+
+@benchmark
+def yaml_encoding(number=1):
+    """
+    Rendering and parsing a 10k object payload as yaml.
+    """
+    from StringIO import StringIO
+    from rest_framework.compat import yaml
+    from rest_framework.parsers import YAMLParser
+    from rest_framework.renderers import YAMLRenderer
+
+    if yaml is None:
+        print '  %-56s %16s' % ('yaml', 'not installed')
+        return
+
+    data = _get_payload(10000)
+    renderer = YAMLRenderer()
+    seconds = timeit.Timer(lambda: renderer.render(data)).timeit(number)
+    report('render', seconds, number)
+
+    content = renderer.render(data)
+    parser = YAMLParser()
+    seconds = timeit.Timer(lambda: parser.parse(StringIO(content))).timeit(number)
+    report('parse', seconds, number)
+
+    seconds = timeit.Timer(lambda: yaml.safe_load(StringIO(content))).timeit(number)
+    report('baseline: yaml.safe_load', seconds, number)
+
+
+@benchmark
+def view_dispatch(number=5000):
+    """
+    Cost of dispatching a request to a minimal view, including policy setup.
+    """
+    from django.test.client import RequestFactory
+    from rest_framework.response import Response
+    from rest_framework.views import APIView
+
+    class MinimalView(APIView):
+        def get(self, request):
+            return Response()
+
+    class PerRequestView(MinimalView):
+        def get_policy_instances(self, policy_classes):
+            return [policy() for policy in policy_classes]
+
+    request = RequestFactory().get('/')
+    view = MinimalView.as_view()
+    seconds = timeit.Timer(lambda: view(request)).timeit(number)
+    report('dispatch, shared policy instances', seconds, number)
+
+    view = PerRequestView.as_view()
+    seconds = timeit.Timer(lambda: view(request)).timeit(number)
+    report('baseline: dispatch, policies instantiated per request', seconds, number)
+
+
+@benchmark
+def content_negotiation(number=20000):
+    """
+    Cost of selecting a renderer for a typical browser Accept header.
+    """
+    from django.test.client import RequestFactory
+    from rest_framework.negotiation import DefaultContentNegotiation
+    from rest_framework.settings import api_settings
+
+    renderers = [renderer() for renderer in api_settings.DEFAULT_RENDERER_CLASSES]
+    request = RequestFactory().get('/', HTTP_ACCEPT='text/html,application/xhtml+xml,'
+                                   'application/xml;q=0.9,*/*;q=0.8')
+    negotiator = DefaultContentNegotiation()
+    seconds = timeit.Timer(lambda: negotiator.select_renderer(request, renderers)).timeit(number)
+    report('select_renderer', seconds, number)
+
+    accepts = negotiator.get_accept_list(request)
+    seconds = timeit.Timer(lambda: negotiator.match_renderer(accepts, renderers)).timeit(number)
+    report('baseline: uncached match_renderer', seconds, number)
+
+
+@benchmark
+def response_caching(number=2000):
+    """
+    Cost of a cached response, against rendering it in full.
+    """
+    from django.test.client import RequestFactory
+    from rest_framework import caching
+    from rest_framework.response import Response
+    from rest_framework.views import APIView
+
+    data = _get_payload(100)
+
+    class PayloadView(APIView):
+        def get(self, request):
+            return Response(data)
+
+    class CachedPayloadView(PayloadView):
+        response_cache_class = caching.ResponseCache
+
+    factory = RequestFactory()
+
+    view = CachedPayloadView.as_view()
+    view(factory.get('/')).render()
+    seconds = timeit.Timer(lambda: view(factory.get('/')).render()).timeit(number)
+    report('cached, 100 items', seconds, number)
+
+    view = PayloadView.as_view()
+    seconds = timeit.Timer(lambda: view(factory.get('/')).render()).timeit(number)
+    report('baseline: uncached, 100 items', seconds, number)
+
+
+@benchmark
+def fragment_caching(number=200):
+    """
+    Cost of serializing a list of 100 objects from the fragment cache.
+    """
+    import datetime
+    from rest_framework import caching, serializers
+
+    class Item(object):
+        def __init__(self, idx):
+            self.pk = idx
+            self.name = u'item %d' % idx
+            self.created = datetime.datetime(2012, 1, 1, 12, 0, 0, idx)
+            self.price = idx * 1.5
+            self.active = bool(idx % 2)
+            self.updated = self.created
+
+    class ItemSerializer(serializers.Serializer):
+        pk = serializers.IntegerField()
+        name = serializers.CharField()
+        created = serializers.DateTimeField()
+        price = serializers.FloatField()
+        active = serializers.BooleanField()
+
+    class CachedItemSerializer(ItemSerializer):
+        class Meta:
+            fragment_cache_field = 'updated'
+
+    items = [Item(idx) for idx in range(100)]
+    caching._local_cache.clear()
+    CachedItemSerializer(items).data
+    seconds = timeit.Timer(lambda: CachedItemSerializer(items).data).timeit(number)
+    report('cached, 100 objects', seconds, number)
+
+    seconds = timeit.Timer(lambda: ItemSerializer(items).data).timeit(number)
+    report('baseline: uncached, 100 objects', seconds, number)
+
+
+def main():
+    if len(sys.argv) == 2:
+        benchmarks = [func for func in BENCHMARKS if func.__name__ == sys.argv[1]]
+        if not benchmarks:
+            print usage()
+            sys.exit(1)
+    elif len(sys.argv) == 1:
+        benchmarks = BENCHMARKS
+    else:
+        print usage()
+        sys.exit(1)
+
+    for func in benchmarks:
+        print '%s:' % func.__name__
+        func()
+
+if __name__ == '__main__':
+    main()
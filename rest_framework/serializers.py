@@ -1,11 +1,18 @@
 import copy
 import datetime
+import itertools
+import sys
 import types
+import uuid
 from decimal import Decimal
+from hashlib import md5
 from django.db import models
+from django.db.models.query import QuerySet
 from django.forms import widgets
 from django.utils.datastructures import SortedDict
-from rest_framework.compat import get_concrete_model
+from django.utils.encoding import smart_str
+from rest_framework import caching
+from rest_framework.compat import get_concrete_model, prefetch_related_objects
 
 # Note: We do the following so that users of the framework can use this style:
 #
@@ -32,6 +39,51 @@ class SortedDictWithMetadata(SortedDict, DictWithMetadata):
     pass
 
 
+def _copy_data(data):
+    """
+    Return a copy of serialized data, with any dicts that have metadata
+    attached replaced by plain dicts, so that it can be cached without
+    sharing containers with the data that is returned.
+    """
+    if isinstance(data, dict):
+        items = [(key, _copy_data(value)) for key, value in data.items()]
+        if isinstance(data, SortedDict):
+            return SortedDict(items)
+        return dict(items)
+    if isinstance(data, list):
+        return [_copy_data(item) for item in data]
+    return data
+
+
+def _get_class_token(cls):
+    """
+    Return a string identifying a serializer class in cache keys.  Classes
+    that aren't importable by name, such as those created by factory
+    functions, get a random token, so that they never share keys.
+    """
+    token = cls.__dict__.get('_fragment_class_token')
+    if token is None:
+        module = sys.modules.get(cls.__module__)
+        token = '%s.%s' % (cls.__module__, cls.__name__)
+        if getattr(module, cls.__name__, None) is not cls:
+            token += ':' + uuid.uuid4().hex
+        cls._fragment_class_token = token
+    return token
+
+
+class LazyNativeList(object):
+    """
+    A list-like object, that serializes the objects each time it is
+    iterated over, rather than holding all of the serialized data at once.
+    """
+    def __init__(self, serializer, obj):
+        self.serializer = serializer
+        self.obj = obj
+
+    def __iter__(self):
+        return self.serializer.iter_native(self.obj)
+
+
 def _is_protected_type(obj):
     """
     True if the object is a native datatype that does not need to
@@ -68,6 +120,22 @@ def _get_declared_fields(bases, attrs):
     return SortedDict(fields)
 
 
+def _copy_field(field):
+    """
+    Return a shallow copy of a declared field, with it's own copies of the
+    validators, error messages and widget, so that they can be modified
+    without affecting the serializer class.
+    """
+    ret = copy.copy(field)
+    if getattr(ret, 'validators', None) is not None:
+        ret.validators = ret.validators[:]
+    if getattr(ret, 'error_messages', None) is not None:
+        ret.error_messages = dict(ret.error_messages)
+    if getattr(ret, 'widget', None) is not None:
+        ret.widget = copy.deepcopy(ret.widget)
+    return ret
+
+
 class SerializerMetaclass(type):
     def __new__(cls, name, bases, attrs):
         attrs['base_fields'] = _get_declared_fields(bases, attrs)
@@ -83,6 +151,9 @@ class SerializerOptions(object):
         self.fields = getattr(meta, 'fields', ())
         self.exclude = getattr(meta, 'exclude', ())
         self.view_namespace = getattr(meta, 'view_namespace', None)
+        self.lazy = getattr(meta, 'lazy', False)
+        self.fragment_cache_field = getattr(meta, 'fragment_cache_field', None)
+        self.fragment_cache_timeout = getattr(meta, 'fragment_cache_timeout', 300)
 
 
 class BaseSerializer(Field):
@@ -91,11 +162,12 @@ class BaseSerializer(Field):
 
     _options_class = SerializerOptions
     _dict_class = SortedDictWithMetadata  # Set to unsorted dict for backwards compatability with unsorted implementations.
+    lazy_chunk_size = 500  # The number of objects to fetch at a time in lazy mode
 
     def __init__(self, instance=None, data=None, context=None, **kwargs):
         super(BaseSerializer, self).__init__(**kwargs)
         self.opts = self._options_class(self.Meta)
-        self.fields = copy.deepcopy(self.base_fields)
+        self._fields = None
         self.parent = None
         self.root = None
 
@@ -107,6 +179,40 @@ class BaseSerializer(Field):
         self._data = None
         self._errors = None
 
+        self._bound_fields = {}
+        self._field_plans = {}
+
+    def __copy__(self):
+        """
+        Shallow copies share their field definitions with the original, but
+        need their own options and bound fields, as `initialize()` alters the
+        depth of nested serializers.
+        """
+        ret = self.__class__.__new__(self.__class__)
+        ret.__dict__.update(self.__dict__)
+        ret.opts = copy.copy(self.opts)
+        if self._fields is not None:
+            ret._fields = SortedDict(self._fields)
+        ret._bound_fields = {}
+        ret._field_plans = {}
+        return ret
+
+    def _get_declared_fields(self):
+        """
+        The declared fields are shared with the serializer class until they
+        are first accessed through `.fields`, at which point this instance
+        gets it's own copy that may be safely modified.
+        """
+        if self._fields is None:
+            self._fields = SortedDict([(key, _copy_field(field))
+                                       for key, field in self.base_fields.items()])
+        return self._fields
+
+    def _set_declared_fields(self, fields):
+        self._fields = fields
+
+    fields = property(_get_declared_fields, _set_declared_fields)
+
     #####
     # Methods to determine which fields to use when (de)serializing objects.
 
@@ -116,26 +222,70 @@ class BaseSerializer(Field):
         """
         return {}
 
+    def get_default_fields_cache_key(self, nested=False):
+        """
+        Return the key that the default fields are cached under, for the
+        serializer class, or `None` if they shouldn't be cached.
+
+        Override this to return `None` if `default_fields()` depends on the
+        serializer instance, eg. on `self.context`.
+        """
+        return nested
+
+    def get_default_fields(self, nested=False):
+        """
+        Return the default fields for the serializer, as a dict.
+
+        By default `default_fields()` is assumed to only depend on the
+        serializer class and it's `Meta` options, so the result is computed
+        once per class and reused by every instance.  The returned fields
+        are unbound, and must not be modified.
+        """
+        key = self.get_default_fields_cache_key(nested)
+        if key is None:
+            return self.default_fields(nested)
+
+        cls = self.__class__
+        cache = cls.__dict__.get('_default_fields_cache')
+        if cache is None:
+            cache = {}
+            cls._default_fields_cache = cache
+        try:
+            return cache[key]
+        except KeyError:
+            ret = cache[key] = self.default_fields(nested)
+            return ret
+
     def get_fields(self, nested=False):
         """
         Returns the complete set of fields for the object as a dict.
 
         This will be the set of any explicitly declared fields,
         plus the set of fields returned by default_fields().
+
+        The fields are bound to the serializer the first time they are
+        requested, and the same fields are returned from then on.
         """
+        try:
+            return self._bound_fields[nested]
+        except KeyError:
+            pass
+
         ret = SortedDict()
 
         # Get the explicitly declared fields
-        for key, field in self.fields.items():
-            ret[key] = field
-            # Set up the field
-            field.initialize(parent=self, field_name=key)
+        if self._fields is None:
+            declared = self.base_fields
+        else:
+            declared = self._fields
+        for key, field in declared.items():
+            ret[key] = field.bind(parent=self, field_name=key)
 
         # Add in the default fields
-        fields = self.default_fields(nested)
+        fields = self.get_default_fields(nested)
         for key, val in fields.items():
             if key not in ret:
-                ret[key] = val
+                ret[key] = val.bind(parent=self, field_name=key)
 
         # If 'fields' is specified, use those fields, in that order.
         if self.opts.fields:
@@ -149,6 +299,26 @@ class BaseSerializer(Field):
             for key in self.opts.exclude:
                 ret.pop(key, None)
 
+        self._bound_fields[nested] = ret
+        return ret
+
+    def get_field_plan(self, nested=False):
+        """
+        Returns a two-tuple of the fields to serialize, as a tuple of
+        (key, field_name, field), and a dict of key -> field.
+
+        This is determined once per serializer instance, so that
+        `convert_object()` doesn't need to redo it for every object.
+        """
+        try:
+            return self._field_plans[nested]
+        except KeyError:
+            pass
+
+        plan = tuple([(self.get_field_key(field_name), field_name, field)
+                      for field_name, field in self.get_fields(nested).items()])
+        fields = dict([(key, field) for key, field_name, field in plan])
+        ret = self._field_plans[nested] = (plan, fields)
         return ret
 
     #####
@@ -178,16 +348,111 @@ class BaseSerializer(Field):
         Convert an object into a dictionary of serialized field values.
         """
         ret = self._dict_class()
-        ret.fields = {}
 
-        fields = self.get_fields(nested=bool(self.opts.depth))
-        for field_name, field in fields.items():
-            key = self.get_field_key(field_name)
-            value = field.field_to_native(obj, field_name)
+        plan, fields = self.get_field_plan(nested=bool(self.opts.depth))
+        ret.fields = dict(fields)
+        for key, field_name, field in plan:
+            ret[key] = field.field_to_native(obj, field_name)
+        return ret
+
+    def convert_objects(self, objects):
+        """
+        Convert a list of objects into a list of dictionaries of serialized
+        field values.
+
+        If the `fragment_cache_field` option is set, the serialized data for
+        each object is cached, keyed on the object's primary key and the
+        value of that field.  Cached objects are fetched with a single
+        `get_many()`, and only the remaining objects are converted.
+        """
+        if not self.opts.fragment_cache_field:
+            self.prepare_fields(objects)
+            return [self.convert_object(item) for item in objects]
+
+        cache = caching.get_cache_backend()
+        keys = [self.get_fragment_key(item) for item in objects]
+        cached = cache.get_many([key for key in keys if key is not None])
+
+        misses = [item for item, key in zip(objects, keys) if key not in cached]
+        if misses:
+            self.prepare_fields(misses)
+
+        fragments = {}
+        ret = []
+        for item, key in zip(objects, keys):
+            if key in cached:
+                data = self.restore_fragment(cached[key])
+            else:
+                data = self.convert_object(item)
+                if key is not None:
+                    fragments[key] = tuple([(name, _copy_data(value))
+                                            for name, value in data.items()])
+            ret.append(data)
+
+        if fragments:
+            cache.set_many(fragments, self.opts.fragment_cache_timeout)
+        return ret
+
+    def restore_fragment(self, items):
+        """
+        Rebuild the serialized data for an object from the (key, value)
+        pairs held in the fragment cache.
+
+        Nested data is restored with the nested serializer's fields attached,
+        just as if the object had been converted.
+        """
+        plan, fields = self.get_field_plan(nested=bool(self.opts.depth))
+        ret = self._dict_class()
+        ret.fields = dict(fields)
+        for key, value in items:
+            field = fields.get(key)
+            if isinstance(field, BaseSerializer) and isinstance(value, list):
+                value = [field.restore_fragment(item.items()) for item in value]
+            elif isinstance(field, BaseSerializer) and isinstance(value, dict):
+                value = field.restore_fragment(value.items())
+            else:
+                value = _copy_data(value)
             ret[key] = value
-            ret.fields[key] = field
         return ret
 
+    def get_fragment_key(self, obj):
+        """
+        Return the key that the serialized data for an object is cached
+        under, or `None` if it shouldn't be cached.
+
+        Serialized data may contain absolute URLs, so the key includes the
+        host, as well as the format.
+        """
+        pk = getattr(obj, 'pk', None)
+        if pk is None:
+            return None
+
+        prefix = getattr(self, '_fragment_key_prefix', None)
+        if prefix is None:
+            request = self.context.get('request')
+            plan, fields = self.get_field_plan(nested=bool(self.opts.depth))
+            parts = [
+                _get_class_token(self.__class__), self.opts.depth,
+                [(key, field_name) for key, field_name, field in plan],
+                self.context.get('format'),
+                request is not None and request.get_host() or None,
+                request is not None and request.is_secure() or None,
+            ]
+            prefix = self._fragment_key_prefix = smart_str(repr(parts))
+
+        version = getattr(obj, self.opts.fragment_cache_field)
+        key = '%s:%r:%r' % (prefix, pk, version)
+        return 'rest_framework:fragment:%s' % md5(key).hexdigest()
+
+    def prepare_fields(self, objects):
+        """
+        Give each field the chance to perform any lookups for the whole list
+        of objects at once, before they are converted one by one.
+        """
+        plan, fields = self.get_field_plan(nested=bool(self.opts.depth))
+        for key, field_name, field in plan:
+            field.prepare_objects(objects, field_name)
+
     def restore_fields(self, data):
         """
         Core of deserialization, together with `restore_object`.
@@ -248,9 +513,38 @@ class BaseSerializer(Field):
         Serialize objects -> primatives.
         """
         if hasattr(obj, '__iter__'):
-            return [self.convert_object(item) for item in obj]
+            if self.opts.lazy:
+                return LazyNativeList(self, obj)
+            return self.convert_objects(list(obj))
+        if self.opts.fragment_cache_field and self.parent is None:
+            return self.convert_objects([obj])[0]
         return self.convert_object(obj)
 
+    def iter_native(self, obj):
+        """
+        Serialize an iterable of objects -> a generator of primatives.
+
+        Objects are fetched `lazy_chunk_size` at a time, and querysets are
+        consumed with `.iterator()`, so that only one chunk of objects is
+        held in memory at once.
+        """
+        if isinstance(obj, QuerySet) and obj._result_cache is None:
+            lookups = getattr(obj, '_prefetch_related_lookups', None)
+            iterator = obj.iterator()
+        else:
+            lookups = None
+            iterator = iter(obj)
+
+        while True:
+            objects = list(itertools.islice(iterator, self.lazy_chunk_size))
+            if not objects:
+                return
+            if lookups and prefetch_related_objects:
+                # `.iterator()` doesn't prefetch, so do it for each chunk
+                prefetch_related_objects(objects, lookups)
+            for item in self.convert_objects(objects):
+                yield item
+
     def from_native(self, data):
         """
         Deserialize primatives -> objects.
@@ -278,7 +572,7 @@ class BaseSerializer(Field):
 
         # If the object has an "all" method, assume it's a relationship
         if is_simple_callable(getattr(obj, 'all', None)):
-            return [self.to_native(item) for item in obj.all()]
+            return self.convert_objects(list(obj.all()))
 
         return self.to_native(obj)
 
@@ -368,7 +662,6 @@ class ModelSerializer(Serializer):
                 field = self.get_field(model_field)
 
             if field:
-                field.initialize(parent=self, field_name=model_field.name)
                 ret[model_field.name] = field
 
         for field_name in self.opts.read_only_fields:
@@ -413,6 +706,9 @@ class ModelSerializer(Serializer):
 
         kwargs['blank'] = model_field.blank
 
+        # Model fields are never callable, so skip checking for each object
+        kwargs['callable_source'] = False
+
         if model_field.null:
             kwargs['required'] = False
 
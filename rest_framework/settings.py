@@ -49,6 +49,7 @@ DEFAULTS = {
         'rest_framework.serializers.ModelSerializer',
     'DEFAULT_PAGINATION_SERIALIZER_CLASS':
         'rest_framework.pagination.PaginationSerializer',
+    'DEFAULT_RESPONSE_CACHE_CLASS': None,
 
     'DEFAULT_THROTTLE_RATES': {
         'user': None,
@@ -57,6 +58,15 @@ DEFAULTS = {
     'PAGINATE_BY': None,
     'FILTER_BACKEND': None,
 
+    'JSON_BACKEND': None,
+    'COMPACT_JSON': False,
+
+    'QUERY_PLANNING': True,
+    'QUERY_PLAN_DEBUG': False,
+
+    'CONTENT_ETAGS': False,
+    'RESPONSE_CACHE': None,
+
     'UNAUTHENTICATED_USER': 'django.contrib.auth.models.AnonymousUser',
     'UNAUTHENTICATED_TOKEN': None,
 
@@ -85,6 +95,7 @@ IMPORT_STRINGS = (
     'DEFAULT_CONTENT_NEGOTIATION_CLASS',
     'DEFAULT_MODEL_SERIALIZER_CLASS',
     'DEFAULT_PAGINATION_SERIALIZER_CLASS',
+    'DEFAULT_RESPONSE_CACHE_CLASS',
     'FILTER_BACKEND',
     'UNAUTHENTICATED_USER',
     'UNAUTHENTICATED_TOKEN',
@@ -0,0 +1,166 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.test.client import RequestFactory
+from django.utils import simplejson as json
+from rest_framework import caching, generics, permissions, status
+from rest_framework.authentication import BaseAuthentication
+from rest_framework.tests.models import BasicModel
+
+
+factory = RequestFactory()
+
+
+class CachedRootView(generics.ListCreateAPIView):
+    model = BasicModel
+    response_cache_class = caching.ResponseCache
+
+
+class CachedInstanceView(generics.RetrieveUpdateDestroyAPIView):
+    model = BasicModel
+    response_cache_class = caching.ResponseCache
+
+
+class UncachedInstanceView(generics.RetrieveUpdateDestroyAPIView):
+    model = BasicModel
+
+
+class TestResponseCache(TestCase):
+    def setUp(self):
+        caching._local_cache.clear()
+        for text in ('foo', 'bar'):
+            BasicModel(text=text).save()
+        self.view = CachedRootView.as_view()
+
+    def test_response_is_cached(self):
+        response = self.view(factory.get('/')).render()
+        self.assertEquals(response.status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            cached = self.view(factory.get('/')).render()
+        self.assertEquals(cached.status_code, status.HTTP_200_OK)
+        self.assertEquals(cached.content, response.content)
+        self.assertEquals(cached['Content-Type'], response['Content-Type'])
+
+    def test_key_varies_with_query_and_media_type(self):
+        self.view(factory.get('/')).render()
+        # Bypasses invalidation, so only uncached responses see the change.
+        BasicModel.objects.update(text='changed')
+        response = self.view(factory.get('/')).render()
+        self.assertEquals(json.loads(response.content)[0]['text'], 'foo')
+        response = self.view(factory.get('/?page=1')).render()
+        self.assertEquals(json.loads(response.content)[0]['text'], 'changed')
+        response = self.view(factory.get('/', HTTP_ACCEPT='text/html')).render()
+        self.assertTrue(response['Content-Type'].startswith('text/html'))
+        self.assertTrue('changed' in response.content)
+
+    def test_create_invalidates(self):
+        self.view(factory.get('/')).render()
+        request = factory.post('/', json.dumps({'text': 'baz'}),
+                               content_type='application/json')
+        self.view(request).render()
+        response = self.view(factory.get('/')).render()
+        self.assertEquals(len(json.loads(response.content)), 3)
+
+    def test_write_through_other_view_invalidates(self):
+        self.view(factory.get('/')).render()
+        request = factory.put('/', json.dumps({'text': 'qux'}),
+                              content_type='application/json')
+        CachedInstanceView.as_view()(request, pk=1).render()
+        response = self.view(factory.get('/')).render()
+        self.assertEquals(json.loads(response.content)[0]['text'], 'qux')
+
+    def test_write_through_uncached_view_does_not_invalidate(self):
+        self.view(factory.get('/')).render()
+        UncachedInstanceView.as_view()(factory.delete('/'), pk=1).render()
+        response = self.view(factory.get('/')).render()
+        self.assertEquals(len(json.loads(response.content)), 2)
+
+    def test_uncached_view_does_not_use_cache(self):
+        UncachedInstanceView.as_view()(factory.delete('/'), pk=1).render()
+        self.assertEquals(len(caching._local_cache._cache), 0)
+
+    def test_errors_are_not_cached(self):
+        view = CachedInstanceView.as_view()
+        response = view(factory.get('/'), pk=3).render()
+        self.assertEquals(response.status_code, status.HTTP_404_NOT_FOUND)
+        BasicModel.objects.create(text='baz')
+        response = view(factory.get('/'), pk=3).render()
+        self.assertEquals(response.status_code, status.HTTP_200_OK)
+
+    def test_timeout(self):
+        cache = caching._local_cache
+        now = cache.timer()
+        self.view(factory.get('/')).render()
+        BasicModel.objects.update(text='changed')
+        cache.timer = lambda: now + 61
+        try:
+            response = self.view(factory.get('/')).render()
+        finally:
+            del cache.timer
+        self.assertEquals(json.loads(response.content)[0]['text'], 'changed')
+
+
+class TestLocalMemoryCache(TestCase):
+    def test_incr(self):
+        cache = caching.LocalMemoryCache()
+        self.assertRaises(ValueError, cache.incr, 'key')
+        cache.set('key', 1)
+        self.assertEquals(cache.incr('key'), 2)
+        self.assertEquals(cache.get('key'), 2)
+
+
+class CachedConditionalView(generics.RetrieveAPIView):
+    model = BasicModel
+    response_cache_class = caching.ResponseCache
+    content_etags = True
+
+
+class TestCachedConditionalGet(TestCase):
+    def setUp(self):
+        caching._local_cache.clear()
+        BasicModel(text='foo').save()
+
+    def test_cached_response_not_modified(self):
+        view = CachedConditionalView.as_view()
+        etag = view(factory.get('/'), pk=1).render()['ETag']
+        request = factory.get('/', HTTP_IF_NONE_MATCH=etag)
+        with self.assertNumQueries(0):
+            response = view(request, pk=1).render()
+        self.assertEquals(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEquals(response.content, '')
+
+
+class HeaderAuthentication(BaseAuthentication):
+    def authenticate(self, request):
+        username = request.META.get('HTTP_X_USERNAME')
+        if username:
+            return (User.objects.get(username=username), None)
+
+
+class IsOwner(permissions.BasePermission):
+    """
+    Only allows access to objects whose text is the user's username.
+    """
+    def has_permission(self, request, view, obj=None):
+        return obj is None or obj.text == request.user.username
+
+
+class CachedOwnerView(generics.RetrieveAPIView):
+    model = BasicModel
+    response_cache_class = caching.ResponseCache
+    authentication_classes = (HeaderAuthentication,)
+    permission_classes = (IsOwner,)
+
+
+class TestCachedObjectPermissions(TestCase):
+    def setUp(self):
+        caching._local_cache.clear()
+        for username in ('alice', 'bob'):
+            User.objects.create_user(username, '%s@example.com' % username, 'password')
+        BasicModel(text='alice').save()
+
+    def test_cached_response_is_per_user(self):
+        view = CachedOwnerView.as_view()
+        response = view(factory.get('/', HTTP_X_USERNAME='alice'), pk=1).render()
+        self.assertEquals(response.status_code, status.HTTP_200_OK)
+        response = view(factory.get('/', HTTP_X_USERNAME='bob'), pk=1).render()
+        self.assertEquals(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -38,6 +38,17 @@ class SlugBasedInstanceView(InstanceView):
     serializer_class = SlugSerializer
 
 
+class LazyBasicSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BasicModel
+        lazy = True
+
+
+class LazyRootView(generics.ListAPIView):
+    model = BasicModel
+    serializer_class = LazyBasicSerializer
+
+
 class TestRootView(TestCase):
     def setUp(self):
         """
@@ -134,6 +145,17 @@ class TestRootView(TestCase):
         self.assertEquals(created.text, 'foobar')
 
 
+    def test_get_lazy_root_view(self):
+        """
+        GET requests to a list view with a lazy serializer should stream
+        the same content.
+        """
+        request = factory.get('/', HTTP_ACCEPT='application/json')
+        response = LazyRootView.as_view()(request).render()
+        self.assertEquals(response.status_code, status.HTTP_200_OK)
+        self.assertEquals(json.loads(response.content), self.data)
+
+
 class TestInstanceView(TestCase):
     def setUp(self):
         """
@@ -304,3 +326,90 @@ class TestCreateModelWithAutoNowAddField(TestCase):
         self.assertEquals(response.status_code, status.HTTP_201_CREATED)
         created = self.objects.get(id=1)
         self.assertEquals(created.content, 'foobar')
+
+
+class ConditionalCommentListView(generics.ListAPIView):
+    model = Comment
+    last_modified_field = 'created'
+
+
+class ConditionalCommentView(generics.RetrieveAPIView):
+    model = Comment
+    last_modified_field = 'created'
+
+
+class TestConditionalGet(TestCase):
+    def setUp(self):
+        for idx in range(3):
+            Comment.objects.create(email='foo@example.com', content='comment %d' % idx)
+        self.list_view = ConditionalCommentListView.as_view()
+        self.view = ConditionalCommentView.as_view()
+
+    def test_list_validators(self):
+        response = self.list_view(factory.get('/')).render()
+        self.assertEquals(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.has_header('ETag'))
+        self.assertTrue(response.has_header('Last-Modified'))
+
+    def test_list_not_modified_skips_serialization(self):
+        etag = self.list_view(factory.get('/')).render()['ETag']
+        request = factory.get('/', HTTP_IF_NONE_MATCH=etag)
+        with self.assertNumQueries(1):
+            response = self.list_view(request).render()
+        self.assertEquals(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEquals(response['ETag'], etag)
+
+    def test_list_etag_changes_on_delete(self):
+        etag = self.list_view(factory.get('/')).render()['ETag']
+        Comment.objects.get(pk=1).delete()
+        response = self.list_view(factory.get('/', HTTP_IF_NONE_MATCH=etag)).render()
+        self.assertEquals(response.status_code, status.HTTP_200_OK)
+        self.assertEquals(len(response.data), 2)
+
+    def test_list_etag_varies_with_media_type(self):
+        json_etag = self.list_view(factory.get('/', HTTP_ACCEPT='application/json')).render()['ETag']
+        html_etag = self.list_view(factory.get('/', HTTP_ACCEPT='text/html')).render()['ETag']
+        self.assertNotEquals(json_etag, html_etag)
+
+    def test_retrieve_not_modified(self):
+        etag = self.view(factory.get('/'), pk=1).render()['ETag']
+        request = factory.get('/', HTTP_IF_NONE_MATCH=etag)
+        response = self.view(request, pk=1).render()
+        self.assertEquals(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        response = self.view(request, pk=2).render()
+        self.assertEquals(response.status_code, status.HTTP_200_OK)
+
+    def test_retrieve_if_modified_since(self):
+        last_modified = self.view(factory.get('/'), pk=1).render()['Last-Modified']
+        request = factory.get('/', HTTP_IF_MODIFIED_SINCE=last_modified)
+        response = self.view(request, pk=1).render()
+        self.assertEquals(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        request = factory.get('/', HTTP_IF_MODIFIED_SINCE='Thu, 01 Jan 1970 00:00:00 GMT')
+        response = self.view(request, pk=1).render()
+        self.assertEquals(response.status_code, status.HTTP_200_OK)
+
+    def test_no_validators_by_default(self):
+        response = CommentView.as_view()(factory.get('/')).render()
+        self.assertFalse(response.has_header('ETag'))
+        self.assertFalse(response.has_header('Last-Modified'))
+
+
+class TestContentETags(TestCase):
+    def setUp(self):
+        BasicModel(text='foo').save()
+        self.view = RootView.as_view(content_etags=True)
+
+    def test_content_etag(self):
+        response = self.view(factory.get('/')).render()
+        self.assertEquals(response.status_code, status.HTTP_200_OK)
+        etag = response['ETag']
+        response = self.view(factory.get('/', HTTP_IF_NONE_MATCH=etag)).render()
+        self.assertEquals(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEquals(response.content, '')
+        self.assertEquals(response['ETag'], etag)
+
+    def test_content_etag_not_set_for_post(self):
+        request = factory.post('/', json.dumps({'text': 'bar'}),
+                               content_type='application/json')
+        response = self.view(request).render()
+        self.assertFalse(response.has_header('ETag'))
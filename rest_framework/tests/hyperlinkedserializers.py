@@ -1,4 +1,5 @@
 from django.conf.urls.defaults import patterns, url
+from django.core.exceptions import ValidationError
 from django.test import TestCase
 from django.test.client import RequestFactory
 from rest_framework import generics, status, serializers
@@ -180,6 +181,43 @@ class TestManyToManyHyperlinkedView(TestCase):
         self.assertEquals(response['Link'], '<%(url)s>; rel="related"; title="url"' % self.data[0])
 
 
+class TestManyHyperlinkedRelatedFieldFromNative(TestCase):
+    urls = 'rest_framework.tests.hyperlinkedserializers'
+
+    def setUp(self):
+        for item in ['foo', 'bar', 'baz']:
+            Anchor.objects.create(text=item)
+        self.field = serializers.ManyHyperlinkedRelatedField(
+            view_name='anchor-detail', queryset=Anchor.objects.all())
+
+    def test_from_native_many(self):
+        """
+        Hyperlinks should be resolved with a single query, preserving order.
+        """
+        urls = ['http://testserver/anchor/3/', '/anchor/1/',
+                'http://testserver/anchor/2/', '/anchor/3/']
+        into = {}
+        with self.assertNumQueries(1):
+            self.field.field_from_native({'rel': urls}, 'rel', into)
+        self.assertEquals([obj.text for obj in into['rel']],
+                          ['baz', 'foo', 'bar', 'baz'])
+
+    def test_from_native_many_errors(self):
+        """
+        Each invalid hyperlink should be reported, along with its index.
+        """
+        urls = ['/anchor/1/', '/anchor/7/', '/anchor/2/', '/basic/1/']
+        try:
+            self.field.field_from_native({'rel': urls}, 'rel', {})
+        except ValidationError as err:
+            self.assertEquals(err.messages, [
+                'Item 1: Invalid hyperlink - object does not exist.',
+                'Item 3: Invalid hyperlink - Incorrect URL match'
+            ])
+        else:
+            self.fail('ValidationError not raised')
+
+
 class TestCreateWithForeignKeys(TestCase):
     urls = 'rest_framework.tests.hyperlinkedserializers'
 
@@ -1,16 +1,23 @@
+from django.http import Http404
 from django.test import TestCase
 from django.test.client import RequestFactory
+from rest_framework import exceptions
 from rest_framework.negotiation import DefaultContentNegotiation
+from rest_framework.utils import mediatypes
+from rest_framework.utils.lru import LRUCache
+from rest_framework.utils.mediatypes import media_type_matches, parse_media_type
 
 factory = RequestFactory()
 
 
 class MockJSONRenderer(object):
     media_type = 'application/json'
+    format = 'json'
 
 
 class MockHTMLRenderer(object):
     media_type = 'text/html'
+    format = 'html'
 
 
 class TestAcceptedMediaType(TestCase):
@@ -35,3 +42,85 @@ class TestAcceptedMediaType(TestCase):
         request = factory.get('/', HTTP_ACCEPT='application/json; indent=8')
         accepted_renderer, accepted_media_type = self.select_renderer(request)
         self.assertEquals(accepted_media_type, 'application/json; indent=8')
+
+
+class TestNegotiationCache(TestCase):
+    def setUp(self):
+        self.renderers = [MockJSONRenderer(), MockHTMLRenderer()]
+        self.negotiator = DefaultContentNegotiation()
+
+    def test_result_is_cached(self):
+        request = factory.get('/', HTTP_ACCEPT='text/html, */*')
+        first = self.negotiator.select_renderer(request, self.renderers)
+        self.assertEquals(len(self.negotiator.renderer_cache), 1)
+        second = self.negotiator.select_renderer(request, self.renderers)
+        self.assertTrue(first[0] is self.renderers[1])
+        self.assertEquals(first, second)
+
+    def test_cached_result_uses_given_renderers(self):
+        request = factory.get('/', HTTP_ACCEPT='text/html')
+        self.negotiator.select_renderer(request, self.renderers)
+        renderers = [MockJSONRenderer(), MockHTMLRenderer()]
+        renderer, media_type = self.negotiator.select_renderer(request, renderers)
+        self.assertTrue(renderer is renderers[1])
+
+    def test_format_is_part_of_key(self):
+        request = factory.get('/')
+        renderer, media_type = self.negotiator.select_renderer(request, self.renderers, 'html')
+        self.assertEquals(media_type, 'text/html')
+        renderer, media_type = self.negotiator.select_renderer(request, self.renderers)
+        self.assertEquals(media_type, 'application/json')
+
+    def test_unknown_format_is_not_cached(self):
+        request = factory.get('/')
+        for idx in range(2):
+            self.assertRaises(Http404, self.negotiator.select_renderer,
+                              request, self.renderers, 'xml')
+        self.assertEquals(len(self.negotiator.renderer_cache), 0)
+
+    def test_not_acceptable_is_not_cached(self):
+        request = factory.get('/', HTTP_ACCEPT='application/unknown')
+        for idx in range(2):
+            self.assertRaises(exceptions.NotAcceptable, self.negotiator.select_renderer,
+                              request, self.renderers)
+        self.assertEquals(len(self.negotiator.renderer_cache), 0)
+
+
+class TestLRUCache(TestCase):
+    def test_least_recently_used_is_discarded(self):
+        cache = LRUCache(2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        self.assertEquals(cache.get('a'), 1)
+        cache.set('c', 3)
+        self.assertEquals(len(cache), 2)
+        self.assertFalse('b' in cache)
+        self.assertEquals(cache.get('a'), 1)
+        self.assertEquals(cache.get('c'), 3)
+        self.assertEquals(cache.get('b', 'missing'), 'missing')
+
+
+class TestParseMediaType(TestCase):
+    def test_media_types_are_interned(self):
+        media_type = parse_media_type('application/json; indent=4')
+        self.assertTrue(parse_media_type('application/json; indent=4') is media_type)
+        self.assertEquals(media_type.main_type, 'application')
+        self.assertEquals(media_type.sub_type, 'json')
+        self.assertEquals(media_type.params, {'indent': '4'})
+        self.assertEquals(media_type.precedence, 3)
+
+    def test_media_types_are_immutable(self):
+        media_type = parse_media_type('text/html')
+        self.assertRaises(AttributeError, setattr, media_type, 'sub_type', 'plain')
+
+    def test_quality_is_ignored(self):
+        media_type = parse_media_type('text/html; q=0.9')
+        self.assertEquals(media_type.precedence, 2)
+        self.assertTrue(media_type.match(parse_media_type('text/html')))
+        self.assertTrue(media_type_matches('text/*', 'text/html; q=0.5'))
+        self.assertFalse(media_type_matches('text/html; charset=utf-8', 'text/html'))
+
+    def test_cache_is_bounded(self):
+        for idx in range(mediatypes._MEDIA_TYPES_MAX + 1):
+            parse_media_type('application/x-test-%d' % idx)
+        self.assertTrue(len(mediatypes._media_types) <= mediatypes._MEDIA_TYPES_MAX)
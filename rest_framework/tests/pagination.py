@@ -5,7 +5,7 @@ from django.core.paginator import Paginator
 from django.test import TestCase
 from django.test.client import RequestFactory
 from django.utils import unittest
-from rest_framework import generics, status, pagination, filters
+from rest_framework import generics, status, pagination, filters, serializers
 from rest_framework.compat import django_filters
 from rest_framework.tests.models import BasicModel, FilterableItem
 
@@ -250,3 +250,28 @@ class UnitTestPagination(TestCase):
         self.assertEquals(serializer.data['next'], None)
         self.assertEquals(serializer.data['previous'], '?page=2')
         self.assertEquals(serializer.data['results'], self.objects[20:])
+
+
+class DynamicSerializerRootView(RootView):
+    def get_serializer_class(self):
+        class DynamicSerializer(serializers.ModelSerializer):
+            class Meta:
+                model = BasicModel
+        return DynamicSerializer
+
+
+class TestPaginationSerializerClassCache(TestCase):
+    def test_cache_is_bounded(self):
+        """
+        Serializer classes built per request shouldn't be kept forever.
+        """
+        view = DynamicSerializerRootView()
+        cache = generics.GenericAPIView._serializer_class_cache
+        for idx in range(cache.maxsize + 10):
+            view.get_pagination_serializer_class()
+        self.assertTrue(len(cache) <= cache.maxsize)
+
+    def test_class_is_reused(self):
+        view = RootView()
+        self.assertTrue(view.get_pagination_serializer_class() is
+                        view.get_pagination_serializer_class())
@@ -134,9 +134,15 @@
 from StringIO import StringIO
 from django import forms
 from django.test import TestCase
+from django.utils import simplejson as json
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
 from rest_framework.parsers import FormParser
+from rest_framework.parsers import JSONParser
 from rest_framework.parsers import XMLParser
+from decimal import Decimal
 import datetime
+import types
 
 
 class Form(forms.Form):
@@ -210,3 +216,134 @@ class TestXMLParser(TestCase):
         parser = XMLParser()
         data = parser.parse(self._complex_data_input)
         self.assertEqual(data, self._complex_data)
+
+    def test_type_convert(self):
+        parser = XMLParser()
+        values = [
+            ('2011-12-25 12:45:00', datetime.datetime(2011, 12, 25, 12, 45)),
+            ('2011-13-25 12:45:00', '2011-13-25 12:45:00'),
+            ('12', 12),
+            (' -12 ', -12),
+            ('1.50', Decimal('1.50')),
+            ('1e3', Decimal('1e3')),
+            ('12a', '12a'),
+            ('', ''),
+            (None, None)
+        ]
+        for value, expected in values:
+            converted = parser._type_convert(value)
+            self.assertEqual(type(converted), type(expected))
+            self.assertEqual(converted, expected)
+
+    def test_list_parse(self):
+        parser = XMLParser()
+        data = parser.parse(StringIO(
+            '<root>'
+            '<list-item><id>1</id></list-item>'
+            '<list-item><id>2</id><tags><list-item>a</list-item></tags></list-item>'
+            '</root>'
+        ))
+        self.assertEqual(data, [{'id': 1}, {'id': 2, 'tags': ['a']}])
+
+    def test_parse_stream(self):
+        """
+        List items should be parsed as the generator is consumed.
+        """
+        content = '<root>%s</root>' % ''.join([
+            '<list-item><id>%d</id></list-item>' % idx for idx in range(5000)
+        ])
+        stream = StringIO(content)
+        data = XMLParser().parse_stream(stream)
+        self.assertEqual(data.next(), {'id': 0})
+        self.assertTrue(stream.tell() < len(content))
+        self.assertEqual(list(data), [{'id': idx} for idx in range(1, 5000)])
+
+    def test_parse_stream_dict(self):
+        data = XMLParser().parse_stream(self._complex_data_input)
+        self.assertEqual(data, self._complex_data)
+
+    def test_parse_error(self):
+        parser = XMLParser()
+        self.assertRaises(ParseError, parser.parse, StringIO('<root><a></root>'))
+        data = parser.parse_stream(StringIO('<root><list-item/><list-item>'))
+        self.assertRaises(ParseError, list, data)
+
+
+class TestJSONParserStream(TestCase):
+    def setUp(self):
+        self.data = [
+            {'id': idx, 'name': u'item \u00e9 %d' % idx, 'tags': ['a', 'b'],
+             'price': idx * 1.5, 'active': bool(idx % 2), 'parent': None}
+            for idx in range(50)
+        ]
+        self.content = json.dumps(self.data)
+
+    def parse_stream(self, content, chunk_size=7):
+        parser = JSONParser()
+        parser.stream_chunk_size = chunk_size
+        return parser.parse_stream(StringIO(content))
+
+    def test_parse_stream(self):
+        """
+        Elements should be decoded correctly, whichever chunk boundaries
+        they are split over.
+        """
+        for chunk_size in (1, 2, 7, 64, 64 * 1024):
+            data = self.parse_stream(self.content, chunk_size)
+            self.assertTrue(isinstance(data, types.GeneratorType))
+            self.assertEqual(list(data), self.data)
+
+    def test_parse_stream_is_incremental(self):
+        stream = StringIO(self.content)
+        parser = JSONParser()
+        parser.stream_chunk_size = 64
+        data = parser.parse_stream(stream)
+        self.assertEqual(data.next(), self.data[0])
+        self.assertTrue(stream.tell() < len(self.content) / 10)
+
+    def test_parse_stream_decodes_elements_once(self):
+        """
+        Elements split over many chunks should only be decoded once they
+        are complete, rather than once for each chunk.  Each element may be
+        tried once before it is known to be incomplete.
+        """
+        calls = []
+        decoder = json.JSONDecoder()
+        raw_decode = decoder.raw_decode
+
+        def counting_raw_decode(content, pos=0):
+            calls.append(pos)
+            return raw_decode(content, pos)
+
+        decoder.raw_decode = counting_raw_decode
+        content = json.dumps([['x' * 10] * 100, {'a': '],}'}, 2])
+        data = parsers._iter_json_array(StringIO(content[16:]), decoder,
+                                        content[:16], 1, 16)
+        self.assertEqual(list(data), json.loads(content))
+        self.assertTrue(len(calls) <= 6)
+
+    def test_parse_stream_numbers(self):
+        """
+        Numbers split over chunk boundaries should not be truncated.
+        """
+        self.assertEqual(list(self.parse_stream('[12345, 678.9, -10]', 3)),
+                         [12345, 678.9, -10])
+
+    def test_parse_stream_whitespace(self):
+        self.assertEqual(list(self.parse_stream(' \n[ 1 ,\n 2 ] \n', 1)), [1, 2])
+
+    def test_parse_stream_empty_array(self):
+        self.assertEqual(list(self.parse_stream('[]')), [])
+        self.assertEqual(list(self.parse_stream('  [ \n ]  ', 1)), [])
+
+    def test_parse_stream_object(self):
+        """
+        Content that isn't an array should be parsed in full.
+        """
+        self.assertEqual(self.parse_stream('{"a": [1, 2]}'), {'a': [1, 2]})
+
+    def test_parse_stream_invalid(self):
+        for content in ('[1, 2', '[1, 2,]', '[1 2]', '[1, 2] 3', '[{"a": }]'):
+            data = self.parse_stream(content)
+            self.assertRaises(ParseError, list, data)
+        self.assertRaises(ParseError, self.parse_stream, '{"a": ')
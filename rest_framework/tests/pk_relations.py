@@ -49,6 +49,24 @@ class ForeignKeySourceSerializer(serializers.ModelSerializer):
         model = ForeignKeySource
 
 
+# ForeignKey to a field other than the pk
+
+class ToFieldTarget(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+
+
+class ToFieldSource(models.Model):
+    name = models.CharField(max_length=100)
+    target = models.ForeignKey(ToFieldTarget, to_field='name', related_name='sources')
+
+
+class ToFieldTargetSerializer(serializers.ModelSerializer):
+    sources = serializers.ManyPrimaryKeyRelatedField(read_only=True)
+
+    class Meta:
+        model = ToFieldTarget
+
+
 # TODO: Add test that .data cannot be accessed prior to .is_valid
 
 class PrimaryKeyManyToManyTests(TestCase):
@@ -71,6 +89,12 @@ class PrimaryKeyManyToManyTests(TestCase):
         ]
         self.assertEquals(serializer.data, expected)
 
+    def test_many_to_many_retrieve_queries(self):
+        queryset = ManyToManySource.objects.all()
+        serializer = ManyToManySourceSerializer(queryset)
+        with self.assertNumQueries(2):
+            serializer.data
+
     def test_reverse_many_to_many_retrieve(self):
         queryset = ManyToManyTarget.objects.all()
         serializer = ManyToManyTargetSerializer(queryset)
@@ -99,6 +123,28 @@ class PrimaryKeyManyToManyTests(TestCase):
         ]
         self.assertEquals(serializer.data, expected)
 
+    def test_many_to_many_update_queries(self):
+        """
+        The related objects should be looked up with a single query,
+        preserving the order they were given in.
+        """
+        field = serializers.ManyPrimaryKeyRelatedField(
+            queryset=ManyToManyTarget.objects.all())
+        into = {}
+        with self.assertNumQueries(1):
+            field.field_from_native({'targets': [3, 1, 2, 1]}, 'targets', into)
+        self.assertEquals([obj.pk for obj in into['targets']], [3, 1, 2, 1])
+
+    def test_many_to_many_update_invalid(self):
+        data = {'id': 1, 'name': u'source-1', 'targets': [1, 4, 2, 5]}
+        instance = ManyToManySource.objects.get(pk=1)
+        serializer = ManyToManySourceSerializer(instance, data=data)
+        self.assertFalse(serializer.is_valid())
+        self.assertEquals(serializer.errors, {'targets': [
+            u"Invalid pk '4' - object does not exist.",
+            u"Invalid pk '5' - object does not exist."
+        ]})
+
     def test_reverse_many_to_many_update(self):
         data = {'id': 1, 'name': u'target-1', 'sources': [1]}
         instance = ManyToManyTarget.objects.get(pk=1)
@@ -166,6 +212,27 @@ class PrimaryKeyForeignKeyTests(TestCase):
         ]
         self.assertEquals(serializer.data, expected)
 
+    def test_foreign_key_retrieve_uses_column(self):
+        """
+        Forward foreign keys are read from the local column, without
+        loading the related objects.
+        """
+        queryset = ForeignKeySource.objects.all()
+        serializer = ForeignKeySourceSerializer(queryset)
+        with self.assertNumQueries(1):
+            serializer.data
+
+    def test_reverse_foreign_key_retrieve_queries(self):
+        """
+        Reverse relationships fetch the pks for all objects in one query.
+        """
+        for idx in range(3, 10):
+            ForeignKeyTarget.objects.create(name='target-%d' % idx)
+        queryset = ForeignKeyTarget.objects.all()
+        serializer = ForeignKeyTargetSerializer(queryset)
+        with self.assertNumQueries(2):
+            serializer.data
+
     def test_foreign_key_update(self):
         data = {'id': 1, 'name': u'source-1', 'target': 2}
         instance = ForeignKeySource.objects.get(pk=1)
@@ -204,3 +271,22 @@ class PrimaryKeyForeignKeyTests(TestCase):
     #         {'id': 2, 'name': u'target-2', 'sources': []},
     #     ]
     #     self.assertEquals(serializer.data, expected)
+
+
+class PrimaryKeyToFieldTests(TestCase):
+    def setUp(self):
+        for idx in range(1, 3):
+            ToFieldTarget.objects.create(name='target-%d' % idx)
+        target = ToFieldTarget.objects.get(name='target-2')
+        for idx in range(1, 3):
+            ToFieldSource.objects.create(name='source-%d' % idx, target=target)
+
+    def test_reverse_foreign_key_retrieve(self):
+        queryset = ToFieldTarget.objects.all()
+        serializer = ToFieldTargetSerializer(queryset)
+        expected = [
+            {'id': 1, 'name': u'target-1', 'sources': []},
+            {'id': 2, 'name': u'target-2', 'sources': [1, 2]},
+        ]
+        with self.assertNumQueries(2):
+            self.assertEquals(serializer.data, expected)
@@ -0,0 +1,138 @@
+from django.test import TestCase
+from django.test.client import RequestFactory
+from rest_framework import generics, serializers
+from rest_framework.tests.models import (Anchor, BlogPost, BlogPostComment,
+    ManyToManyModel)
+from rest_framework.utils.queryplan import get_query_plan
+
+
+factory = RequestFactory()
+
+
+class BlogPostCommentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BlogPostComment
+        exclude = ('blog_post',)
+
+
+class BlogPostSerializer(serializers.ModelSerializer):
+    comments = BlogPostCommentSerializer(source='blogpostcomment_set')
+
+    class Meta:
+        model = BlogPost
+
+
+class CommentWithPostSerializer(serializers.ModelSerializer):
+    title = serializers.Field(source='blog_post.title')
+
+    class Meta:
+        model = BlogPostComment
+
+
+class NestedCommentSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BlogPostComment
+        depth = 1
+
+
+class ManyToManySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ManyToManyModel
+
+
+class ManyToManyListView(generics.ListAPIView):
+    model = ManyToManyModel
+
+
+class BlogPostListView(generics.ListAPIView):
+    model = BlogPost
+    serializer_class = BlogPostSerializer
+
+
+class TestQueryPlan(TestCase):
+    def test_nested_reverse_relation_is_prefetched(self):
+        plan = get_query_plan(BlogPostSerializer(), BlogPost)
+        self.assertEquals(plan.select_related, [])
+        self.assertEquals(plan.prefetch_related, ['blogpostcomment_set'])
+
+    def test_local_foreign_key_is_not_planned(self):
+        """
+        Primary key fields read the foreign key column, so don't need a join.
+        """
+        plan = get_query_plan(BlogPostCommentSerializer(), BlogPostComment)
+        self.assertFalse(plan)
+
+    def test_dotted_source_is_selected(self):
+        plan = get_query_plan(CommentWithPostSerializer(), BlogPostComment)
+        self.assertEquals(plan.select_related, ['blog_post'])
+        self.assertEquals(plan.prefetch_related, [])
+
+    def test_nested_foreign_key_is_selected(self):
+        plan = get_query_plan(NestedCommentSerializer(), BlogPostComment)
+        self.assertEquals(plan.select_related, ['blog_post'])
+        self.assertEquals(plan.prefetch_related, [])
+
+    def test_many_to_many_pks_are_not_planned(self):
+        """
+        Many primary key fields look up the pks for all objects themselves.
+        """
+        plan = get_query_plan(ManyToManySerializer(), ManyToManyModel)
+        self.assertFalse(plan)
+
+    def test_many_to_many_is_prefetched(self):
+        class ManyToManyUnicodeSerializer(serializers.ModelSerializer):
+            rel = serializers.ManyRelatedField()
+
+            class Meta:
+                model = ManyToManyModel
+
+        plan = get_query_plan(ManyToManyUnicodeSerializer(), ManyToManyModel)
+        self.assertEquals(plan.select_related, [])
+        self.assertEquals(plan.prefetch_related, ['rel'])
+
+    def test_existing_select_related_is_kept(self):
+        plan = get_query_plan(CommentWithPostSerializer(), BlogPostComment)
+        queryset = BlogPostComment.objects.select_related('blog_post')
+        queryset = plan.apply(queryset)
+        self.assertEquals(queryset.query.select_related, {'blog_post': {}})
+
+
+class CommentWithPostListView(generics.ListAPIView):
+    model = BlogPostComment
+    serializer_class = CommentWithPostSerializer
+
+
+class TestQueryPlanView(TestCase):
+    def setUp(self):
+        anchors = [Anchor.objects.create() for idx in range(3)]
+        for idx in range(5):
+            ManyToManyModel.objects.create().rel.add(*anchors)
+
+    def test_list_view_prefetches(self):
+        """
+        Listing many to many relationships shouldn't query for each object.
+        """
+        view = ManyToManyListView.as_view()
+        request = factory.get('/')
+        with self.assertNumQueries(3):
+            response = view(request).render()
+        self.assertEquals(len(response.data), 5)
+        self.assertEquals(response.data[0]['rel'], [1, 2, 3])
+
+    def test_list_view_opt_out(self):
+        for idx in range(5):
+            post = BlogPost.objects.create(title='post %d' % idx)
+            post.blogpostcomment_set.create(text='comment')
+        view = BlogPostListView.as_view(query_planning=False)
+        request = factory.get('/')
+        with self.assertNumQueries(7):
+            view(request).render()
+
+    def test_deferred_queryset_is_not_planned(self):
+        view = CommentWithPostListView(request=factory.get('/'), format_kwarg=None)
+        queryset = BlogPostComment.objects.only('text', 'blog_post')
+        self.assertFalse(view.plan_queryset(queryset).query.select_related)
+        queryset = BlogPostComment.objects.defer('text')
+        self.assertFalse(view.plan_queryset(queryset).query.select_related)
+        queryset = BlogPostComment.objects.all()
+        self.assertTrue(view.plan_queryset(queryset).query.select_related)
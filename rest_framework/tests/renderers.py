@@ -3,20 +3,29 @@ import re
 
 from django.conf.urls.defaults import patterns, url, include
 from django.core.cache import cache
+from django.core.paginator import Paginator
 from django.test import TestCase
 from django.test.client import RequestFactory
 
-from rest_framework import status, permissions
+from rest_framework import status, permissions, serializers
+from rest_framework.pagination import PaginationSerializer
 from rest_framework.compat import yaml
+from rest_framework.exceptions import ParseError
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework.renderers import BaseRenderer, JSONRenderer, YAMLRenderer, \
-    XMLRenderer, JSONPRenderer, BrowsableAPIRenderer
-from rest_framework.parsers import YAMLParser, XMLParser
+    XMLRenderer, JSONPRenderer, BrowsableAPIRenderer, CSVRenderer, \
+    MessagePackRenderer
+from rest_framework.parsers import YAMLParser, XMLParser, MessagePackParser
 from rest_framework.settings import api_settings
 
+from django.utils.datastructures import SortedDict
+from django.utils.safestring import mark_safe
+from rest_framework.utils import dict2xml, encoders
+from rest_framework.utils import msgpack as purepack
 from StringIO import StringIO
 import datetime
+import types
 from decimal import Decimal
 
 
@@ -69,6 +78,13 @@ class MockGETView(APIView):
         return Response({'foo': ['bar', 'baz']})
 
 
+class StreamingView(APIView):
+    renderer_classes = (JSONRenderer, JSONPRenderer, YAMLRenderer, CSVRenderer)
+
+    def get(self, request, **kwargs):
+        return Response({'foo': idx} for idx in range(250))
+
+
 class HTMLView(APIView):
     renderer_classes = (BrowsableAPIRenderer, )
 
@@ -88,6 +104,7 @@ urlpatterns = patterns('',
     url(r'^cache$', MockGETView.as_view()),
     url(r'^jsonp/jsonrenderer$', MockGETView.as_view(renderer_classes=[JSONRenderer, JSONPRenderer])),
     url(r'^jsonp/nojsonrenderer$', MockGETView.as_view(renderer_classes=[JSONPRenderer])),
+    url(r'^stream$', StreamingView.as_view()),
     url(r'^html$', HTMLView.as_view()),
     url(r'^html1$', HTMLView1.as_view()),
     url(r'^api', include('rest_framework.urls', namespace='rest_framework'))
@@ -252,6 +269,129 @@ class JSONRendererTests(TestCase):
         content = renderer.render(obj, 'application/json; indent=2')
         self.assertEquals(strip_trailing_whitespace(content), _indented_repr)
 
+    def test_compact(self):
+        """
+        Test JSON rendering without whitespace.
+        """
+        obj = {'foo': ['bar', 'baz']}
+        renderer = JSONRenderer()
+        renderer.compact = True
+        content = renderer.render(obj, 'application/json')
+        self.assertEquals(content, '{"foo":["bar","baz"]}')
+
+    def test_compact_with_indent(self):
+        """
+        Test that an explicit indent takes precedence over compact output.
+        """
+        obj = {'foo': ['bar', 'baz']}
+        renderer = JSONRenderer()
+        renderer.compact = True
+        content = renderer.render(obj, 'application/json; indent=2')
+        self.assertEquals(strip_trailing_whitespace(content), _indented_repr)
+
+
+class JSONBackendTests(TestCase):
+    """
+    Tests for using alternative json modules.
+    """
+
+    def setUp(self):
+        import json
+
+        # A json module that doesn't support encoder classes, like ujson
+        self.module = types.ModuleType('minimaljson')
+        self.module.dumps = lambda data, **kwargs: json.dumps(data, **kwargs)
+        self.module.loads = json.loads
+
+        self.data = [SortedDict([
+            ('id', 1),
+            ('created', datetime.datetime(2012, 1, 1, 12, 30, 5, 1000)),
+            ('price', Decimal('1.50')),
+            ('tags', (tag for tag in ['a', 'b']))
+        ])]
+        self.expected = ('[{"id": 1, "created": "2012-01-01T12:30:05.001", '
+                         '"price": "1.50", "tags": ["a", "b"]}]')
+
+    def test_backend_setting(self):
+        renderer = JSONRenderer()
+        renderer.backend = 'json'
+        self.assertEquals(renderer.render(self.data), self.expected)
+
+    def test_backend_without_encoder_class(self):
+        backend = encoders.JSONBackend(self.module)
+        self.assertFalse(backend.supports_encoder_class)
+        self.assertEquals(backend.dumps(self.data), self.expected)
+
+    def test_to_primitive(self):
+        data = {'safe': mark_safe(u'text'), 'tags': [1, 2], 'date': datetime.date(2012, 1, 1)}
+        primitive = encoders.to_primitive(data)
+        self.assertEquals(primitive, {'safe': u'text', 'tags': [1, 2], 'date': '2012-01-01'})
+        self.assertTrue(primitive['tags'] is data['tags'])
+
+    def test_backend_load(self):
+        backend = encoders.JSONBackend(self.module)
+        self.assertEquals(backend.load(StringIO('{"a": [1, 2]}')), {'a': [1, 2]})
+
+    def test_invalid_backend(self):
+        self.assertRaises(ImportError, encoders.get_json_backend, 'nonexistentjson')
+
+
+class StreamingRendererTests(TestCase):
+    """
+    Tests for rendering lazy iterables incrementally.
+    """
+
+    urls = 'rest_framework.tests.renderers'
+
+    def setUp(self):
+        self.data = [{'foo': idx, 'bar': [idx, str(idx)]} for idx in range(250)]
+
+    def test_json_render_stream(self):
+        renderer = JSONRenderer()
+        chunks = list(renderer.render_stream(iter(self.data)))
+        self.assertEquals(len(chunks), 3)
+        self.assertEquals(''.join(chunks), renderer.render(self.data))
+
+    def test_json_render_stream_empty(self):
+        renderer = JSONRenderer()
+        self.assertEquals(list(renderer.render_stream(iter([]))), ['[]'])
+
+    def test_json_render_stream_compact(self):
+        renderer = JSONRenderer()
+        renderer.compact = True
+        content = ''.join(renderer.render_stream(iter(self.data)))
+        self.assertEquals(content, renderer.render(self.data))
+        self.assertFalse(' ' in content)
+
+    def test_json_render_stream_indent(self):
+        renderer = JSONRenderer()
+        content = ''.join(renderer.render_stream(iter(self.data),
+                                                 'application/json; indent=4'))
+        self.assertEquals(content, renderer.render(self.data,
+                                                   'application/json; indent=4'))
+
+    def test_streamed_response(self):
+        resp = self.client.get('/stream', HTTP_ACCEPT='application/json')
+        self.assertEquals(resp.status_code, 200)
+        self.assertEquals(resp['Content-Type'], 'application/json')
+        expected = JSONRenderer().render([{'foo': idx} for idx in range(250)])
+        self.assertEquals(resp.content, expected)
+
+    def test_streamed_jsonp_response(self):
+        resp = self.client.get('/stream', HTTP_ACCEPT='application/javascript')
+        expected = JSONRenderer().render([{'foo': idx} for idx in range(250)])
+        self.assertEquals(resp.content, 'callback(%s);' % expected)
+
+    if yaml:
+        def test_non_streaming_renderer(self):
+            """
+            Renderers that don't stream should be given the full list.
+            """
+            resp = self.client.get('/stream', HTTP_ACCEPT='application/yaml')
+            self.assertEquals(resp.status_code, 200)
+            self.assertEquals(resp.content, YAMLRenderer().render(
+                [{'foo': idx} for idx in range(250)]))
+
 
 class JSONPRendererTests(TestCase):
     """
@@ -323,6 +463,50 @@ if yaml:
             data = parser.parse(StringIO(content))
             self.assertEquals(obj, data)
 
+        def test_render_sorted_dict_and_decimal(self):
+            """
+            Test that field order is preserved, and decimals are rendered
+            as strings.
+            """
+            obj = SortedDict([('id', 2), ('price', Decimal('1.50')),
+                              ('tags', (tag for tag in ['a', 'b']))])
+            content = YAMLRenderer().render(obj, 'application/yaml')
+            self.assertEquals(content, "id: 2\nprice: '1.50'\ntags: [a, b]\n")
+
+        def test_libyaml_dumper(self):
+            if hasattr(yaml, 'CSafeDumper'):
+                self.assertTrue(issubclass(encoders.SafeDumper, yaml.CSafeDumper))
+                self.assertEquals(encoders.SafeLoader, yaml.CSafeLoader)
+
+        def test_render_multiple_documents(self):
+            obj = [{'id': idx, 'tags': ['a', 'b']} for idx in range(250)]
+            renderer = YAMLRenderer()
+            renderer.multiple_documents = True
+            self.assertTrue(renderer.streaming)
+            chunks = list(renderer.render_stream(item for item in obj))
+            self.assertEquals(len(chunks), 3)
+            self.assertEquals(''.join(chunks), renderer.render(obj))
+            self.assertEquals(list(yaml.safe_load_all(''.join(chunks))), obj)
+
+        def test_render_and_parse_multiple_documents(self):
+            obj = [{'id': idx} for idx in range(5)]
+            renderer = YAMLRenderer()
+            renderer.multiple_documents = True
+            content = renderer.render(obj, 'application/yaml')
+            data = YAMLParser().parse_stream(StringIO(content))
+            self.assertFalse(isinstance(data, list))
+            self.assertEquals(list(data), obj)
+
+        def test_parse_stream_single_document(self):
+            data = YAMLParser().parse_stream(StringIO('- 1\n- 2\n'))
+            self.assertEquals(data, [1, 2])
+
+        def test_parse_error(self):
+            parser = YAMLParser()
+            self.assertRaises(ParseError, parser.parse, StringIO('a: [1, 2'))
+            data = parser.parse_stream(StringIO('--- 1\n--- 2\n--- [3\n'))
+            self.assertRaises(ParseError, list, data)
+
 
 class XMLRendererTestCase(TestCase):
     """
@@ -415,12 +599,209 @@ class XMLRendererTestCase(TestCase):
         error_msg = "complex data differs!IN:\n %s \n\n OUT:\n %s" % (repr(self._complex_data), repr(complex_data_out))
         self.assertEqual(self._complex_data, complex_data_out, error_msg)
 
+    def test_render_matches_dict2xml(self):
+        """
+        Test that the streaming renderer's output is identical to `dict2xml`.
+        """
+        data = [
+            self._complex_data,
+            {'text': u'caf\xe9 & <b>', 'bytes': 'caf\xc3\xa9', 'none': None,
+             'nested': [[1, 2], (3,), [], {}], 'bool': True},
+            u'\u2603',
+            None
+        ]
+        renderer = XMLRenderer()
+        for obj in data[:-1] + [data]:
+            self.assertEqual(renderer.render(obj), dict2xml(obj))
+
+    def test_render_stream(self):
+        data = [{'foo': idx, 'bar': [idx, str(idx)]} for idx in range(250)]
+        renderer = XMLRenderer()
+        renderer.stream_chunk_size = 100
+        chunks = list(renderer.render_stream(item for item in data))
+        # 1251 elements: the root, and five for each item
+        self.assertEqual(len(chunks), 13)
+        self.assertEqual(''.join(chunks), dict2xml(data))
+
     def assertXMLContains(self, xml, string):
         self.assertTrue(xml.startswith('<?xml version="1.0" encoding="utf-8"?>\n<root>'))
         self.assertTrue(xml.endswith('</root>'))
         self.assertTrue(string in xml, '%r not in %r' % (string, xml))
 
 
+class MessagePackRendererTests(TestCase):
+    """
+    Tests specific to the MessagePack Renderer
+    """
+
+    def test_render_and_parse(self):
+        obj = SortedDict([
+            ('id', 1),
+            ('name', u'caf\xe9'),
+            ('created', datetime.datetime(2012, 1, 1, 12, 30, 5, 1000)),
+            ('price', Decimal('1.50')),
+            ('tags', (tag for tag in ['a', 'b'])),
+            ('ratio', 0.5),
+            ('active', True),
+            ('parent', None)
+        ])
+        content = MessagePackRenderer().render(obj, 'application/msgpack')
+        data = MessagePackParser().parse(StringIO(content))
+        self.assertEquals(data, {
+            'id': 1, 'name': u'caf\xe9', 'created': '2012-01-01T12:30:05.001',
+            'price': '1.50', 'tags': ['a', 'b'], 'ratio': 0.5, 'active': True,
+            'parent': None
+        })
+
+    def test_sorted_dict_order(self):
+        obj = SortedDict([('b', 1), ('a', 2)])
+        content = MessagePackRenderer().render(obj, 'application/msgpack')
+        self.assertEquals(content, '\x82\xa1b\x01\xa1a\x02')
+
+    def test_parse_error(self):
+        parser = MessagePackParser()
+        self.assertRaises(ParseError, parser.parse, StringIO('\x92\x01'))
+        self.assertRaises(ParseError, parser.parse, StringIO('\x01\x02'))
+
+
+class PureMessagePackTests(TestCase):
+    """
+    Tests for the pure Python MessagePack fallback.
+    """
+
+    def test_pack(self):
+        values = [
+            (None, '\xc0'), (False, '\xc2'), (True, '\xc3'),
+            (0, '\x00'), (127, '\x7f'), (128, '\xcc\x80'), (256, '\xcd\x01\x00'),
+            (2 ** 32, '\xcf\x00\x00\x00\x01\x00\x00\x00\x00'),
+            (-1, '\xff'), (-32, '\xe0'), (-33, '\xd0\xdf'), (-129, '\xd1\xff\x7f'),
+            (1.5, '\xcb\x3f\xf8\x00\x00\x00\x00\x00\x00'),
+            (u'', '\xa0'), ('abc', '\xa3abc'), (u'\xe9', '\xa2\xc3\xa9'),
+            ('a' * 32, '\xda\x00\x20' + 'a' * 32),
+            ([], '\x90'), ((1, 2), '\x92\x01\x02'), (range(16), '\xdc\x00\x10' + ''.join(map(chr, range(16)))),
+            ({}, '\x80'), ({'a': [1]}, '\x81\xa1a\x91\x01'),
+        ]
+        for value, expected in values:
+            self.assertEquals(purepack.packb(value), expected)
+
+    def test_round_trip(self):
+        values = [
+            None, True, False, 0, 1, -1, 2 ** 63 - 1, -2 ** 63, 2 ** 64 - 1, 0.25,
+            u'caf\xe9', u'x' * 70000, range(70000), dict([(unicode(i), i) for i in range(20)]),
+            [{u'a': [1, 2, {u'b': None}]}]
+        ]
+        for value in values:
+            self.assertEquals(purepack.unpackb(purepack.packb(value)), value)
+
+    def test_unpack_formats(self):
+        self.assertEquals(purepack.unpackb('\xc4\x02ab'), 'ab')
+        self.assertEquals(purepack.unpackb('\xd9\x02ab'), u'ab')
+        self.assertEquals(purepack.unpackb('\xca\x3f\xc0\x00\x00'), 1.5)
+
+    def test_default(self):
+        default = lambda obj: [str(obj)]
+        self.assertEquals(purepack.packb(Decimal('1.5'), default=default), '\x91\xa31.5')
+        self.assertRaises(TypeError, purepack.packb, Decimal('1.5'))
+        self.assertRaises(TypeError, purepack.packb, 2 ** 64)
+
+    def test_unpack_invalid(self):
+        for content in ('', '\x92\x01', '\x01\x02', '\xc1', '\xa2\xff\xff', '\xdb\x00'):
+            self.assertRaises(ValueError, purepack.unpackb, content)
+
+
+class CSVOwnerSerializer(serializers.Serializer):
+    name = serializers.CharField()
+    email = serializers.CharField()
+
+
+class CSVItemSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    title = serializers.CharField()
+    owner = CSVOwnerSerializer()
+    tags = serializers.Field()
+
+
+class CSVPaginationSerializer(PaginationSerializer):
+    class Meta:
+        object_serializer_class = CSVItemSerializer
+
+
+class CSVItem(object):
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+class CSVRendererTests(TestCase):
+    """
+    Tests specific to the CSV Renderer
+    """
+
+    urls = 'rest_framework.tests.renderers'
+
+    def setUp(self):
+        self.items = [
+            CSVItem(id=idx, title=u'caf\xe9, "%d"' % idx, tags=['a', 'b'],
+                    owner=CSVItem(name='owner %d' % idx, email='%d@example.com' % idx))
+            for idx in range(3)
+        ]
+        self.expected = (
+            'id,title,owner.name,owner.email,tags\r\n'
+            '0,"caf\xc3\xa9, ""0""",owner 0,0@example.com,"[""a"", ""b""]"\r\n'
+            '1,"caf\xc3\xa9, ""1""",owner 1,1@example.com,"[""a"", ""b""]"\r\n'
+            '2,"caf\xc3\xa9, ""2""",owner 2,2@example.com,"[""a"", ""b""]"\r\n'
+        )
+
+    def test_render_serializer_data(self):
+        """
+        Columns should follow the serializer's field order, with nested
+        objects flattened into dotted headers.
+        """
+        data = CSVItemSerializer(self.items).data
+        self.assertEquals(CSVRenderer().render(data), self.expected)
+
+    def test_render_single_object(self):
+        data = CSVItemSerializer(self.items[0]).data
+        self.assertEquals(CSVRenderer().render(data),
+                          ''.join(self.expected.splitlines(True)[:2]))
+
+    def test_render_paginated_data(self):
+        page = Paginator(self.items, 2).page(2)
+        data = CSVPaginationSerializer(instance=page).data
+        self.assertEquals(CSVRenderer().render(data),
+                          ''.join(self.expected.splitlines(True)[0:1] +
+                                  self.expected.splitlines(True)[3:]))
+
+    def test_render_values(self):
+        data = [SortedDict([
+            ('created', datetime.datetime(2012, 1, 1, 12, 30, 5, 1000)),
+            ('price', Decimal('1.50')),
+            ('ratio', 0.1),
+            ('active', True),
+            ('missing', None),
+            ('nested', {'b': 2, 'a': 1})
+        ])]
+        self.assertEquals(CSVRenderer().render(data),
+                          'created,price,ratio,active,missing,nested.a,nested.b\r\n'
+                          '2012-01-01T12:30:05.001,1.50,0.1,True,,1,2\r\n')
+
+    def test_render_empty(self):
+        self.assertEquals(CSVRenderer().render([]), '')
+
+    def test_render_stream(self):
+        renderer = CSVRenderer()
+        data = CSVItemSerializer(self.items * 100).data
+        chunks = list(renderer.render_stream(item for item in data))
+        self.assertEquals(len(chunks), 3)
+        self.assertEquals(''.join(chunks), renderer.render(data))
+
+    def test_csv_format(self):
+        resp = self.client.get('/stream?format=csv')
+        self.assertEquals(resp.status_code, 200)
+        self.assertEquals(resp['Content-Type'], 'text/csv')
+        expected = 'foo\r\n' + ''.join(['%d\r\n' % idx for idx in range(250)])
+        self.assertEquals(resp.content, expected)
+
+
 # Tests for caching issue, #346
 class CacheRenderTest(TestCase):
     """
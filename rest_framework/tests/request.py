@@ -237,11 +237,50 @@ class MockView(APIView):
 
         return Response(status=status.INTERNAL_SERVER_ERROR)
 
+
+class LazyDataView(APIView):
+    lazy_request_data = True
+    parser_classes = (JSONParser,)
+
+    def post(self, request):
+        return Response({
+            'lazy': not isinstance(request.DATA, (list, dict)),
+            'items': list(request.DATA)
+        })
+
 urlpatterns = patterns('',
     (r'^$', MockView.as_view()),
+    (r'^lazy$', LazyDataView.as_view()),
 )
 
 
+class TestLazyRequestData(TestCase):
+    urls = 'rest_framework.tests.request'
+
+    def test_lazy_request_data(self):
+        """
+        Ensures request.DATA is a lazy iterable of array elements, when the
+        view allows it.
+        """
+        content = json.dumps([{'id': 1}, {'id': 2}])
+        response = self.client.post('/lazy', content, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'lazy': True, 'items': [{'id': 1}, {'id': 2}]})
+
+    def test_lazy_request_data_parse_error(self):
+        """
+        Parse errors raised while consuming the data should be handled by the view.
+        """
+        response = self.client.post('/lazy', '[{"id": 1}, {"id"',
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_non_lazy_request_data(self):
+        request = Request(factory.post('/', '[1, 2]', content_type='application/json'),
+                          parsers=(JSONParser(),))
+        self.assertEqual(request.DATA, [1, 2])
+
+
 class TestContentParsingWithAuthentication(TestCase):
     urls = 'rest_framework.tests.request'
 
@@ -1,7 +1,8 @@
 from django.conf.urls.defaults import patterns, url
+from django.core.urlresolvers import NoReverseMatch, Resolver404
 from django.test import TestCase
 from django.test.client import RequestFactory
-from rest_framework.reverse import reverse
+from rest_framework.reverse import reverse, reverse_cached, resolve_cached
 
 factory = RequestFactory()
 
@@ -11,6 +12,13 @@ def null_view(request):
 
 urlpatterns = patterns('',
     url(r'^view$', null_view, name='view'),
+    url(r'^items/(?P<pk>\d+)/$', null_view, name='item'),
+    url(r'^items/(?P<slug>[-\w]+)/$', null_view, name='item'),
+    url(r'^pages/(?P<pk>\d+)\.(?P<format>[a-z]+)$', null_view, name='page'),
+    url(r'^things/new/$', null_view, name='thing-new'),
+    url(r'^things/(?P<slug>[a-z]+)/$', null_view, name='thing'),
+    url(r'^tags/(?P<slug>[-\w]+)/$', null_view, name='tag'),
+    url(r'^tags/(?P<pk>\d+)/$', null_view, name='tag'),
 )
 
 
@@ -24,3 +32,86 @@ class ReverseTests(TestCase):
         request = factory.get('/view')
         url = reverse('view', request=request)
         self.assertEqual(url, 'http://testserver/view')
+
+
+class ReverseCachedTests(TestCase):
+    """
+    Tests for `reverse_cached`, which formats URLs using a cached template.
+    """
+    urls = 'rest_framework.tests.reverse'
+
+    def test_reverse_cached(self):
+        for pk in (1, 2, 10, 11):
+            url = reverse_cached('item', {'pk': pk})
+            self.assertEqual(url, reverse('item', kwargs={'pk': pk}))
+
+    def test_reverse_cached_slug(self):
+        for slug in ('first', 'second-item', 'item'):
+            url = reverse_cached('item', {'slug': slug})
+            self.assertEqual(url, reverse('item', kwargs={'slug': slug}))
+
+    def test_reverse_cached_format(self):
+        for pk in (1, 2):
+            url = reverse_cached('page', {'pk': pk}, format='json')
+            self.assertEqual(url, '/pages/%d.json' % pk)
+
+    def test_reverse_cached_fully_qualified(self):
+        request = factory.get('/view')
+        for pk in (1, 2):
+            url = reverse_cached('item', {'pk': pk}, request=request)
+            self.assertEqual(url, 'http://testserver/items/%d/' % pk)
+
+    def test_reverse_cached_does_not_match(self):
+        self.assertRaises(NoReverseMatch, reverse_cached, 'item', {'pk': -1})
+
+    def test_reverse_cached_checks_pattern(self):
+        """
+        Values formatted into a cached template must still match the
+        URL pattern, as they would for `reverse`.
+        """
+        self.assertEqual(reverse_cached('thing', {'slug': 'ab'}), '/things/ab/')
+        self.assertRaises(NoReverseMatch, reverse, 'thing', kwargs={'slug': 'ab_1'})
+        self.assertRaises(NoReverseMatch, reverse_cached, 'thing', {'slug': 'ab_1'})
+        self.assertEqual(reverse_cached('thing', {'slug': 'cd'}), '/things/cd/')
+
+
+class ResolveCachedTests(TestCase):
+    """
+    Tests for `resolve_cached`, which remembers previously resolved paths.
+    """
+    urls = 'rest_framework.tests.reverse'
+
+    def test_resolve_cached(self):
+        for pk in ('1', '2', '10'):
+            self.assertEqual(resolve_cached('/items/%s/' % pk),
+                             ('item', {'pk': pk}))
+
+    def test_resolve_cached_same_shape(self):
+        """
+        Paths that differ only in their values may resolve to different
+        patterns, eg. the pk and slug patterns for 'item'.
+        """
+        self.assertEqual(resolve_cached('/items/1/'), ('item', {'pk': '1'}))
+        self.assertEqual(resolve_cached('/items/foo/'), ('item', {'slug': 'foo'}))
+        self.assertEqual(resolve_cached('/items/2/'), ('item', {'pk': '2'}))
+        self.assertEqual(resolve_cached('/items/bar/'), ('item', {'slug': 'bar'}))
+
+    def test_resolve_cached_no_match(self):
+        self.assertRaises(Resolver404, resolve_cached, '/nothing/')
+
+    def test_resolve_cached_pattern_order(self):
+        """
+        Paths resolve to the first matching pattern, eg. the slug pattern
+        for 'tag', which comes before the pk pattern.
+        """
+        self.assertEqual(resolve_cached('/tags/foo/'), ('tag', {'slug': 'foo'}))
+        self.assertEqual(resolve_cached('/tags/1/'), ('tag', {'slug': '1'}))
+        self.assertEqual(resolve_cached('/tags/1/'), ('tag', {'slug': '1'}))
+
+    def test_resolve_cached_earlier_literal_pattern(self):
+        self.assertEqual(resolve_cached('/things/old/'), ('thing', {'slug': 'old'}))
+        self.assertEqual(resolve_cached('/things/new/'), ('thing-new', {}))
+
+    def test_resolve_cached_rejected_value(self):
+        self.assertEqual(resolve_cached('/things/old/'), ('thing', {'slug': 'old'}))
+        self.assertRaises(Resolver404, resolve_cached, '/things/ab_1/')
@@ -1,6 +1,8 @@
+import copy
 import datetime
 from django.test import TestCase
-from rest_framework import serializers
+from django.core.paginator import Paginator
+from rest_framework import caching, fields, pagination, serializers
 from rest_framework.tests.models import (ActionItem, Anchor, BasicModel,
     BlankFieldModel, BlogPost, CallableDefaultValueModel, DefaultValueModel,
     ManyToManyModel, Person, ReadOnlyManyToManyModel)
@@ -25,6 +27,9 @@ class Comment(object):
         sub_comment = SubComment('And Merry Christmas!')
         return sub_comment
 
+    def get_greeting(self, greeting='Hello'):
+        return greeting
+
 
 class CommentSerializer(serializers.Serializer):
     email = serializers.EmailField()
@@ -536,3 +541,388 @@ class BlankFieldTests(TestCase):
         """
         serializer = self.not_blank_model_serializer_class(data=self.data)
         self.assertEquals(serializer.is_valid(), False)
+
+
+class FieldPlanTests(TestCase):
+    def setUp(self):
+        self.calls = calls = []
+
+        class CountingSerializer(serializers.ModelSerializer):
+            class Meta:
+                model = ActionItem
+                fields = ('done', 'title')
+
+            def default_fields(self, nested=False):
+                calls.append(nested)
+                return super(CountingSerializer, self).default_fields(nested)
+
+        self.serializer_class = CountingSerializer
+        ActionItem.objects.create(title='one')
+        ActionItem.objects.create(title='two', done=True)
+
+    def test_default_fields_computed_once_per_class(self):
+        """
+        Default fields should be built once, and reused for every object
+        and every serializer instance.
+        """
+        queryset = ActionItem.objects.all()
+        first = self.serializer_class(queryset).data
+        second = self.serializer_class(queryset).data
+        self.assertEquals(first, second)
+        self.assertEquals(self.calls, [False])
+
+    def test_default_fields_not_cached(self):
+        """
+        Default fields may depend on the instance, if the cache key hook
+        is overridden to return `None`.
+        """
+        class ContextSerializer(self.serializer_class):
+            def get_default_fields_cache_key(self, nested=False):
+                return None
+
+            def get_field(self, model_field):
+                field = super(ContextSerializer, self).get_field(model_field)
+                field.read_only = self.context.get('read_only', False)
+                return field
+
+        one = ContextSerializer(context={'read_only': True})
+        two = ContextSerializer()
+        self.assertTrue(one.get_fields()['title'].read_only)
+        self.assertFalse(two.get_fields()['title'].read_only)
+        self.assertEquals(self.calls, [False, False])
+
+    def test_objects_do_not_share_fields(self):
+        data = self.serializer_class(ActionItem.objects.all()).data
+        self.assertEquals(data[0].fields, data[1].fields)
+        self.assertFalse(data[0].fields is data[1].fields)
+
+    def test_fields_order_preserved(self):
+        serializer = self.serializer_class(ActionItem.objects.all())
+        for item in serializer.data:
+            self.assertEquals(item.keys(), ['done', 'title'])
+
+    def test_instances_do_not_share_bound_fields(self):
+        one = self.serializer_class(context={'foo': 1})
+        two = self.serializer_class(context={'foo': 2})
+        self.assertEquals(one.get_fields()['title'].context, {'foo': 1})
+        self.assertEquals(two.get_fields()['title'].context, {'foo': 2})
+
+    def test_declared_fields_shared_until_modified(self):
+        """
+        Modifying `.fields` on one instance must not affect other instances.
+        """
+        one = CommentSerializer()
+        two = CommentSerializer()
+        self.assertTrue(one._fields is None)
+        one.fields['content'].read_only = True
+        one.fields.pop('email')
+        self.assertEquals(one.get_fields().keys(),
+                          ['content', 'created', 'sub_comment'])
+        self.assertTrue(one.get_fields()['content'].read_only)
+        self.assertFalse(two.get_fields()['content'].read_only)
+        self.assertFalse(CommentSerializer.base_fields['content'].read_only)
+
+    def test_declared_field_state_not_shared(self):
+        """
+        Validators, error messages and widgets of the declared fields must
+        not be shared with other instances.
+        """
+        one = CommentSerializer()
+        two = CommentSerializer()
+        one.fields['content'].validators.append(lambda value: None)
+        one.fields['content'].error_messages['required'] = 'Missing'
+        one.fields['content'].widget.attrs['class'] = 'wide'
+        field = two.fields['content']
+        self.assertEquals(len(field.validators), 1)
+        self.assertNotEquals(field.error_messages['required'], 'Missing')
+        self.assertEquals(field.widget.attrs, {})
+
+    def test_related_field_widget_not_shared(self):
+        class ActionItemsSerializer(serializers.Serializer):
+            item = serializers.PrimaryKeyRelatedField(
+                queryset=ActionItem.objects.all())
+
+        declared = ActionItemsSerializer.base_fields['item']
+        widget = declared.widget
+        choices = widget.choices
+        field = ActionItemsSerializer().get_fields()['item']
+        field.queryset = ActionItem.objects.filter(done=True)
+        self.assertFalse(field.widget is widget)
+        self.assertTrue(declared.widget is widget)
+        self.assertTrue(widget.choices is choices)
+
+
+class SourceTests(TestCase):
+    def setUp(self):
+        self.comments = [
+            Comment('tom@example.com', 'Happy new year!', None)
+            for idx in range(10)
+        ]
+        self.getargspec = fields.inspect.getargspec
+        self.inspected = inspected = []
+
+        def counting_getargspec(func):
+            inspected.append(func)
+            return self.getargspec(func)
+
+        fields.inspect.getargspec = counting_getargspec
+        fields._simple_callable_cache.clear()
+
+    def tearDown(self):
+        fields.inspect.getargspec = self.getargspec
+
+    def test_dotted_source(self):
+        serializer = CommentSerializer(self.comments)
+        for item in serializer.data:
+            self.assertEquals(item['sub_comment'], 'And Merry Christmas!')
+
+    def test_callable_inspected_once(self):
+        """
+        Callables in a dotted source should be inspected once per function,
+        not once per object.
+        """
+        CommentSerializer(self.comments).data
+        self.assertEquals(self.inspected, [Comment.get_sub_comment.im_func])
+
+    def test_callable_source_declared(self):
+        """
+        Fields that declare whether their source is callable should not
+        need to inspect it at all.
+        """
+        class GreetingSerializer(serializers.Serializer):
+            greeting = serializers.Field(source='get_greeting',
+                                         callable_source=True)
+            email = serializers.Field(callable_source=False)
+
+        data = GreetingSerializer(self.comments).data
+        self.assertEquals(data[0], {'greeting': 'Hello',
+                                    'email': 'tom@example.com'})
+        self.assertEquals(self.inspected, [])
+
+    def test_plain_source_not_checked(self):
+        """
+        Fields with a non-callable source shouldn't check each value.
+        """
+        checked = []
+        is_simple_callable = fields.is_simple_callable
+
+        def counting_is_simple_callable(obj):
+            checked.append(obj)
+            return is_simple_callable(obj)
+
+        class EmailSerializer(serializers.Serializer):
+            email = serializers.Field(callable_source=False)
+
+        fields.is_simple_callable = counting_is_simple_callable
+        try:
+            data = EmailSerializer(self.comments).data
+        finally:
+            fields.is_simple_callable = is_simple_callable
+        self.assertEquals(data[0], {'email': 'tom@example.com'})
+        self.assertEquals(checked, [])
+
+    def test_callable_passed_to_to_native(self):
+        class UpperField(serializers.Field):
+            def field_to_native(self, obj, field_name):
+                return self.to_native(lambda: obj.email.upper())
+
+        class EmailSerializer(serializers.Serializer):
+            email = UpperField()
+
+        data = EmailSerializer(self.comments).data
+        self.assertEquals(data[0], {'email': 'TOM@EXAMPLE.COM'})
+
+    def test_cache_is_bounded(self):
+        max_size = fields._SIMPLE_CALLABLE_CACHE_MAX
+        for idx in range(max_size + 1):
+            fields.is_simple_callable(lambda: None)
+        self.assertTrue(len(fields._simple_callable_cache) <= max_size)
+
+
+class LazySerializerTests(TestCase):
+    def setUp(self):
+        class BlogPostCommentSerializer(serializers.Serializer):
+            text = serializers.CharField()
+
+        class LazyBlogPostSerializer(serializers.ModelSerializer):
+            comments = BlogPostCommentSerializer(source='blogpostcomment_set')
+
+            class Meta:
+                model = BlogPost
+                lazy = True
+
+        for idx in range(5):
+            post = BlogPost.objects.create(title='post %d' % idx)
+            post.blogpostcomment_set.create(text='comment %d' % idx)
+
+        self.serializer_class = LazyBlogPostSerializer
+        self.expected = [
+            {'id': idx + 1, 'title': 'post %d' % idx,
+             'comments': [{'text': 'comment %d' % idx}]}
+            for idx in range(5)
+        ]
+
+    def test_lazy_data(self):
+        queryset = BlogPost.objects.all()
+        serializer = self.serializer_class(instance=queryset)
+        with self.assertNumQueries(0):
+            data = serializer.data
+        self.assertTrue(isinstance(data, serializers.LazyNativeList))
+        self.assertEquals(list(data), self.expected)
+
+    def test_lazy_data_is_reiterable(self):
+        serializer = self.serializer_class(instance=BlogPost.objects.all())
+        self.assertEquals(list(serializer.data), self.expected)
+        self.assertEquals(list(serializer.data), self.expected)
+
+    def test_lazy_data_skips_result_cache(self):
+        queryset = BlogPost.objects.all()
+        serializer = self.serializer_class(instance=queryset)
+        list(serializer.data)
+        self.assertEquals(queryset._result_cache, None)
+
+    def test_lazy_data_prefetches_each_chunk(self):
+        """
+        Prefetched relationships should be fetched for each chunk of objects.
+        """
+        queryset = BlogPost.objects.prefetch_related('blogpostcomment_set')
+        serializer = self.serializer_class(instance=queryset)
+        serializer.lazy_chunk_size = 2
+        # One query for the posts, and one for each chunk of comments
+        with self.assertNumQueries(4):
+            self.assertEquals(list(serializer.data), self.expected)
+
+    def test_lazy_single_object(self):
+        serializer = self.serializer_class(instance=BlogPost.objects.get(pk=1))
+        self.assertEquals(serializer.data, self.expected[0])
+
+
+class VersionedItem(object):
+    def __init__(self, pk, text, version):
+        self.pk = pk
+        self.text = text
+        self.version = version
+
+
+class FragmentCacheTests(TestCase):
+    def setUp(self):
+        caching._local_cache.clear()
+        self.converted = converted = []
+
+        class ItemSerializer(serializers.Serializer):
+            pk = serializers.IntegerField()
+            text = serializers.CharField()
+
+            class Meta:
+                fragment_cache_field = 'version'
+
+            def convert_object(self, obj):
+                converted.append(obj.pk)
+                return super(ItemSerializer, self).convert_object(obj)
+
+        self.serializer_class = ItemSerializer
+        self.items = [VersionedItem(idx, 'item %d' % idx, 1) for idx in range(3)]
+
+    def test_cached_objects_are_not_converted(self):
+        first = self.serializer_class(self.items).data
+        self.assertEquals(self.converted, [0, 1, 2])
+        self.items[1].text = 'changed'
+        self.items[2].text = 'changed'
+        self.items[2].version = 2
+        second = self.serializer_class(self.items).data
+        self.assertEquals(self.converted, [0, 1, 2, 2])
+        self.assertEquals(first[0], second[0])
+        self.assertEquals(second[1]['text'], 'item 1')
+        self.assertEquals(second[2]['text'], 'changed')
+        self.assertEquals(second[0].keys(), ['pk', 'text'])
+        self.assertEquals(second[0].fields.keys(), first[0].fields.keys())
+
+    def test_key_varies_with_format(self):
+        self.serializer_class(self.items, context={'format': 'json'}).data
+        self.serializer_class(self.items, context={'format': 'xml'}).data
+        self.assertEquals(len(self.converted), 6)
+
+    def test_single_object(self):
+        self.serializer_class(self.items[0]).data
+        data = self.serializer_class(self.items[0]).data
+        self.assertEquals(self.converted, [0])
+        self.assertEquals(data, {'pk': 0, 'text': 'item 0'})
+
+    def test_cached_data_keeps_order(self):
+        self.serializer_class(self.items).data
+        data = self.serializer_class(self.items).data
+        self.assertEquals(self.converted, [0, 1, 2])
+        self.assertTrue(isinstance(data[0], serializers.SortedDictWithMetadata))
+        self.assertEquals(data[0].keys(), ['pk', 'text'])
+
+    def test_key_varies_with_fields(self):
+        self.serializer_class(self.items).data
+        serializer = self.serializer_class(self.items)
+        del serializer.fields['text']
+        self.assertEquals(serializer.data[0], {'pk': 0})
+        self.assertEquals(self.converted, [0, 1, 2, 0, 1, 2])
+
+    def test_key_varies_with_class(self):
+        def make_serializer(source):
+            class ItemSerializer(serializers.Serializer):
+                text = serializers.Field(source=source)
+
+                class Meta:
+                    fragment_cache_field = 'version'
+            return ItemSerializer
+
+        self.assertEquals(make_serializer('text')(self.items[0]).data,
+                          {'text': 'item 0'})
+        self.assertEquals(make_serializer('pk')(self.items[0]).data,
+                          {'text': 0})
+
+    def test_data_is_unchanged_by_caching(self):
+        data = self.serializer_class(self.items[0]).data
+        copied = copy.copy(data)
+        self.assertEquals(copied.fields, data.fields)
+
+    def test_nested_data_keeps_fields(self):
+        class ParentSerializer(serializers.Serializer):
+            child = self.serializer_class()
+
+            class Meta:
+                fragment_cache_field = 'version'
+
+        parent = VersionedItem(10, 'parent', 1)
+        parent.child = self.items[0]
+        first = ParentSerializer(parent).data
+        second = ParentSerializer(parent).data
+        self.assertEquals(second, first)
+        self.assertEquals(second['child'].fields.keys(),
+                          first['child'].fields.keys())
+
+    def test_cached_data_is_not_shared(self):
+        self.serializer_class(self.items).data
+        data = self.serializer_class(self.items).data
+        data[0]['text'] = 'changed'
+        data = self.serializer_class(self.items).data
+        self.assertEquals(data[0]['text'], 'item 0')
+
+    def test_paginated_list(self):
+        class BasicSerializer(serializers.ModelSerializer):
+            class Meta:
+                model = BasicModel
+                fragment_cache_field = 'text'
+
+            def convert_object(self, obj):
+                converted.append(obj.pk)
+                return super(BasicSerializer, self).convert_object(obj)
+
+        class PaginatedBasicSerializer(pagination.PaginationSerializer):
+            class Meta:
+                object_serializer_class = BasicSerializer
+
+        converted = []
+        for idx in range(3):
+            BasicModel.objects.create(text='basic %d' % idx)
+        paginator = Paginator(BasicModel.objects.all(), 2)
+
+        first = PaginatedBasicSerializer(paginator.page(1)).data
+        second = PaginatedBasicSerializer(paginator.page(1)).data
+        self.assertEquals(len(converted), 2)
+        self.assertEquals(second['results'], first['results'])
@@ -4,8 +4,10 @@ from django.test import TestCase
 from django.test.client import RequestFactory
 from rest_framework import status
 from rest_framework.decorators import api_view
+from rest_framework.negotiation import DefaultContentNegotiation
 from rest_framework.response import Response
 from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
 from rest_framework.views import APIView, RedirectAPIView
 
 factory = RequestFactory()
@@ -118,4 +120,74 @@ class RedirectViewTests(TestCase):
         response = self.view(request)
         
         self.assertEquals(response.status_code, status.HTTP_302_FOUND)
-        self.assertEquals(response['Location'], 'http://testserver/basic/?foo=bar')
\ No newline at end of file
+        self.assertEquals(response['Location'], 'http://testserver/basic/?foo=bar')
+
+
+class CountingNegotiation(DefaultContentNegotiation):
+    calls = 0
+    stateless = True
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        CountingNegotiation.calls += 1
+        return super(CountingNegotiation, self).select_renderer(
+            request, renderers, format_suffix)
+
+
+class StatefulThrottle(BaseThrottle):
+    def allow_request(self, request, view):
+        return True
+
+
+class StatelessThrottle(BaseThrottle):
+    stateless = True
+
+    def allow_request(self, request, view):
+        return True
+
+
+class InheritedThrottle(StatelessThrottle):
+    pass
+
+
+class PolicyView(APIView):
+    throttle_classes = (StatefulThrottle, StatelessThrottle, InheritedThrottle)
+    content_negotiation_class = CountingNegotiation
+
+    def get(self, request, *args, **kwargs):
+        return Response({'renderer': id(request.accepted_renderer),
+                         'throttles': [id(throttle) for throttle in self.get_throttles()]})
+
+
+class PolicyInstanceTests(TestCase):
+    def setUp(self):
+        self.view = PolicyView.as_view()
+        CountingNegotiation.calls = 0
+
+    def test_stateless_policies_are_shared(self):
+        first = self.view(factory.get('/')).data
+        second = self.view(factory.get('/')).data
+        self.assertEquals(first['renderer'], second['renderer'])
+
+    def test_stateful_policies_are_not_shared(self):
+        """
+        Policies are only shared if the class itself is marked stateless.
+        """
+        view = PolicyView()
+        first = view.get_throttles()
+        second = view.get_throttles()
+        self.assertFalse(first[0] is second[0])
+        self.assertTrue(first[1] is second[1])
+        self.assertFalse(first[2] is second[2])
+
+    def test_subclass_has_own_instances(self):
+        class SubclassView(PolicyView):
+            pass
+        renderer = PolicyView().get_renderers()[0]
+        self.assertFalse(SubclassView().get_renderers()[0] is renderer)
+        self.assertTrue(PolicyView().get_renderers()[0] is renderer)
+
+    def test_not_acceptable_negotiates_once(self):
+        request = factory.get('/', HTTP_ACCEPT='application/unknown')
+        response = self.view(request)
+        self.assertEquals(response.status_code, status.HTTP_406_NOT_ACCEPTABLE)
+        self.assertEquals(CountingNegotiation.calls, 1)
@@ -98,3 +98,13 @@ class XMLRenderer():
 
 def dict2xml(input):
     return XMLRenderer().dict2xml(input)
+
+
+def is_lazy_iterable(data):
+    """
+    Return True if `data` is an iterable other than a list, tuple, dict or
+    string, eg. a generator.  Renderers that support streaming render lazy
+    iterables chunk by chunk, rather than all at once.
+    """
+    return (hasattr(data, '__iter__') and
+            not isinstance(data, (list, tuple, dict, basestring)))
@@ -4,10 +4,32 @@ Helper classes for parsers.
 import datetime
 import decimal
 import types
+from django.utils import importlib
 from django.utils import simplejson as json
 from django.utils.datastructures import SortedDict
-from rest_framework.compat import timezone
+from rest_framework.compat import msgpack, timezone
 from rest_framework.serializers import DictWithMetadata, SortedDictWithMetadata
+from rest_framework.settings import api_settings
+
+
+def _encode_datetime(o):
+    # For Date Time string spec, see ECMA 262
+    # http://ecma-international.org/ecma-262/5.1/#sec-15.9.1.15
+    r = o.isoformat()
+    if o.microsecond:
+        r = r[:23] + r[26:]
+    if r.endswith('+00:00'):
+        r = r[:-6] + 'Z'
+    return r
+
+
+def _encode_time(o):
+    if timezone and timezone.is_aware(o):
+        raise ValueError("JSON can't represent timezone-aware times.")
+    r = o.isoformat()
+    if o.microsecond:
+        r = r[:12]
+    return r
 
 
 class JSONEncoder(json.JSONEncoder):
@@ -16,24 +38,12 @@ class JSONEncoder(json.JSONEncoder):
     decimal types, and generators.
     """
     def default(self, o):
-        # For Date Time string spec, see ECMA 262
-        # http://ecma-international.org/ecma-262/5.1/#sec-15.9.1.15
         if isinstance(o, datetime.datetime):
-            r = o.isoformat()
-            if o.microsecond:
-                r = r[:23] + r[26:]
-            if r.endswith('+00:00'):
-                r = r[:-6] + 'Z'
-            return r
+            return _encode_datetime(o)
         elif isinstance(o, datetime.date):
             return o.isoformat()
         elif isinstance(o, datetime.time):
-            if timezone and timezone.is_aware(o):
-                raise ValueError("JSON can't represent timezone-aware times.")
-            r = o.isoformat()
-            if o.microsecond:
-                r = r[:12]
-            return r
+            return _encode_time(o)
         elif isinstance(o, decimal.Decimal):
             return str(o)
         elif hasattr(o, '__iter__'):
@@ -41,13 +51,192 @@ class JSONEncoder(json.JSONEncoder):
         return super(JSONEncoder, self).default(o)
 
 
+_primitive_types = frozenset([
+    types.NoneType, bool, int, long, float, str, unicode
+])
+
+# Conversions for exact types, used by `to_primitive()` in place of calling
+# `JSONEncoder.default()`, if it isn't overridden.
+_encoders = {
+    datetime.datetime: _encode_datetime,
+    datetime.date: datetime.date.isoformat,
+    datetime.time: _encode_time,
+    decimal.Decimal: str,
+}
+
+
+def to_primitive(data, default=JSONEncoder().default):
+    """
+    Convert `data` into the types that any json encoder can handle, in one
+    pass, for backends that don't support a `default` callback.
+    Dates, times and decimals are converted as by `JSONEncoder`, and the
+    order of SortedDict keys is preserved.
+    """
+    if getattr(default, 'im_func', None) is JSONEncoder.default.im_func:
+        encoders = _encoders
+    else:
+        encoders = {}
+    return _to_primitive(data, default, encoders)
+
+
+def _to_primitive(data, default, encoders):
+    data_type = type(data)
+    if data_type in _primitive_types:
+        return data
+    encoder = encoders.get(data_type)
+    if encoder is not None:
+        return encoder(data)
+    if isinstance(data, dict):
+        if isinstance(data, SortedDict):
+            keys = list(data.keyOrder)
+            values = map(data.__getitem__, keys)
+        else:
+            keys, values = data.keys(), data.values()
+        if not _convert_values(values, default, encoders):
+            return data
+        if isinstance(data, SortedDict):
+            ret = SortedDict()
+            dict.update(ret, zip(keys, values))
+            ret.keyOrder = keys
+            return ret
+        return dict(zip(keys, values))
+    elif data_type is list or data_type is tuple:
+        values = list(data)
+        if not _convert_values(values, default, encoders) and data_type is list:
+            return data
+        return values
+    elif isinstance(data, (basestring, int, long, float)):
+        # Subclasses of the primitive types, such as `SafeUnicode`.
+        return data
+    return _to_primitive(default(data), default, encoders)
+
+
+def _convert_values(values, default, encoders):
+    """
+    Convert the values in a list in place, returning `False` if they were
+    all primitive types already, so that the container needn't be copied.
+    """
+    primitive_types = _primitive_types
+    changed = False
+    for idx, value_type in enumerate(map(type, values)):
+        if value_type not in primitive_types:
+            value = values[idx]
+            encoder = encoders.get(value_type)
+            if encoder is not None:
+                converted = encoder(value)
+            else:
+                converted = _to_primitive(value, default, encoders)
+            if converted is not value:
+                values[idx] = converted
+                changed = True
+    return changed
+
+
+class JSONBackend(object):
+    """
+    Wraps a json module, such as `json`, `simplejson` or `ujson`, so that
+    the renderers and parsers can use any of them.
+
+    Modules that provide `JSONEncoder` are passed the renderer's encoder
+    class, which handles dates, decimals and so on.  Other modules are
+    passed data that has been converted with `to_primitive()` first.
+    """
+    def __init__(self, module):
+        self.module = module
+        self.supports_encoder_class = hasattr(module, 'JSONEncoder')
+
+    def dumps(self, data, encoder_class=JSONEncoder, indent=None, separators=None):
+        if self.supports_encoder_class:
+            return self.module.dumps(data, cls=encoder_class, indent=indent,
+                                     separators=separators)
+        data = to_primitive(data, encoder_class().default)
+        if indent is None:
+            return self.module.dumps(data)
+        return self.module.dumps(data, indent=indent)
+
+    def loads(self, string):
+        return self.module.loads(string)
+
+    def load(self, stream):
+        if hasattr(self.module, 'load'):
+            return self.module.load(stream)
+        return self.module.loads(stream.read())
+
+    def get_decoder(self):
+        """
+        Return a decoder instance with a `raw_decode()` method, for decoding
+        content incrementally.  Modules that don't provide `JSONDecoder` use
+        the one from the standard library.
+        """
+        if hasattr(self.module, 'JSONDecoder'):
+            return self.module.JSONDecoder()
+        import json
+        return json.JSONDecoder()
+
+
+_json_backends = {}
+
+
+def get_json_backend(name=None):
+    """
+    Return the `JSONBackend` for the named json module, defaulting to the
+    `JSON_BACKEND` setting.  If that isn't set, `django.utils.simplejson` is
+    used, which uses the C accelerated `simplejson` or `json` modules if they
+    are available, and falls back to a pure Python implementation.
+    """
+    if name is None:
+        name = api_settings.JSON_BACKEND or 'django.utils.simplejson'
+    try:
+        return _json_backends[name]
+    except KeyError:
+        pass
+    try:
+        module = importlib.import_module(name)
+    except ImportError:
+        msg = "Could not import '%s' for API setting 'JSON_BACKEND'" % name
+        raise ImportError(msg)
+    backend = _json_backends[name] = JSONBackend(module)
+    return backend
+
+
+# Unpack msgpack strings as unicode.  The `raw` argument replaced `encoding`
+# in msgpack 0.5.2, and the pure Python fallback always returns unicode.
+if not hasattr(msgpack, 'version'):
+    _msgpack_unpack_kwargs = {}
+elif msgpack.version >= (0, 5, 2):
+    _msgpack_unpack_kwargs = {'raw': False}
+else:
+    _msgpack_unpack_kwargs = {'encoding': 'utf-8'}
+
+
+def msgpack_dumps(data, encoder_class=JSONEncoder):
+    """
+    Pack `data` with msgpack.  Dates, times, decimals and generators are
+    converted by `encoder_class`, in the same way as for json, and the
+    order of SortedDict keys is preserved.
+    """
+    return msgpack.packb(data, default=encoder_class().default,
+                         use_bin_type=False)
+
+
+def msgpack_loads(content):
+    """
+    Unpack msgpack `content`, returning strings as unicode.
+    """
+    return msgpack.unpackb(content, **_msgpack_unpack_kwargs)
+
+
 try:
     import yaml
 except ImportError:
     SafeDumper = None
+    SafeLoader = None
 else:
-    # Adapted from http://pyyaml.org/attachment/ticket/161/use_ordered_dict.py
-    class SafeDumper(yaml.SafeDumper):
+    # Use the LibYAML based dumper and loader, if PyYAML was built with them
+    _BaseSafeDumper = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+    SafeLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+    class SafeDumper(_BaseSafeDumper):
         """
         Handles decimals as strings.
         Handles SortedDicts as usual dicts, but preserves field order, rather
@@ -56,36 +245,17 @@ else:
         def represent_decimal(self, data):
             return self.represent_scalar('tag:yaml.org,2002:str', str(data))
 
-        def represent_mapping(self, tag, mapping, flow_style=None):
-            value = []
-            node = yaml.MappingNode(tag, value, flow_style=flow_style)
-            if self.alias_key is not None:
-                self.represented_objects[self.alias_key] = node
-            best_style = True
-            if hasattr(mapping, 'items'):
-                mapping = list(mapping.items())
-                if not isinstance(mapping, SortedDict):
-                    mapping.sort()
-            for item_key, item_value in mapping:
-                node_key = self.represent_data(item_key)
-                node_value = self.represent_data(item_value)
-                if not (isinstance(node_key, yaml.ScalarNode) and not node_key.style):
-                    best_style = False
-                if not (isinstance(node_value, yaml.ScalarNode) and not node_value.style):
-                    best_style = False
-                value.append((node_key, node_value))
-            if flow_style is None:
-                if self.default_flow_style is not None:
-                    node.flow_style = self.default_flow_style
-                else:
-                    node.flow_style = best_style
-            return node
+        def represent_sorted_dict(self, data):
+            # A list of items is represented in the given order
+            return self.represent_mapping('tag:yaml.org,2002:map', data.items())
 
+    SafeDumper.add_representer(decimal.Decimal,
+            SafeDumper.represent_decimal)
     SafeDumper.add_representer(SortedDict,
-            yaml.representer.SafeRepresenter.represent_dict)
+            SafeDumper.represent_sorted_dict)
     SafeDumper.add_representer(DictWithMetadata,
             yaml.representer.SafeRepresenter.represent_dict)
     SafeDumper.add_representer(SortedDictWithMetadata,
-            yaml.representer.SafeRepresenter.represent_dict)
+            SafeDumper.represent_sorted_dict)
     SafeDumper.add_representer(types.GeneratorType,
             yaml.representer.SafeRepresenter.represent_list)
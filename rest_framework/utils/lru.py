@@ -0,0 +1,48 @@
+"""
+A small least recently used cache, for memoizing lookups that are keyed
+on request data, such as the Accept header, where the number of distinct
+keys is usually small but isn't bounded.
+"""
+
+
+class LRUCache(object):
+    """
+    A dict-like cache that holds at most `maxsize` items.  When it is full,
+    the least recently used quarter of the items are discarded together,
+    which keeps lookups as cheap as a dict lookup.
+
+    Concurrent access may occasionally lose an update, which is harmless
+    for a cache, but never raises.
+    """
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._data = {}
+        self._tick = 0
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None:
+            return default
+        self._tick += 1
+        entry[1] = self._tick
+        return entry[0]
+
+    def set(self, key, value):
+        if len(self._data) >= self.maxsize and key not in self._data:
+            self._evict(max(1, self.maxsize // 4))
+        self._tick += 1
+        self._data[key] = [value, self._tick]
+
+    def _evict(self, count):
+        items = sorted(self._data.items(), key=lambda item: item[1][1])
+        for key, entry in items[:count]:
+            self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
@@ -20,8 +20,8 @@ def media_type_matches(lhs, rhs):
     'text/*'
     '*/*'
     """
-    lhs = _MediaType(lhs)
-    rhs = _MediaType(rhs)
+    lhs = parse_media_type(lhs)
+    rhs = parse_media_type(rhs)
     return lhs.match(rhs)
 
 
@@ -37,23 +37,72 @@ def order_by_precedence(media_type_lst):
     """
     ret = [set(), set(), set(), set()]
     for media_type in media_type_lst:
-        precedence = _MediaType(media_type).precedence
+        precedence = parse_media_type(media_type).precedence
         ret[3 - precedence].add(media_type)
     return [media_types for media_types in ret if media_types]
 
 
+# Parsed media types, keyed by the media type string.
+_media_types = {}
+
+# The maximum number of parsed media types to keep.  Media type strings come
+# from request headers, so the cache is cleared when it's full.
+_MEDIA_TYPES_MAX = 1000
+
+
+def parse_media_type(media_type_str):
+    """
+    Return the parsed `_MediaType` for a media type string.  Instances are
+    shared, and must not be modified.
+    """
+    try:
+        return _media_types[media_type_str]
+    except KeyError:
+        pass
+    media_type = _MediaType(media_type_str)
+    if len(_media_types) >= _MEDIA_TYPES_MAX:
+        _media_types.clear()
+    _media_types[media_type_str] = media_type
+    return media_type
+
+
 class _MediaType(object):
+    __slots__ = ('orig', 'full_type', 'main_type', 'sub_type', 'params',
+                 'precedence', '_match_params')
+
     def __init__(self, media_type_str):
         if media_type_str is None:
             media_type_str = ''
-        self.orig = media_type_str
-        self.full_type, self.params = parse_header(media_type_str)
-        self.main_type, sep, self.sub_type = self.full_type.partition('/')
+        full_type, params = parse_header(media_type_str)
+        main_type, sep, sub_type = full_type.partition('/')
+        match_params = tuple([(key, val) for key, val in params.items() if key != 'q'])
+
+        # Return a precedence level from 0-3 for the media type given how specific it is.
+        if main_type == '*':
+            precedence = 0
+        elif sub_type == '*':
+            precedence = 1
+        elif not match_params:
+            precedence = 2
+        else:
+            precedence = 3
+
+        set_attr = super(_MediaType, self).__setattr__
+        set_attr('orig', media_type_str)
+        set_attr('full_type', full_type)
+        set_attr('main_type', main_type)
+        set_attr('sub_type', sub_type)
+        set_attr('params', params)
+        set_attr('precedence', precedence)
+        set_attr('_match_params', match_params)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('_MediaType instances are immutable')
 
     def match(self, other):
         """Return true if this MediaType satisfies the given MediaType."""
-        for key in self.params.keys():
-            if key != 'q' and other.params.get(key, None) != self.params.get(key, None):
+        for key, val in self._match_params:
+            if other.params.get(key, None) != val:
                 return False
 
         if self.sub_type != '*' and other.sub_type != '*'  and other.sub_type != self.sub_type:
@@ -64,19 +113,6 @@ class _MediaType(object):
 
         return True
 
-    @property
-    def precedence(self):
-        """
-        Return a precedence level from 0-3 for the media type given how specific it is.
-        """
-        if self.main_type == '*':
-            return 0
-        elif self.sub_type == '*':
-            return 1
-        elif not self.params or self.params.keys() == ['q']:
-            return 2
-        return 3
-
     def __str__(self):
         return unicode(self).encode('utf-8')
 
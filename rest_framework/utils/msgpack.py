@@ -0,0 +1,183 @@
+"""
+A pure Python implementation of the MessagePack format, used by the
+msgpack renderer and parser if the `msgpack` package isn't installed.
+
+Only provides `packb()` and `unpackb()`, with the same behaviour as the
+`msgpack` package, packing strings in the str (raw) format, and unpacking
+them as unicode.  See https://github.com/msgpack/msgpack/blob/master/spec.md
+"""
+import struct
+
+
+def packb(obj, default=None, use_bin_type=False):
+    """
+    Pack `obj` into a MessagePack encoded string.  Objects of other types
+    are passed to `default`, which should return an object that can be
+    packed, or raise a `TypeError`.
+    """
+    parts = []
+    _pack(obj, parts, default, use_bin_type)
+    return ''.join(parts)
+
+
+def _pack(obj, parts, default, use_bin_type):
+    if obj is None:
+        parts.append('\xc0')
+    elif obj is False:
+        parts.append('\xc2')
+    elif obj is True:
+        parts.append('\xc3')
+    elif isinstance(obj, (int, long)):
+        parts.append(_pack_int(obj))
+    elif isinstance(obj, float):
+        parts.append(struct.pack('>Bd', 0xcb, obj))
+    elif isinstance(obj, basestring):
+        if isinstance(obj, unicode):
+            obj = obj.encode('utf-8')
+        parts.append(_pack_header(len(obj), 0xa0, 32, 0xda, 0xdb,
+                                  use_bin_type and 0xd9 or None))
+        parts.append(obj)
+    elif isinstance(obj, (list, tuple)):
+        parts.append(_pack_header(len(obj), 0x90, 16, 0xdc, 0xdd))
+        for item in obj:
+            _pack(item, parts, default, use_bin_type)
+    elif isinstance(obj, dict):
+        parts.append(_pack_header(len(obj), 0x80, 16, 0xde, 0xdf))
+        for key, value in obj.items():
+            _pack(key, parts, default, use_bin_type)
+            _pack(value, parts, default, use_bin_type)
+    elif default is not None:
+        _pack(default(obj), parts, default, use_bin_type)
+    else:
+        raise TypeError('Cannot serialize %r' % (obj,))
+
+
+def _pack_int(obj):
+    if 0 <= obj < 0x80:
+        return chr(obj)
+    elif -0x20 <= obj < 0:
+        return struct.pack('>b', obj)
+    elif obj > 0:
+        for code, fmt, limit in _uint_formats:
+            if obj <= limit:
+                return struct.pack(fmt, code, obj)
+    else:
+        for code, fmt, limit in _int_formats:
+            if obj >= limit:
+                return struct.pack(fmt, code, obj)
+    raise TypeError('Integer value out of range: %r' % (obj,))
+
+
+_uint_formats = (
+    (0xcc, '>BB', 0xff),
+    (0xcd, '>BH', 0xffff),
+    (0xce, '>BI', 0xffffffff),
+    (0xcf, '>BQ', 0xffffffffffffffff),
+)
+
+_int_formats = (
+    (0xd0, '>Bb', -0x80),
+    (0xd1, '>Bh', -0x8000),
+    (0xd2, '>Bi', -0x80000000),
+    (0xd3, '>Bq', -0x8000000000000000),
+)
+
+
+def _pack_header(length, fix_code, fix_limit, code16, code32, code8=None):
+    if length < fix_limit:
+        return chr(fix_code | length)
+    elif code8 is not None and length <= 0xff:
+        return struct.pack('>BB', code8, length)
+    elif length <= 0xffff:
+        return struct.pack('>BH', code16, length)
+    elif length <= 0xffffffff:
+        return struct.pack('>BI', code32, length)
+    raise ValueError('Object is too large to serialize')
+
+
+def unpackb(packed):
+    """
+    Unpack a MessagePack encoded string.  Raises `ValueError` if the string
+    isn't valid.
+    """
+    try:
+        obj, pos = _unpack(packed, 0)
+    except (IndexError, struct.error):
+        raise ValueError('Unpack failed: incomplete input')
+    except (TypeError, UnicodeDecodeError), exc:
+        raise ValueError('Unpack failed: %s' % exc)
+    if pos != len(packed):
+        raise ValueError('Unpack failed: extra data')
+    return obj
+
+
+# The struct format and size of the fixed length types, by type code.
+_fixed_formats = {
+    0xca: ('>f', 4), 0xcb: ('>d', 8),
+    0xcc: ('>B', 1), 0xcd: ('>H', 2), 0xce: ('>I', 4), 0xcf: ('>Q', 8),
+    0xd0: ('>b', 1), 0xd1: ('>h', 2), 0xd2: ('>i', 4), 0xd3: ('>q', 8),
+}
+
+# The struct format and size of the length prefix of the variable length
+# types, by type code.
+_length_formats = {
+    0xc4: ('>B', 1, 'bin'), 0xc5: ('>H', 2, 'bin'), 0xc6: ('>I', 4, 'bin'),
+    0xd9: ('>B', 1, 'str'), 0xda: ('>H', 2, 'str'), 0xdb: ('>I', 4, 'str'),
+    0xdc: ('>H', 2, 'array'), 0xdd: ('>I', 4, 'array'),
+    0xde: ('>H', 2, 'map'), 0xdf: ('>I', 4, 'map'),
+}
+
+_constants = {0xc0: None, 0xc2: False, 0xc3: True}
+
+
+def _unpack(packed, pos):
+    """
+    Unpack the object starting at `pos`, returning a two-tuple of the
+    object and the position after it.
+    """
+    code = ord(packed[pos])
+    pos += 1
+
+    if code < 0x80:
+        return code, pos
+    elif code >= 0xe0:
+        return code - 0x100, pos
+    elif code in _constants:
+        return _constants[code], pos
+    elif code in _fixed_formats:
+        fmt, size = _fixed_formats[code]
+        return struct.unpack(fmt, packed[pos:pos + size])[0], pos + size
+
+    if code <= 0x8f:
+        kind, length = 'map', code & 0x0f
+    elif code <= 0x9f:
+        kind, length = 'array', code & 0x0f
+    elif code <= 0xbf:
+        kind, length = 'str', code & 0x1f
+    elif code in _length_formats:
+        fmt, size, kind = _length_formats[code]
+        length = struct.unpack(fmt, packed[pos:pos + size])[0]
+        pos += size
+    else:
+        raise ValueError('Unpack failed: unsupported type 0x%02x' % code)
+
+    if kind == 'str' or kind == 'bin':
+        if pos + length > len(packed):
+            raise IndexError()
+        value = packed[pos:pos + length]
+        if kind == 'str':
+            value = value.decode('utf-8')
+        return value, pos + length
+    elif kind == 'array':
+        ret = []
+        for idx in xrange(length):
+            item, pos = _unpack(packed, pos)
+            ret.append(item)
+        return ret, pos
+
+    ret = {}
+    for idx in xrange(length):
+        key, pos = _unpack(packed, pos)
+        value, pos = _unpack(packed, pos)
+        ret[key] = value
+    return ret, pos
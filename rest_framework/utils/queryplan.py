@@ -0,0 +1,163 @@
+"""
+Helper functions for determining the `select_related` and `prefetch_related`
+lookups required to serialize a queryset, without issuing a query per object.
+"""
+from rest_framework import serializers
+from rest_framework.fields import get_relation
+
+
+class QueryPlan(object):
+    """
+    The lookups to apply to a queryset before it gets serialized.
+    """
+    def __init__(self, select_related=(), prefetch_related=()):
+        self.select_related = _remove_redundant(select_related)
+        self.prefetch_related = _remove_redundant(prefetch_related)
+
+    def __nonzero__(self):
+        return bool(self.select_related or self.prefetch_related)
+
+    def __unicode__(self):
+        return u'select_related(%s), prefetch_related(%s)' % (
+            ', '.join(self.select_related),
+            ', '.join(self.prefetch_related)
+        )
+
+    def __str__(self):
+        return unicode(self).encode('utf-8')
+
+    def apply(self, queryset):
+        """
+        Return a copy of the queryset, with the planned lookups applied.
+
+        `prefetch_related` is only available from Django 1.4, so on earlier
+        versions only the `select_related` lookups are applied.
+        """
+        if self.select_related:
+            existing = queryset.query.select_related
+            if existing is True:
+                pass  # Already following all relationships
+            else:
+                lookups = _flatten_lookups(existing or {})
+                lookups += [lookup for lookup in self.select_related
+                            if lookup not in lookups]
+                queryset = queryset.select_related(*lookups)
+
+        if self.prefetch_related and hasattr(queryset, 'prefetch_related'):
+            queryset = queryset.prefetch_related(*self.prefetch_related)
+
+        return queryset
+
+
+def get_query_plan(serializer, model):
+    """
+    Walk the fields of the serializer, and return a `QueryPlan` with the
+    related lookups required to serialize instances of `model`.
+    """
+    select_related = []
+    prefetch_related = []
+    for path in _get_related_paths(serializer, model, ()):
+        select = []
+        for attr, to_many in path:
+            if to_many:
+                break
+            select.append(attr)
+        if select:
+            select_related.append('__'.join(select))
+        if len(select) < len(path):
+            prefetch_related.append('__'.join([attr for attr, to_many in path]))
+    return QueryPlan(select_related, prefetch_related)
+
+
+def _get_related_paths(serializer, model, prefix):
+    """
+    Yields each relationship path used by the serializer, as a tuple of
+    (attribute name, to_many) two-tuples.
+    """
+    fields = serializer.get_fields(nested=bool(serializer.opts.depth))
+    for field_name, field in fields.items():
+        if field.source == '*':
+            if isinstance(field, serializers.BaseSerializer):
+                for path in _get_related_paths(field, model, prefix):
+                    yield path
+            continue
+
+        attrs = field._source_attrs or (field_name,)
+        if len(attrs) > 1 and isinstance(field, (serializers.RelatedField,
+                                                 serializers.BaseSerializer)):
+            continue  # Related fields and serializers don't follow dotted sources
+
+        # Intermediate attributes of a dotted source are simply looked up
+        # on the object, which can only be planned for to-one relationships.
+        path = prefix
+        current = model
+        for attr in attrs[:-1]:
+            relation = get_relation(current, attr)
+            if relation is None or relation[1]:
+                current = None
+                break
+            current = relation[0]
+            path = path + ((attr, False),)
+
+        relation = current and get_relation(current, attrs[-1])
+        if relation:
+            related_model, to_many, local, lookup = relation
+            related_path = path + ((attrs[-1], to_many),)
+            if isinstance(field, serializers.BaseSerializer):
+                yield related_path
+                for nested_path in _get_related_paths(field, related_model,
+                                                      related_path):
+                    yield nested_path
+                continue
+            elif _needs_related_objects(field, to_many, local, lookup):
+                yield related_path
+                continue
+
+        if path != prefix:
+            yield path
+
+
+def _needs_related_objects(field, to_many, local, lookup):
+    """
+    Return True if the field loads the related object, or objects, when
+    serializing a relationship.
+    """
+    if isinstance(field, serializers.ModelField):
+        return False  # Uses the local column value
+    elif isinstance(field, serializers.PrimaryKeyRelatedField) and local:
+        return False  # Uses the local foreign key column
+    elif isinstance(field, serializers.ManyPrimaryKeyRelatedField) and lookup:
+        return False  # Looks up the related pks for all objects at once
+    elif isinstance(field, serializers.ManyRelatedMixin):
+        return to_many
+    return not to_many
+
+
+def _remove_redundant(lookups):
+    """
+    Remove duplicate lookups, and any that are a prefix of another lookup,
+    preserving the order in which they were given.
+    """
+    ret = []
+    for lookup in lookups:
+        if lookup in ret:
+            continue
+        if any([other.startswith(lookup + '__') for other in lookups]):
+            continue
+        ret.append(lookup)
+    return ret
+
+
+def _flatten_lookups(select_related, prefix=''):
+    """
+    Convert the nested dict that Django stores for `select_related` lookups
+    back into a list of lookup strings.
+    """
+    ret = []
+    for key, value in select_related.items():
+        lookup = prefix + key
+        if value:
+            ret += _flatten_lookups(value, lookup + '__')
+        else:
+            ret.append(lookup)
+    return ret
@@ -3,8 +3,11 @@ Provides an APIView class that is used as the base of all class-based views.
 """
 
 import re
+from calendar import timegm
+from hashlib import md5
 from django.core.exceptions import PermissionDenied
 from django.http import Http404
+from django.utils.http import http_date, parse_etags, parse_http_date_safe, quote_etag
 from django.utils.html import escape
 from django.utils.safestring import mark_safe
 from django.views.decorators.csrf import csrf_exempt
@@ -14,6 +17,7 @@ from rest_framework.response import Response
 from rest_framework.request import Request
 from rest_framework.settings import api_settings
 from rest_framework.reverse import reverse
+from rest_framework.utils import is_lazy_iterable
 
 
 def _remove_trailing_string(content, trailing):
@@ -61,6 +65,10 @@ class APIView(View):
     throttle_classes = api_settings.DEFAULT_THROTTLE_CLASSES
     permission_classes = api_settings.DEFAULT_PERMISSION_CLASSES
     content_negotiation_class = api_settings.DEFAULT_CONTENT_NEGOTIATION_CLASS
+    response_cache_class = api_settings.DEFAULT_RESPONSE_CACHE_CLASS
+
+    lazy_request_data = False  # Allow `request.DATA` to be a lazy iterable
+    content_etags = api_settings.CONTENT_ETAGS
 
     @classmethod
     def as_view(cls, **initkwargs):
@@ -193,42 +201,81 @@ class APIView(View):
         if self.settings.FORMAT_SUFFIX_KWARG:
             return kwargs.get(self.settings.FORMAT_SUFFIX_KWARG)
 
+    def get_policy_instances(self, policy_classes):
+        """
+        Returns a list of instances of the given policy classes.
+
+        Policies are instantiated for every request, unless the class sets
+        `stateless = True` itself, in which case a single instance is
+        created per view class and shared between requests.  The marker
+        isn't inherited, as subclasses may add per-request state.
+        """
+        view_class = self.__class__
+        cache = view_class.__dict__.get('_policy_instances')
+        if cache is None:
+            cache = view_class._policy_instances = {}
+
+        key = tuple(policy_classes)
+        try:
+            shared = cache[key]
+        except KeyError:
+            shared = [policy.__dict__.get('stateless', False) and policy() or None
+                      for policy in key]
+            cache[key] = shared
+
+        ret = []
+        for policy, instance in zip(key, shared):
+            if instance is None:
+                instance = policy()
+            ret.append(instance)
+        return ret
+
     def get_renderers(self):
         """
         Instantiates and returns the list of renderers that this view can use.
         """
-        return [renderer() for renderer in self.renderer_classes]
+        return self.get_policy_instances(self.renderer_classes)
 
     def get_parsers(self):
         """
         Instantiates and returns the list of renderers that this view can use.
         """
-        return [parser() for parser in self.parser_classes]
+        return self.get_policy_instances(self.parser_classes)
 
     def get_authenticators(self):
         """
         Instantiates and returns the list of renderers that this view can use.
         """
-        return [auth() for auth in self.authentication_classes]
+        return self.get_policy_instances(self.authentication_classes)
 
     def get_permissions(self):
         """
         Instantiates and returns the list of permissions that this view requires.
         """
-        return [permission() for permission in self.permission_classes]
+        return self.get_policy_instances(self.permission_classes)
 
     def get_throttles(self):
         """
         Instantiates and returns the list of throttles that this view uses.
         """
-        return [throttle() for throttle in self.throttle_classes]
+        return self.get_policy_instances(self.throttle_classes)
+
+    def get_response_cache(self):
+        """
+        Instantiate and return the response cache to use, or `None` if
+        responses aren't cached.
+        """
+        if not self.response_cache_class:
+            return None
+        return self.get_policy_instances([self.response_cache_class])[0]
 
     def get_content_negotiator(self):
         """
         Instantiate and return the content negotiation class to use.
         """
         if not getattr(self, '_negotiator', None):
-            self._negotiator = self.content_negotiation_class()
+            self._negotiator = self.get_policy_instances(
+                [self.content_negotiation_class])[0]
         return self._negotiator
 
     # API policy implementation methods
@@ -245,6 +292,10 @@ class APIView(View):
         except:
             if force:
                 return (renderers[0], renderers[0].media_type)
+            # The error response uses the first renderer, so store it on the
+            # request rather than negotiating again in `finalize_response`.
+            request.accepted_renderer = renderers[0]
+            request.accepted_media_type = renderers[0].media_type
             raise
 
     def has_permission(self, request, obj=None):
@@ -306,11 +357,96 @@ class APIView(View):
             response.accepted_media_type = request.accepted_media_type
             response.renderer_context = self.get_renderer_context()
 
+            # Lazy data, such as a generator, is only streamed by renderers
+            # that support it.  Other renderers get the full list.
+            if is_lazy_iterable(response.data) and \
+                    not getattr(response.accepted_renderer, 'streaming', False):
+                response.data = list(response.data)
+
         for key, value in self.headers.items():
             response[key] = value
 
+        if isinstance(response, Response):
+            if self.content_etags:
+                self.add_content_etag(request, response)
+            response_cache = self.get_response_cache()
+            if response_cache and not response.exception and \
+                    not response.is_rendered:
+                response_cache.set_response(request, self, response)
+
         return response
 
+    def invalidate_cached_responses(self):
+        """
+        Invalidate any cached responses for this view's model, or for the
+        view itself if it has no model.  Called after writes.  Does nothing
+        if the view doesn't cache responses.
+        """
+        response_cache = self.get_response_cache()
+        if response_cache:
+            response_cache.invalidate(self)
+
+    def check_not_modified(self, request, etag=None, last_modified=None):
+        """
+        Set the `ETag` and `Last-Modified` headers for the response, from
+        an unquoted etag string and a datetime.  Returns a `304 Not
+        Modified` response if the client's copy is current, or `None`.
+
+        Called before serialization, so that requests for unmodified data
+        don't pay for serializing and rendering it.
+        """
+        if request.method not in ('GET', 'HEAD'):
+            return None
+
+        if etag is not None:
+            self.headers['ETag'] = quote_etag(etag)
+        if last_modified is not None:
+            last_modified = timegm(last_modified.utctimetuple())
+            self.headers['Last-Modified'] = http_date(last_modified)
+
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if_modified_since = request.META.get('HTTP_IF_MODIFIED_SINCE')
+
+        # If-None-Match takes precedence over If-Modified-Since.
+        if if_none_match is not None:
+            etags = parse_etags(if_none_match)
+            not_modified = etag is not None and (etag in etags or '*' in etags)
+        elif if_modified_since is not None and last_modified is not None:
+            since = parse_http_date_safe(if_modified_since)
+            not_modified = since is not None and last_modified <= since
+        else:
+            not_modified = False
+
+        if not_modified:
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return None
+
+    def add_content_etag(self, request, response):
+        """
+        Set an `ETag` header from a hash of the rendered content of a
+        successful `GET` or `HEAD` response, unless it already has one,
+        and turn the response into a `304 Not Modified` if it matches.
+
+        This saves bandwidth, but not rendering.  Streamed responses are
+        not hashed.
+        """
+        if request.method not in ('GET', 'HEAD') or response.status_code != 200 or \
+                response.has_header('ETag'):
+            return
+        if is_lazy_iterable(response.data) and \
+                getattr(response.accepted_renderer, 'streaming', False):
+            return
+
+        def set_etag(response):
+            etag = md5(response.content).hexdigest()
+            response['ETag'] = quote_etag(etag)
+            etags = parse_etags(request.META.get('HTTP_IF_NONE_MATCH', ''))
+            if etag in etags or '*' in etags:
+                response.status_code = status.HTTP_304_NOT_MODIFIED
+                response.content = ''
+
+        response.add_post_render_callback(set_etag)
+
     def handle_exception(self, exc):
         """
         Handle any exception that occurs, by returning an appropriate response,
@@ -351,14 +487,18 @@ class APIView(View):
         try:
             self.initial(request, *args, **kwargs)
 
-            # Get the appropriate handler method
-            if request.method.lower() in self.http_method_names:
-                handler = getattr(self, request.method.lower(),
-                                  self.http_method_not_allowed)
-            else:
-                handler = self.http_method_not_allowed
+            response_cache = self.get_response_cache()
+            response = response_cache and response_cache.get_response(request, self)
+
+            if response is None:
+                # Get the appropriate handler method
+                if request.method.lower() in self.http_method_names:
+                    handler = getattr(self, request.method.lower(),
+                                      self.http_method_not_allowed)
+                else:
+                    handler = self.http_method_not_allowed
 
-            response = handler(request, *args, **kwargs)
+                response = handler(request, *args, **kwargs)
 
         except Exception as exc:
             response = self.handle_exception(exc)